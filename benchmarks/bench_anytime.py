@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Anytime Planning Benchmark
+Plans the same synthetic city under a range of time budgets and reports, per
+budget, the latency, total route distance, lower bound, gap and search status
+next to the plain build_plan result (medians over --repeat runs)
+
+Usage: python benchmarks/bench_anytime.py [--places 200] [--per-day 8] [--max-distance 3] [--budgets 0 1 5 20 100] [--repeat 5]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from wayfare_scrapper.anytime import build_plan_anytime
+from wayfare_scrapper.core import Place, TravelPlanner
+from wayfare_scrapper.distance_matrix import DistanceMatrix
+from wayfare_scrapper.planning import build_plan
+
+
+def synthetic_places(count, seed=7):
+    rng = random.Random(seed)
+    return [Place(name=f"Attraction {i}", address=f"{i} Rue Synthétique",
+                  latitude=48.8566 + rng.uniform(-0.08, 0.08), longitude=2.3522 + rng.uniform(-0.12, 0.12))
+            for i in range(count)]
+
+
+def plan_distance(plan):
+    return sum(day["total_distance_km"] for day in plan["days"].values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--places', type=int, default=200)
+    parser.add_argument('--per-day', type=int, default=8)
+    parser.add_argument('--max-distance', type=float, default=3.0)
+    parser.add_argument('--budgets', type=float, nargs='+', default=[0, 1, 5, 20, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    places = synthetic_places(args.places)
+    matrix = DistanceMatrix.compute(places, 'haversine')
+
+    start = time.perf_counter()
+    plan = build_plan(places, args.max_distance, args.per_day, planner=TravelPlanner(distances=matrix))
+    baseline_ms = (time.perf_counter() - start) * 1000
+    print(f"{args.places} places, up to {args.per_day} per day, {len(plan['days'])} days")
+    print(f"{'build_plan':>12}  {baseline_ms:8.1f} ms  {plan_distance(plan):8.1f} km")
+
+    print(f"{'budget (ms)':>12}  {'elapsed':>11}  {'distance':>11}  {'bound':>8}  {'gap':>6}  status")
+    for budget in list(args.budgets) + [None]:
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = build_plan_anytime(places, budget, args.max_distance, args.per_day,
+                                        planner=TravelPlanner(distances=matrix))
+            runs.append(((time.perf_counter() - start) * 1000, result))
+        runs.sort(key=lambda run: run[1].total_distance_km)
+        result = runs[len(runs) // 2][1]
+        elapsed_ms = statistics.median(elapsed_ms for elapsed_ms, _ in runs)
+        label = 'none' if budget is None else f"{budget:g}"
+        print(f"{label:>12}  {elapsed_ms:8.1f} ms  {result.total_distance_km:8.1f} km  "
+              f"{result.lower_bound_km:8.1f}  {result.gap:6.1%}  {result.status}")
+
+
+if __name__ == '__main__':
+    main()
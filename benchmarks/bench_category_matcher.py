@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Category Matcher Benchmark
+Compares the original linear-scan category matching with the compiled matcher
+on a synthetic corpus shaped like the TripAdvisor categories in cities/
+
+Usage: python benchmarks/bench_category_matcher.py [--cities 100] [--entries 300]
+"""
+
+import argparse
+import random
+import time
+
+from wayfare_scrapper.data.category_mapping import CATEGORY_MAPPING
+from wayfare_scrapper.data.category_matcher import CategoryMatcher, FUZZY_MATCHES
+
+# Categories seen in scraped data that are not mapping keys verbatim
+UNMAPPED_CATEGORIES = [
+    "Ferris Wheels", "Tattoo Parlors", "Sacred & Religious Sites", "Architectural Buildings",
+    "Historic Sites & Landmarks", "Art Museum", "City Parks", "Concerts & Shows", "Night Markets",
+    "Cable Cars", "Spa & Wellness", "Beach & Pool Club", "Football Stadium", "Old Towns",
+    "Tram Tours", "Sightseeing Cruises", "Jewish Sites", "Fish Market", "Street Art", "Ski Lifts",
+]
+
+
+def legacy_find_best_category_match(original_category):
+    """The pre-compilation implementation from scripts/apply_category_mapping.py, kept as the reference"""
+    if not original_category:
+        return None
+    original_lower = original_category.lower().strip()
+    if original_category in CATEGORY_MAPPING:
+        return CATEGORY_MAPPING[original_category]
+    for mapping_key, mapping_value in CATEGORY_MAPPING.items():
+        mapping_lower = mapping_key.lower()
+        if any(word in original_lower for word in mapping_lower.split() if len(word) > 3):
+            return mapping_value
+        if any(word in mapping_lower for word in original_lower.split() if len(word) > 3):
+            return mapping_value
+    for keyword, category in FUZZY_MATCHES.items():
+        if keyword in original_lower:
+            for mapping_key, mapping_value in CATEGORY_MAPPING.items():
+                if mapping_value['new_category'] == category:
+                    return mapping_value
+    return CATEGORY_MAPPING.get("Other", {"new_category": "Other", "duration": 60, "type": "other"})
+
+
+def build_corpus(cities, entries, seed=42):
+    """One list of raw categories per city, with a long-tailed category distribution"""
+    rng = random.Random(seed)
+    keys = [key for key in CATEGORY_MAPPING if key]
+    combined = [f"{rng.choice(keys)} • {rng.choice(keys)}" for _ in range(300)]
+    vocabulary = keys + combined + UNMAPPED_CATEGORIES + [key.lower() for key in keys[:40]] + [""]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    rng.shuffle(vocabulary)
+    return [rng.choices(vocabulary, weights, k=entries) for _ in range(cities)]
+
+
+def time_per_entry(corpus, resolve):
+    count = sum(len(city) for city in corpus)
+    start = time.perf_counter()
+    for city in corpus:
+        for category in city:
+            resolve(category)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark category matching")
+    parser.add_argument('--cities', type=int, default=100)
+    parser.add_argument('--entries', type=int, default=300)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.cities, args.entries)
+    distinct = {category for city in corpus for category in city}
+    print(f"Corpus: {args.cities} cities x {args.entries} entries, {len(distinct)} distinct categories")
+
+    start = time.perf_counter()
+    matcher = CategoryMatcher()
+    print(f"Compile time: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    mismatches = [category for category in distinct
+                  if matcher.match(category) != legacy_find_best_category_match(category)]
+    if mismatches:
+        print(f"✗ {len(mismatches)} categories resolve differently, e.g. {mismatches[:3]}")
+    else:
+        print("✓ Compiled matcher agrees with the linear scan on every category")
+
+    def unmemoized(category):
+        matcher.clear_cache()
+        return matcher.match(category)
+
+    matcher.clear_cache()
+    legacy = time_per_entry(corpus, legacy_find_best_category_match)
+    compiled = time_per_entry(corpus, unmemoized)
+    matcher.clear_cache()
+    memoized = time_per_entry(corpus, matcher.match)
+
+    print(f"\n{'Matcher':<28}{'µs / entry':>12}{'speedup':>10}")
+    print(f"{'linear scan (original)':<28}{legacy:>12.2f}{1.0:>10.1f}x")
+    print(f"{'compiled, no memo':<28}{compiled:>12.2f}{legacy / compiled:>10.1f}x")
+    print(f"{'compiled + memo':<28}{memoized:>12.2f}{legacy / memoized:>10.1f}x")
+    print(f"Memo: {matcher.hits} hits, {matcher.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
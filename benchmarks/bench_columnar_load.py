@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Columnar Load Benchmark
+Compares loading a city's planning fields (name, latitude, longitude) from the
+pretty-printed JSON file against column-pruned loads from the .wfc file
+
+Usage: python benchmarks/bench_columnar_load.py [--entries 3000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from wayfare_scrapper.data.columnar import ColumnarCity, convert_city_file, load_columns
+from wayfare_scrapper.data.opening_hours import DAYS_OF_WEEK
+
+HOURS = ["9:00 AM - 5:00 PM", "10:00 AM - 6:00 PM", "Closed", "", "Open 24 hours",
+         "10:00 AM - 1:00 PM, 2:00 PM - 6:00 PM"]
+CATEGORIES = ["Art Museums", "Churches & Cathedrals", "Parks", "Historic Sites", "Points of Interest & Landmarks"]
+
+
+def make_records(count, seed=7):
+    rng = random.Random(seed)
+    return [{
+        'name': f"Attraction {i}",
+        'category': rng.choice(CATEGORIES),
+        'detail_url': f"https://www.tripadvisor.com/Attraction_Review-g187147-d{i}",
+        'price': rng.choice(["", "€15", "€22"]),
+        'rating': round(rng.uniform(3.5, 5.0), 1),
+        'popularity': str(i + 1),
+        'latitude': 48.8 + rng.random() / 10,
+        'longitude': 2.3 + rng.random() / 10,
+        'opening_hours': {day: rng.choice(HOURS) for day in DAYS_OF_WEEK},
+    } for i in range(count)]
+
+
+def timed(label, fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<42} {elapsed * 1000:8.2f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'Paris_attractions_with_hours_and_price.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(make_records(args.entries), f, ensure_ascii=False, indent=2)
+        out_path, _ = convert_city_file(json_path)
+        print(f"{args.entries} records: JSON {os.path.getsize(json_path) / 1024:.0f} KiB, "
+              f"columnar {os.path.getsize(out_path) / 1024:.0f} KiB")
+
+        def json_load():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return [(entry['name'], entry['latitude'], entry['longitude']) for entry in data]
+
+        def coordinates_only():
+            with ColumnarCity(out_path) as city:
+                return sum(city['latitude']), sum(city['longitude'])
+
+        baseline = timed("json.load + pick name/lat/lon", json_load, args.repeat)
+        pruned = timed("load_columns(name, latitude, longitude)", lambda: load_columns(out_path), args.repeat)
+        mapped = timed("mmap latitude/longitude views only", coordinates_only, args.repeat)
+        print(f"  speedup: {baseline / pruned:.1f}x (pruned), {baseline / mapped:.1f}x (coordinates)")
+
+
+if __name__ == "__main__":
+    main()
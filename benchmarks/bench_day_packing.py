@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Day Packing Benchmark
+Plans synthetic cities with days split by count (max_places_per_day) and
+filled by time (day_minutes), and reports per size the latency, the days
+used, how many days run over day_minutes and the mean day length (medians
+of latency over --repeat runs)
+
+Usage: python benchmarks/bench_day_packing.py [--sizes 100 300 1000] [--per-day 5] [--day-minutes 480] [--max-visit 240] [--repeat 3]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from wayfare_scrapper.core import Place, TravelPlanner
+from wayfare_scrapper.data.category_mapping import get_category_index
+from wayfare_scrapper.distance_matrix import DistanceMatrix
+from wayfare_scrapper.planning import build_plan
+from wayfare_scrapper.visit_time import travel_minutes, visit_minutes
+
+
+def synthetic_places(count, max_visit, seed=7):
+    rng = random.Random(seed)
+    summary = get_category_index().summary()
+    categories = [category for category, entry in summary.items() if entry["duration"] <= max_visit]
+    return [Place(name=f"Attraction {i}", address=f"{i} Rue Synthétique",
+                  latitude=48.8566 + rng.uniform(-0.05, 0.05), longitude=2.3522 + rng.uniform(-0.07, 0.07),
+                  rating=4.0, types=[rng.choice(categories)])
+            for i in range(count)]
+
+
+def day_lengths(plan, places_by_name):
+    """Visits plus travel of every day, measured the same way for both modes"""
+    return [sum(visit_minutes(places_by_name[place["name"]]) for place in day["places"])
+            + travel_minutes(day["total_distance_km"]) for day in plan["days"].values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--per-day', type=int, default=5)
+    parser.add_argument('--day-minutes', type=float, default=480.0)
+    parser.add_argument('--max-visit', type=int, default=240, help="leave out categories with longer visits")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'places':>7}  {'mode':>6}  {'elapsed':>11}  {'days':>5}  {'over':>5}  {'mean day':>9}")
+    for size in args.sizes:
+        places = synthetic_places(size, args.max_visit)
+        places_by_name = {place.name: place for place in places}
+        matrix = DistanceMatrix.compute(places, 'haversine')
+        for mode, day_minutes in (('count', None), ('time', args.day_minutes)):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                plan = build_plan(places, max_places_per_day=args.per_day, planner=TravelPlanner(distances=matrix),
+                                  day_minutes=day_minutes)
+                timings.append((time.perf_counter() - start) * 1000)
+            lengths = day_lengths(plan, places_by_name)
+            over = sum(length > args.day_minutes for length in lengths)
+            print(f"{size:>7}  {mode:>6}  {statistics.median(timings):8.1f} ms  {len(lengths):>5}  {over:>5}  "
+                  f"{statistics.mean(lengths):5.0f} min")
+
+
+if __name__ == '__main__':
+    main()
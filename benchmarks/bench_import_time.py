@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Import Time Benchmark
+Cold-imports package modules in fresh interpreters with `python -X importtime`
+and reports their cumulative import time, the slowest modules they pull in,
+and whether scraping-only dependencies (requests, geopy) were loaded.
+With --check it exits non-zero when a module loads a dependency it should
+not, or exceeds --budget-ms, so CLI and worker cold-start regressions fail.
+
+Usage: python benchmarks/bench_import_time.py [--repeat 5] [--top 5] [--check] [--budget-ms 100]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules whose import must not load the scraping dependencies
+MODULES = [
+    'wayfare_scrapper',
+    'wayfare_scrapper.core',
+    'wayfare_scrapper.place_table',
+    'wayfare_scrapper.data.category_mapping',
+    'wayfare_scrapper.data.city_files',
+    'wayfare_scrapper.transforms',
+    'wayfare_scrapper.pipeline',
+    'wayfare_scrapper.store',
+    'wayfare_scrapper.session',
+]
+SCRAPING_DEPENDENCIES = ('requests', 'geopy')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module: str):
+    """(cumulative_us, [(self_us, name)], loaded_dependencies) for one cold import"""
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {SCRAPING_DEPENDENCIES!r} if m in sys.modules))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')])))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, env=env, check=True)
+
+    # Lines are "import time: self | cumulative | name", children indented below their parent.
+    # Interpreter start-up imports come first and end with the top-level 'site' entry.
+    lines = [line for line in result.stderr.splitlines() if line.startswith('import time:')]
+    start = next((i + 1 for i, line in enumerate(lines) if line.split('|')[2] == ' site'), 0)
+    cumulative, modules = 0, []
+    for line in lines[start:]:
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):
+            cumulative += int(cumulative_us)
+        modules.append((int(self_us), name.strip()))
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, modules, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="Cold imports per module; the fastest is reported")
+    parser.add_argument('--top', type=int, default=5, help="Slowest imported modules to list per module")
+    parser.add_argument('--check', action='store_true', help="Exit 1 on loaded scraping dependencies or budget overruns")
+    parser.add_argument('--budget-ms', type=float, help="Maximum cumulative import time per module")
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'Module':<45} {'Import ms':>10}  Scraping deps loaded")
+    for module in args.modules:
+        profiles = [import_profile(module) for _ in range(args.repeat)]
+        cumulative, modules, loaded = min(profiles, key=lambda profile: profile[0])
+        print(f"{module:<45} {cumulative / 1000:>10.1f}  {', '.join(loaded) or '-'}")
+        for self_us, name in sorted(modules, reverse=True)[:args.top]:
+            print(f"    {self_us / 1000:>7.1f} ms  {name}")
+        if loaded:
+            failures.append(f"{module} loads {', '.join(loaded)}")
+        if args.budget_ms is not None and cumulative / 1000 > args.budget_ms:
+            failures.append(f"{module} takes {cumulative / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Multi-Start Route Benchmark
+Orders one long synthetic city route with TravelPlanner.optimize_route and
+with multi_start_route at several worker counts, reporting route length and
+wall time (results are identical across worker counts; only time changes)
+
+Usage: python benchmarks/bench_multi_start.py [--places 1000] [--starts 32] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from wayfare_scrapper.core import Place, TravelPlanner
+from wayfare_scrapper.distance_matrix import DistanceMatrix
+from wayfare_scrapper.multi_start import multi_start_route
+
+
+def synthetic_places(count, seed=7):
+    rng = random.Random(seed)
+    return [Place(name=f"Attraction {i}", address=f"{i} Rue Synthétique",
+                  latitude=48.8566 + rng.uniform(-0.08, 0.08), longitude=2.3522 + rng.uniform(-0.12, 0.12))
+            for i in range(count)]
+
+
+def route_km(planner, route):
+    return sum(planner.calculate_distance(a, b) for a, b in zip(route, route[1:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--starts', type=int, default=32)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    places = synthetic_places(args.places)
+    planner = TravelPlanner(distances=DistanceMatrix.compute(places, 'haversine'))
+
+    start = time.perf_counter()
+    route = planner.optimize_route(places)
+    print(f"{args.places} places, {args.starts} starts, {os.cpu_count()} CPUs")
+    print(f"{'optimize_route':>16}  {(time.perf_counter() - start) * 1000:9.1f} ms  {route_km(planner, route):8.1f} km")
+    for workers in args.workers:
+        result = multi_start_route(places, planner, args.starts, workers)
+        print(f"{f'{workers} workers':>16}  {result.elapsed_ms:9.1f} ms  {result.distance_km:8.1f} km  "
+              f"(first start {result.first_distance_km:.1f} km)")
+
+
+if __name__ == '__main__':
+    main()
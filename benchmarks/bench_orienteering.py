@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Orienteering Benchmark
+Selects "the best of the city" from synthetic cities of several sizes and
+reports, per size and trip length, the latency, the places selected, their
+score and the fullest day, next to a popular-first baseline that takes
+places in rank order wherever they still fit (medians over --repeat runs)
+
+Usage: python benchmarks/bench_orienteering.py [--sizes 500 1000 3000] [--days 1 3 7] [--day-minutes 480] [--repeat 3] [--matrix]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from wayfare_scrapper.core import Place, TravelPlanner
+from wayfare_scrapper.data.category_mapping import get_category_index
+from wayfare_scrapper.distance_matrix import DistanceMatrix
+from wayfare_scrapper.geo import haversine_km
+from wayfare_scrapper.orienteering import best_plan, place_score
+from wayfare_scrapper.visit_time import DEFAULT_TRAVEL_SPEED_KMH, travel_minutes, visit_minutes
+
+
+def synthetic_places(count, seed=7):
+    rng = random.Random(seed)
+    categories = list(get_category_index().summary())
+    return [Place(name=f"Attraction {i}", address=f"{i} Rue Synthétique",
+                  latitude=48.8566 + rng.uniform(-0.08, 0.08), longitude=2.3522 + rng.uniform(-0.12, 0.12),
+                  rating=round(rng.uniform(3.0, 5.0), 1), types=[rng.choice(categories)])
+            for i in range(count)]
+
+
+def popular_first(places, days, day_minutes):
+    """Score of taking places in popularity order, each at its cheapest position in a day it still fits"""
+    routes, minutes, score = [[] for _ in range(days)], [0.0] * days, 0.0
+
+    def leg(a, b):
+        return travel_minutes(haversine_km(a.latitude, a.longitude, b.latitude, b.longitude),
+                              DEFAULT_TRAVEL_SPEED_KMH)
+
+    for rank, place in enumerate(places):
+        best = None
+        for day, route in enumerate(routes):
+            if not route:
+                options = [(0.0, 0)]
+            else:
+                options = [(leg(place, route[0]), 0), (leg(route[-1], place), len(route))]
+                options += [(leg(a, place) + leg(place, b) - leg(a, b), p)
+                            for p, (a, b) in enumerate(zip(route, route[1:]), 1)]
+            added, position = min(options)
+            added += visit_minutes(place)
+            if minutes[day] + added <= day_minutes and (best is None or added < best[0]):
+                best = (added, day, position)
+        if best is not None:
+            added, day, position = best
+            routes[day].insert(position, place)
+            minutes[day] += added
+            score += place_score(rank, place.rating)
+    return score, sum(len(route) for route in routes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 3000])
+    parser.add_argument('--days', type=int, nargs='+', default=[1, 3, 7])
+    parser.add_argument('--day-minutes', type=float, default=480.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--matrix', action='store_true', help="precompute a haversine matrix per city first")
+    args = parser.parse_args()
+
+    print(f"{'places':>7}  {'days':>4}  {'elapsed':>11}  {'selected':>8}  {'score':>7}  {'fullest':>9}  "
+          f"{'baseline':>8}  {'(places)':>8}")
+    for size in args.sizes:
+        places = synthetic_places(size)
+        matrix = DistanceMatrix.compute(places, 'haversine') if args.matrix else None
+        for days in args.days:
+            runs = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = best_plan(places, days, args.day_minutes, planner=TravelPlanner(distances=matrix))
+                runs.append(((time.perf_counter() - start) * 1000, result))
+            elapsed_ms = statistics.median(elapsed_ms for elapsed_ms, _ in runs)
+            result = runs[0][1]
+            fullest = max((day["total_minutes"] for day in result.plan["days"].values()), default=0)
+            baseline_score, baseline_places = popular_first(places, days, args.day_minutes)
+            print(f"{size:>7}  {days:>4}  {elapsed_ms:8.1f} ms  {result.selected:>8}  {result.score:7.2f}  "
+                  f"{fullest:5.0f} min  {baseline_score:8.2f}  {baseline_places:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+PlaceTable Memory Benchmark
+Compares the memory held by a list of Place dataclasses with a PlaceTable
+holding the same attractions, and checks TravelPlanner gives the same routes
+
+Usage: python benchmarks/bench_place_table.py [--places 50000]
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from wayfare_scrapper.core import Place, TravelPlanner
+from wayfare_scrapper.place_table import PlaceTable
+
+CATEGORIES = ["Art Museums", "Churches & Cathedrals", "Parks", "Historic Sites", "Points of Interest & Landmarks"]
+WAYFARE_CATEGORIES = ["Major Museums", "Religious Sites", "Parks & Gardens", "Landmarks & Monuments"]
+HOURS = ["9:00 AM - 5:00 PM", "10:00 AM - 6:00 PM", "Closed", "Open 24 hours"]
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def make_places(count, seed=3):
+    rng = random.Random(seed)
+    hour_patterns = [{day: rng.choice(HOURS) for day in DAYS} for _ in range(40)]
+    places = []
+    for i in range(count):
+        name = f"Attraction {i}"
+        places.append(Place(
+            name=name,
+            address=f"{name}, Paris",
+            latitude=48.8 + rng.random() / 10,
+            longitude=2.3 + rng.random() / 10,
+            place_id=f"https://www.tripadvisor.com/Attraction_Review-g187147-d{i}",
+            rating=round(rng.uniform(3.5, 5.0), 1),
+            types=[rng.choice(WAYFARE_CATEGORIES), rng.choice(CATEGORIES)],
+            # Scraped files hold a fresh dict per record even when the hours repeat
+            opening_hours=dict(rng.choice(hour_patterns)),
+        ))
+    return places
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=50000)
+    args = parser.parse_args()
+
+    places, places_bytes = measure(lambda: make_places(args.places))
+    table, table_bytes = measure(lambda: PlaceTable.from_places(make_places(args.places)))
+    print(f"{args.places} places")
+    print(f"  list[Place]  {places_bytes / 2**20:8.1f} MiB  ({places_bytes / args.places:.0f} B/place)")
+    print(f"  PlaceTable   {table_bytes / 2**20:8.1f} MiB  ({table_bytes / args.places:.0f} B/place)")
+    print(f"  ratio        {places_bytes / table_bytes:8.1f}x")
+
+    planner = TravelPlanner(max_distance_km=2)
+    sample = 60
+    from_list = planner.create_travel_plan(places[:sample], max_places_per_day=4)
+    from_table = planner.create_travel_plan(PlaceTable.from_places(places[:sample]), max_places_per_day=4)
+    same = all([p.name for p in planner.optimize_route(from_list[day])]
+               == [p.name for p in planner.optimize_route(from_table[day])] for day in from_list)
+    print(f"  TravelPlanner results identical on a {sample}-place sample: {same and len(from_list) == len(from_table)}")
+
+
+if __name__ == "__main__":
+    main()
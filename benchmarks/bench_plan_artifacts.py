@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Plan Artifact Benchmark
+Builds plan artifacts for a synthetic store, then times preset requests
+answered from them against computing the same plans, plus non-preset
+requests that only reuse the artifact's distance matrix
+
+Usage: python benchmarks/bench_plan_artifacts.py [--per-city 1000] [--metric haversine] [--repeat 2000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from wayfare_scrapper.plan_artifacts import build_artifacts
+from wayfare_scrapper.planning import PlanningDataset, PlanRequest, plan_request
+from wayfare_scrapper.store import AttractionStore, record_row
+
+CITIES = {'Paris': (48.8566, 2.3522), 'Rome': (41.9028, 12.4964)}
+
+
+def build_store(path, per_city, seed=5):
+    rng = random.Random(seed)
+    with AttractionStore(path) as store:
+        for city, (lat, lon) in CITIES.items():
+            records = [{'name': f"{city} Attraction {i}", 'category': rng.choice(['Parks', 'Museums', 'Churches']),
+                        'rating': round(rng.uniform(3.5, 5.0), 1), 'popularity': i + 1,
+                        'latitude': lat + rng.uniform(-0.08, 0.08), 'longitude': lon + rng.uniform(-0.12, 0.12)}
+                       for i in range(per_city)]
+            store.import_rows(city, [record_row(record, city, position) for position, record in enumerate(records)])
+
+
+def per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--per-city', type=int, default=1000)
+    parser.add_argument('--metric', default='haversine', choices=['geodesic', 'haversine'])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'attractions.sqlite')
+        artifacts_dir = os.path.join(tmp, 'plan_artifacts')
+        build_store(store_path, args.per_city)
+        start = time.perf_counter()
+        build_artifacts(store_path, artifacts_dir, metric=args.metric, workers=1)
+        print(f"build  {(time.perf_counter() - start) / len(CITIES):8.2f} s per city ({args.metric})")
+
+        plain = PlanningDataset.from_store(store_path)
+        with_artifacts = PlanningDataset.from_store(store_path)
+        print(f"load   {with_artifacts.load_artifacts(artifacts_dir)}")
+
+        preset = PlanRequest('Paris', limit=20, max_distance_km=25, max_places_per_day=5, metric=args.metric)
+        other = PlanRequest('Paris', limit=25, max_distance_km=8, max_places_per_day=4, metric=args.metric)
+        assert plan_request(plain, preset) == plan_request(with_artifacts, preset)
+        slow_repeat = max(1, args.repeat // 100)
+        for label, request in (('preset', preset), ('non-preset', other)):
+            computed = per_call(lambda: plan_request(plain, request), slow_repeat)
+            answered = per_call(lambda: plan_request(with_artifacts, request),
+                                args.repeat if request is preset else slow_repeat)
+            print(f"{label:<11} computed {computed * 1e6:10.1f} us   with artifact {answered * 1e6:10.1f} us   "
+                  f"({computed / answered:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
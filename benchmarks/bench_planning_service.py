@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Planning Service Load Benchmark
+Starts the planning service on a synthetic attraction store and fires plan
+requests over keep-alive connections, reporting throughput, latency
+percentiles and how many requests were shed (503) or timed out (504)
+
+Usage: python benchmarks/bench_planning_service.py [--requests 2000] [--concurrency 64] [--workers 4] [--limit 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from wayfare_scrapper.service import PlanningService
+from wayfare_scrapper.store import AttractionStore, record_row
+
+CITIES = {'Paris': (48.8566, 2.3522), 'Rome': (41.9028, 12.4964), 'London': (51.5074, -0.1278)}
+
+
+def build_store(path, per_city, seed=5):
+    rng = random.Random(seed)
+    with AttractionStore(path) as store:
+        for city, (lat, lon) in CITIES.items():
+            records = [{'name': f"{city} Attraction {i}", 'category': rng.choice(['Parks', 'Museums', 'Churches']),
+                        'rating': round(rng.uniform(3.5, 5.0), 1), 'popularity': i + 1,
+                        'latitude': lat + rng.uniform(-0.08, 0.08), 'longitude': lon + rng.uniform(-0.12, 0.12)}
+                       for i in range(per_city)]
+            store.import_rows(city, [record_row(record, city, position) for position, record in enumerate(records)])
+
+
+async def client(port, bodies, latencies, statuses):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for body in bodies:
+            payload = json.dumps(body).encode('utf-8')
+            start = time.perf_counter()
+            writer.write(b"POST /plan HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(payload)}\r\n\r\n".encode('latin-1') + payload)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line == b'\r\n':
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def run(args, store_path):
+    service = PlanningService(store_path, workers=args.workers, max_pending=args.max_pending,
+                              default_deadline_ms=args.deadline_ms)
+    await service.start(port=0)
+    rng = random.Random(11)
+    bodies = [{'city': rng.choice(list(CITIES)), 'limit': args.limit, 'max_places_per_day': 4,
+               'max_distance_km': rng.choice([2, 5, 25]), 'metric': args.metric}
+              for _ in range(args.requests)]
+    latencies, statuses = [], Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(client(service.port, bodies[i::args.concurrency], latencies, statuses)
+                           for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    await service.close()
+
+    latencies.sort()
+    print(f"{args.requests} requests, {args.concurrency} connections, {service.workers} workers, "
+          f"limit {args.limit}, {args.metric}")
+    print(f"  throughput  {args.requests / elapsed:8.0f} req/s")
+    for label, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+        print(f"  {label}         {latencies[int(fraction * (len(latencies) - 1))] * 1000:8.1f} ms")
+    print(f"  statuses    {dict(sorted(statuses.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-pending', type=int)
+    parser.add_argument('--deadline-ms', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--per-city', type=int, default=2000)
+    parser.add_argument('--metric', default='geodesic', choices=['geodesic', 'haversine'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'attractions.sqlite')
+        build_store(store_path, args.per_city)
+        asyncio.run(run(args, store_path))
+
+
+if __name__ == "__main__":
+    main()
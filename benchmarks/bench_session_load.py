@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Plan Session Load Benchmark
+Times reopening a saved planning session from JSON (places only; distances
+and clustering recomputed) against the binary .wfs session file (places,
+distance matrix and clustering restored)
+
+Usage: python benchmarks/bench_session_load.py [--places 2000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict
+
+from wayfare_scrapper.core import Place, TravelPlanner
+from wayfare_scrapper.distance_matrix import DistanceMatrix
+from wayfare_scrapper.session import load_session, save_session
+
+from bench_place_table import make_places
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=2000)
+    parser.add_argument('--max-distance', type=float, default=1.0)
+    args = parser.parse_args()
+
+    places = make_places(args.places)
+    # Haversine keeps the one-off matrix build short; the stored format is the same for geodesic
+    start = time.perf_counter()
+    matrix = DistanceMatrix.compute(places, 'haversine')
+    build_seconds = time.perf_counter() - start
+    TravelPlanner(args.max_distance, matrix).group_nearby_places(places)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'session.json')
+        session_path = os.path.join(tmp, 'session.wfs')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump([asdict(place) for place in places], f, indent=2, ensure_ascii=False)
+        save_session(session_path, places, matrix)
+
+        start = time.perf_counter()
+        with open(json_path, 'r', encoding='utf-8') as f:
+            loaded = [Place(**data) for data in json.load(f)]
+        json_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        DistanceMatrix.compute(loaded, 'haversine')
+        recompute_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        restored, distances = load_session(session_path)
+        session_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        TravelPlanner(args.max_distance, distances).group_nearby_places(restored)
+        cluster_seconds = time.perf_counter() - start
+
+        print(f"{args.places} places, {len(matrix.values):,} pairwise distances")
+        print(f"  json load                {json_seconds * 1000:9.1f} ms  ({os.path.getsize(json_path) / 2**20:.1f} MiB)")
+        print(f"  + distance matrix        {recompute_seconds * 1000:9.1f} ms  (haversine; geodesic is over 100x slower)")
+        print(f"  session load             {session_seconds * 1000:9.1f} ms  ({os.path.getsize(session_path) / 2**20:.1f} MiB)")
+        print(f"  + cached clustering      {cluster_seconds * 1000:9.1f} ms")
+        print(f"  identical places: {restored == loaded}; one-off matrix build {build_seconds:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Benchmark
+Peak memory and time of a load-transform-dump pass over one large city file:
+json.load/json.dump versus the record-at-a-time reader and writer with each
+backend
+
+Usage: python benchmarks/bench_streaming.py [--entries 50000]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from wayfare_scrapper.data.streaming import JsonArrayWriter, iter_records, orjson
+
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def make_records(count, seed=11):
+    rng = random.Random(seed)
+    return [{
+        'name': f"Attraction {i}",
+        'category': rng.choice(["Art Museums", "Parks", "Churches & Cathedrals"]),
+        'detail_url': f"https://www.tripadvisor.com/Attraction_Review-g187147-d{i}",
+        'price': rng.choice(["", "€15"]),
+        'rating': round(rng.uniform(3.5, 5.0), 1),
+        'opening_hours': {day: "9:00 AM - 5:00 PM" for day in DAYS},
+    } for i in range(count)]
+
+
+def enrich(record):
+    record['country'] = 'France'
+    record['country_id'] = 'FR'
+
+
+def whole_file(source, target):
+    with open(source, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    for record in records:
+        enrich(record)
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def streamed(source, target, backend):
+    with open(target, 'w', encoding='utf-8') as f, JsonArrayWriter(f, backend=backend) as writer:
+        for record in iter_records(source, backend=backend):
+            enrich(record)
+            writer.write(record)
+
+
+def measure(label, fn, file_size):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} {elapsed:7.2f} s   peak {peak / 2**20:8.1f} MiB ({peak / file_size:.2f}x file)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'Paris_attractions_with_hours_and_price.json')
+        target = os.path.join(tmp, 'out.json')
+        with open(source, 'w', encoding='utf-8') as f:
+            json.dump(make_records(args.entries), f, ensure_ascii=False, indent=2)
+        size = os.path.getsize(source)
+        print(f"{args.entries} records, {size / 2**20:.1f} MiB")
+
+        measure("json.load + json.dump", lambda: whole_file(source, target), size)
+        expected = open(target, encoding='utf-8').read()
+        measure("streaming (json)", lambda: streamed(source, target, 'json'), size)
+        assert open(target, encoding='utf-8').read() == expected
+        if orjson is not None:
+            measure("streaming (orjson)", lambda: streamed(source, target, 'orjson'), size)
+            assert open(target, encoding='utf-8').read() == expected
+        else:
+            print("  orjson not installed; skipping the orjson backend")
+
+
+if __name__ == "__main__":
+    main()
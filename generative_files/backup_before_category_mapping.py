@@ -1,50 +1,29 @@
 #!/usr/bin/env python3
 """
 Backup Script for Category Mapping
-Creates a backup of all JSON files before applying category mapping
+Snapshots all JSON files before applying category mapping. Unchanged files
+are shared with earlier snapshots, so only files edited since the last
+backup are copied (see scripts/snapshots.py to list, diff and restore).
 """
 
-import os
-import json
-import shutil
-from datetime import datetime
+from wayfare_scrapper.snapshots import SnapshotStore
 
 def create_backup():
-    """Create a backup of all JSON files in the cities directory"""
-    cities_dir = 'cities'
-    backup_dir = f'backup_categories_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
-    
+    """Snapshot the city files; returns the snapshot id"""
     print("Category Mapping Backup Script")
     print("=" * 40)
-    print(f"Creating backup in: {backup_dir}")
-    
-    # Create backup directory
-    os.makedirs(backup_dir, exist_ok=True)
-    
-    backup_count = 0
-    total_size = 0
-    
-    for filename in os.listdir(cities_dir):
-        if filename.endswith('_attractions_with_hours_and_price.json'):
-            source_path = os.path.join(cities_dir, filename)
-            backup_path = os.path.join(backup_dir, filename)
-            
-            try:
-                # Copy the file
-                shutil.copy2(source_path, backup_path)
-                file_size = os.path.getsize(backup_path)
-                total_size += file_size
-                backup_count += 1
-                print(f"  ✓ Backed up: {filename} ({file_size:,} bytes)")
-            except Exception as e:
-                print(f"  ✗ Failed to backup {filename}: {e}")
-    
+
+    store = SnapshotStore()
+    manifest = store.create('cities', label='before-category-mapping')
+    stats = manifest['stats']
+    total_size = sum(entry['size'] for entry in manifest['files'].values())
+
     print(f"\n✅ Backup completed!")
-    print(f"Files backed up: {backup_count}")
-    print(f"Total size: {total_size:,} bytes")
-    print(f"Backup location: {backup_dir}")
-    
-    return backup_dir
+    print(f"Files backed up: {stats['files']}")
+    print(f"Total size: {total_size:,} bytes ({stats['bytes_copied']:,} bytes newly stored)")
+    print(f"Snapshot: {manifest['id']} in {store.store_dir}")
+
+    return manifest['id']
 
 def main():
     try:
@@ -52,14 +31,14 @@ def main():
         if response in ['n', 'no']:
             print("Skipping backup. Proceed with caution!")
             return
-        
-        backup_dir = create_backup()
-        print(f"\nYou can now safely run: python apply_category_mapping.py")
-        print(f"If something goes wrong, restore from: {backup_dir}")
-        
+
+        snapshot_id = create_backup()
+        print(f"\nYou can now safely run: python scripts/apply_category_mapping.py")
+        print(f"If something goes wrong, restore with: python scripts/snapshots.py restore {snapshot_id}")
+
     except KeyboardInterrupt:
         print("\nBackup cancelled.")
         return
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,22 +1,11 @@
-import os
-import json
+from wayfare_scrapper.batch import run_batch
+from wayfare_scrapper.transforms import CategoryScanTransform
 
 def main():
-    cities_dir = 'cities'
-    categories = set()
-    
-    for filename in os.listdir(cities_dir):
-        if filename.endswith('.json'):
-            file_path = os.path.join(cities_dir, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                for entry in data:
-                    category = entry.get('category', '')
-                    if category:  # Only add non-empty categories
-                        categories.add(category)
-            except Exception as e:
-                print(f"Error reading {filename}: {e}")
+    report = run_batch(CategoryScanTransform(), cities_dir='cities', progress=False)
+    for result in report.errors:
+        print(f"Error reading {result.filename}: {result.error}")
+    categories = set(report.collected('categories'))
     
     # Print sorted list of unique categories
     print("All unique category values found:")
@@ -26,4 +15,4 @@ def main():
     print(f"\nTotal unique categories: {len(categories)}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
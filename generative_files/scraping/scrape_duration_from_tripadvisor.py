@@ -10,6 +10,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from bs4 import BeautifulSoup
+from wayfare_scrapper.data.city_files import write_city_file
 
 def setup_chrome_driver(headless=True):
     """Setup Chrome driver with appropriate options"""
@@ -243,8 +244,7 @@ def main():
                             print(f"  Skipping entry {i+1}: No detail_url")
                     
                     # Save updated file
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, ensure_ascii=False, indent=2)
+                    write_city_file(file_path, data)
                     
                     print(f"\n✓ Updated {filename} with {updated_count} durations")
                     
@@ -5,6 +5,7 @@ import time
 import random
 import requests
 from bs4 import BeautifulSoup
+from wayfare_scrapper.data.city_files import write_city_file
 
 def extract_price_from_text(price_text):
     """Extract numerical price from text like 'From $36' or '$25'"""
@@ -190,8 +191,7 @@ def main():
             
             # Save the updated file
             if prices_updated > 0:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                write_city_file(file_path, data)
                 
                 print(f"✅ Updated {prices_updated} prices in {filename}")
                 total_files_processed += 1
@@ -8,6 +8,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from wayfare_scrapper.data.city_files import write_city_file
 
 def extract_price_from_text(price_text):
     """Extract numerical price from text like 'From $36' or '$25'"""
@@ -170,8 +171,7 @@ def main():
                 
                 # Save the updated file
                 if prices_updated > 0:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, ensure_ascii=False, indent=2)
+                    write_city_file(file_path, data)
                     
                     print(f"✅ Updated {prices_updated} prices in {filename}")
                     total_files_processed += 1
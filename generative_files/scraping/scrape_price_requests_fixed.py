@@ -7,6 +7,7 @@ import random
 from urllib.parse import urljoin
 import os
 from datetime import datetime
+from wayfare_scrapper.data.city_files import write_city_file
 
 # === CONFIG ===
 BASE_URL = "https://www.tripadvisor.co.uk"
@@ -175,8 +176,7 @@ def process_all_cities():
 
             # Save to the same file (overwrite)
             if prices_updated > 0:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(existing_data, f, ensure_ascii=False, indent=2)
+                write_city_file(file_path, existing_data)
                 log_and_print(f"💾 File updated: {file_path} ({prices_updated} prices updated)")
                 total_files_processed += 1
                 total_prices_updated += prices_updated
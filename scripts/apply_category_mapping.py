@@ -5,148 +5,41 @@ Adds wayfare_category and duration fields to JSON files based on category mappin
 """
 
 import os
-import json
-import re
-from wayfare_scrapper.data.category_mapping import get_category_mapping, get_category_summary, CATEGORY_MAPPING
+import sys
+from wayfare_scrapper.data.atomic import file_sha1
+from wayfare_scrapper.data.category_mapping import get_category_summary
+from wayfare_scrapper.data.category_matcher import get_category_matcher
+from wayfare_scrapper.batch import run_batch
+from wayfare_scrapper.data.remap import CategoryLocationIndex, mapping_version, remap_cities
+from wayfare_scrapper.transforms import CategoryMappingTransform
 
 
 def find_best_category_match(original_category):
     """Find the best matching category from the mapping, handling partial matches"""
-    if not original_category:
-        return None
-    
-    original_lower = original_category.lower().strip()
-    
-    # First try exact match
-    if original_category in CATEGORY_MAPPING:
-        return CATEGORY_MAPPING[original_category]
-    
-    # Try partial matches
-    for mapping_key, mapping_value in CATEGORY_MAPPING.items():
-        mapping_lower = mapping_key.lower()
-        
-        # Check if the original category contains key words from the mapping
-        if any(word in original_lower for word in mapping_lower.split() if len(word) > 3):
-            return mapping_value
-        
-        # Check if mapping key contains words from original category
-        if any(word in mapping_lower for word in original_lower.split() if len(word) > 3):
-            return mapping_value
-    
-    # Try fuzzy matching for common variations
-    fuzzy_matches = {
-        'museum': 'Major Museums',
-        'park': 'Parks & Nature', 
-        'garden': 'Parks & Nature',
-        'beach': 'Parks & Nature',
-        'castle': 'Cultural Sites',
-        'church': 'Religious Sites',
-        'cathedral': 'Religious Sites',
-        'temple': 'Religious Sites',
-        'mosque': 'Religious Sites',
-        'synagogue': 'Religious Sites',
-        'zoo': 'Zoos & Aquariums',
-        'aquarium': 'Zoos & Aquariums',
-        'theater': 'Entertainment',
-        'theatre': 'Entertainment',
-        'bar': 'Entertainment',
-        'club': 'Entertainment',
-        'restaurant': 'Entertainment',
-        'cafe': 'Entertainment',
-        'shopping': 'Shopping & Markets',
-        'market': 'Shopping & Markets',
-        'mall': 'Shopping & Markets',
-        'sport': 'Sports & Recreation',
-        'gym': 'Sports & Recreation',
-        'fitness': 'Sports & Recreation',
-        'tour': 'Tours & Activities',
-        'activity': 'Tours & Activities',
-        'spa': 'Wellness & Relaxation',
-        'bath': 'Wellness & Relaxation',
-        'monument': 'Landmarks & Monuments',
-        'statue': 'Landmarks & Monuments',
-        'fountain': 'Landmarks & Monuments',
-        'bridge': 'Landmarks & Monuments',
-        'tower': 'Landmarks & Monuments',
-        'landmark': 'Landmarks & Monuments',
-        'transport': 'Transportation',
-        'bus': 'Transportation',
-        'train': 'Transportation',
-        'metro': 'Transportation',
-        'subway': 'Transportation'
-    }
-    
-    for keyword, category in fuzzy_matches.items():
-        if keyword in original_lower:
-            # Find the mapping for this category
-            for mapping_key, mapping_value in CATEGORY_MAPPING.items():
-                if mapping_value['new_category'] == category:
-                    return mapping_value
-    
-    # Default fallback
-    return CATEGORY_MAPPING.get("Other", {"new_category": "Other", "duration": 60, "type": "other"})
+    # The matcher is compiled once per process and memoizes every category it resolves
+    return get_category_matcher().match(original_category)
 
 
-def apply_category_mapping_to_file(file_path):
-    """Apply category mapping to a single JSON file, adding new fields"""
-    try:
-        # Load the JSON file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        updated_count = 0
-        skipped_count = 0
-        original_categories = set()
-        new_categories = set()
-        unmatched_categories = set()
-        
-        # Process each entry
-        for entry in data:
-            original_category = entry.get('category', '')
-            if original_category:
-                original_categories.add(original_category)
-                
-                # Check if fields already exist
-                if 'wayfare_category' in entry and 'duration' in entry:
-                    skipped_count += 1
-                    continue
-                
-                # Find the best matching category
-                mapping = find_best_category_match(original_category)
-                
-                if mapping:
-                    # Add new fields
-                    entry['wayfare_category'] = mapping['new_category']
-                    entry['duration'] = mapping['duration']
-                    
-                    new_categories.add(mapping['new_category'])
-                    updated_count += 1
-                else:
-                    # Use default for unmatched categories
-                    default_mapping = CATEGORY_MAPPING.get("Other", {"new_category": "Other", "duration": 60, "type": "other"})
-                    entry['wayfare_category'] = default_mapping['new_category']
-                    entry['duration'] = default_mapping['duration']
-                    unmatched_categories.add(original_category)
-                    updated_count += 1
-        
-        # Save the updated file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return {
-            'filename': os.path.basename(file_path),
-            'updated_count': updated_count,
-            'skipped_count': skipped_count,
-            'original_categories': len(original_categories),
-            'new_categories': len(new_categories),
-            'original_categories_list': list(original_categories),
-            'new_categories_list': list(new_categories),
-            'unmatched_categories': list(unmatched_categories)
-        }
-        
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}")
-        return None
+def run_incremental(cities_dir):
+    """Re-apply only the categories whose mapping changed since the last run"""
+    print(f"Mapping version: {mapping_version()}")
+    summary = remap_cities(cities_dir)
+    
+    if summary['changed_categories']:
+        print(f"\n🔄 {len(summary['changed_categories'])} categories changed mapping:")
+        for category in summary['changed_categories'][:10]:
+            mapping = find_best_category_match(category)
+            print(f"  • {category} → {mapping['new_category']} ({mapping['duration']} min)")
+        if len(summary['changed_categories']) > 10:
+            print(f"  ... and {len(summary['changed_categories']) - 10} more")
+    else:
+        print("\nNo category mappings changed since the last run.")
+    
+    print(f"\nRecords touched: {summary['records_touched']} in {summary['files_touched']} files")
+    if summary['files_rescanned']:
+        print(f"Files mapped in full (new or edited since last run): {summary['files_rescanned']}")
+    for filename, error in summary['errors']:
+        print(f"  ✗ Failed to process {filename}: {error}")
 
 
 def main():
@@ -154,6 +47,11 @@ def main():
     
     print("Category Mapping Application Script")
     print("=" * 50)
+    
+    if '--incremental' in sys.argv[1:]:
+        run_incremental(cities_dir)
+        return
+    
     print("This script will ADD new fields to your JSON files:")
     print("  • wayfare_category: New standardized category")
     print("  • duration: Visit duration in minutes")
@@ -176,34 +74,25 @@ def main():
         print("\nOperation cancelled.")
         return
     
-    # Process all JSON files
-    results = []
-    total_files = 0
-    total_updated = 0
-    total_skipped = 0
-    all_unmatched = set()
+    # Process all JSON files, one city per worker process
+    report = run_batch(CategoryMappingTransform(), cities_dir=cities_dir)
+    totals = report.totals()
+    total_files = len(report.results)
+    total_updated = totals['mapped']
+    total_skipped = totals['mapping_skipped']
     
-    for filename in os.listdir(cities_dir):
-        if filename.endswith('_attractions_with_hours_and_price.json'):
-            file_path = os.path.join(cities_dir, filename)
-            total_files += 1
-            
-            print(f"\nProcessing {filename}...")
-            result = apply_category_mapping_to_file(file_path)
-            
-            if result:
-                results.append(result)
-                total_updated += result['updated_count']
-                total_skipped += result['skipped_count']
-                all_unmatched.update(result['unmatched_categories'])
-                print(f"  ✓ Updated {result['updated_count']} entries")
-                if result['skipped_count'] > 0:
-                    print(f"  ⏭️  Skipped {result['skipped_count']} entries (already have fields)")
-                print(f"  ✓ Original categories: {result['original_categories']} → New categories: {result['new_categories']}")
-                if result['unmatched_categories']:
-                    print(f"  ⚠️  Unmatched categories: {len(result['unmatched_categories'])}")
-            else:
-                print(f"  ✗ Failed to process {filename}")
+    location_index = CategoryLocationIndex.load(cities_dir)
+    file_categories = {}
+    for filename, locations, fingerprints in report.collected('category_locations'):
+        location_index.replace_file(filename, locations, fingerprints,
+                                    file_sha1(os.path.join(cities_dir, filename)))
+        file_categories[filename] = list(locations)
+    
+    # Remember where each category lives so later mapping changes can run with --incremental;
+    # after failures keep the old version so the next incremental run revisits every category
+    if not report.errors:
+        location_index.version = mapping_version()
+    location_index.save(cities_dir)
     
     # Print summary
     print("\n" + "=" * 50)
@@ -215,24 +104,23 @@ def main():
     
     # Show category transformation examples
     print("\n🔄 Category Transformation Examples:")
-    for result in results[:3]:  # Show first 3 files as examples
-        print(f"\n{result['filename']}:")
-        for orig_cat in result['original_categories_list'][:5]:  # Show first 5 categories
+    for filename in sorted(file_categories)[:3]:  # Show first 3 files as examples
+        original_categories = file_categories[filename]
+        print(f"\n{filename}:")
+        for orig_cat in original_categories[:5]:  # Show first 5 categories
             mapping = find_best_category_match(orig_cat)
             if mapping:
                 print(f"  • {orig_cat} → {mapping['new_category']} ({mapping['duration']} min)")
             else:
                 print(f"  • {orig_cat} → Other (60 min) [unmatched]")
-        if len(result['original_categories_list']) > 5:
-            print(f"  ... and {len(result['original_categories_list']) - 5} more categories")
+        if len(original_categories) > 5:
+            print(f"  ... and {len(original_categories) - 5} more categories")
     
-    # Show unmatched categories
-    if all_unmatched:
-        print(f"\n⚠️  Unmatched Categories ({len(all_unmatched)}):")
-        for unmatched in sorted(all_unmatched)[:10]:  # Show first 10
-            print(f"  • {unmatched}")
-        if len(all_unmatched) > 10:
-            print(f"  ... and {len(all_unmatched) - 10} more")
+    # Show files that could not be processed
+    if report.errors:
+        print(f"\n⚠️  Failed files ({len(report.errors)}):")
+        for result in report.errors:
+            print(f"  • {result.filename}: {result.error}")
     
     print(f"\n✅ Category mapping applied successfully!")
     print("New fields 'wayfare_category' and 'duration' have been added to all JSON files.")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Attraction Store CLI
+Builds the SQLite attraction store from cities/ and runs ad-hoc queries on it
+
+Usage:
+  python scripts/attraction_store.py import [--cities-dir cities] [--db attractions.sqlite]
+  python scripts/attraction_store.py query Rome --wayfare-category "Major Museums" --min-rating 4.5 \\
+      --near Pantheon --radius-km 2 --order-by distance
+"""
+
+import argparse
+
+from wayfare_scrapper.store import DEFAULT_STORE_PATH, ORDERINGS, AttractionStore
+
+
+def run_import(args):
+    with AttractionStore(args.db) as store:
+        imported = store.import_cities(args.cities_dir, cities=args.cities, workers=args.workers, force=args.force)
+        for city, records in sorted(imported.items()):
+            print(f"  ✓ {city}: {records} attractions")
+        print(f"\nImported {len(imported)} cities ({store.count()} attractions in {args.db}); "
+              f"unchanged files were skipped.")
+
+
+def run_query(args):
+    with AttractionStore(args.db, read_only=True) as store:
+        near = None
+        if args.near:
+            near = store.find(args.city, args.near)
+            if near is None:
+                print(f"✗ No attraction matching '{args.near}' in {args.city}")
+                return
+            if near.latitude is None or near.longitude is None:
+                print(f"✗ {near.name} in {args.city} has no coordinates")
+                return
+            print(f"📍 Near {near.name} ({near.latitude:.4f}, {near.longitude:.4f})")
+
+        results = store.query(city=args.city, category=args.category, wayfare_category=args.wayfare_category,
+                              min_rating=args.min_rating, near=near, radius_km=args.radius_km,
+                              name_contains=args.name, order_by=args.order_by, limit=args.limit)
+        for attraction in results:
+            details = [attraction.wayfare_category or attraction.category or '']
+            if attraction.rating is not None:
+                details.append(f"⭐ {attraction.rating}")
+            if attraction.distance_km is not None:
+                details.append(f"{attraction.distance_km:.2f} km")
+            print(f"  • {attraction.name} ({', '.join(detail for detail in details if detail)})")
+        print(f"\n{len(results)} attractions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the SQLite attraction store")
+    parser.add_argument('--db', default=DEFAULT_STORE_PATH, help=f"Store path (default: {DEFAULT_STORE_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="Import (changed) city files")
+    import_parser.add_argument('--cities-dir', default='cities')
+    import_parser.add_argument('--cities', nargs='+', help="Only import these cities (file name prefix)")
+    import_parser.add_argument('--workers', type=int, help="Number of parser processes (default: CPU count)")
+    import_parser.add_argument('--force', action='store_true', help="Re-import unchanged files too")
+    import_parser.set_defaults(func=run_import)
+
+    query_parser = subparsers.add_parser('query', help="Query attractions of a city")
+    query_parser.add_argument('city', help="City key, e.g. Rome or New_York_City")
+    query_parser.add_argument('--category', nargs='+', help="Original TripAdvisor categories")
+    query_parser.add_argument('--wayfare-category', nargs='+', help="Standardized wayfare categories")
+    query_parser.add_argument('--min-rating', type=float)
+    query_parser.add_argument('--name', help="Name substring")
+    query_parser.add_argument('--near', help="Name of an attraction to search around")
+    query_parser.add_argument('--radius-km', type=float)
+    query_parser.add_argument('--order-by', default='popularity', choices=sorted(ORDERINGS) + ['distance'])
+    query_parser.add_argument('--limit', type=int, default=20)
+    query_parser.set_defaults(func=run_query)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Batch Planner
+Reads plan requests as NDJSON (one JSON object per line: city, names or
+places, days, constraints, optional id) and streams plans back as NDJSON,
+planning in parallel worker processes
+
+Usage:
+  python scripts/batch_plan.py requests.ndjson -o plans.ndjson --workers 8
+  echo '{"id": "p1", "city": "Paris", "names": ["Louvre", "Eiffel Tower"], "days": 1}' | python scripts/batch_plan.py
+"""
+
+import argparse
+import json
+import sys
+import time
+from contextlib import ExitStack
+
+from wayfare_scrapper.batch_planning import BatchPlanner
+from wayfare_scrapper.data.atomic import AtomicWriter
+from wayfare_scrapper.plan_cache import DEFAULT_MAX_ENTRIES
+from wayfare_scrapper.planning import plan_summary
+from wayfare_scrapper.store import DEFAULT_STORE_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan NDJSON request streams in parallel")
+    parser.add_argument('input', nargs='?', default='-', help="NDJSON requests (default: stdin)")
+    parser.add_argument('-o', '--output', default='-', help="NDJSON results (default: stdout)")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help=f"Attraction store (default: {DEFAULT_STORE_PATH})")
+    parser.add_argument('--cities', nargs='+', help="Only load these cities from the store")
+    parser.add_argument('--workers', type=int, help="Planning worker processes (default: CPU count)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f"Plan cache entries per worker, 0 to disable (default: {DEFAULT_MAX_ENTRIES})")
+    parser.add_argument('--matrix-max-places', type=int, default=0,
+                        help="Share distance matrices for cities with at most this many places")
+    parser.add_argument('--matrix-metric', default='haversine', choices=['haversine', 'geodesic'],
+                        help="Metric of the shared matrices (default: haversine)")
+    parser.add_argument('--artifacts-dir', help="Answer preset requests from precomputed plan artifacts")
+    parser.add_argument('--unordered', action='store_true', help="Write results as they finish, not in input order")
+    parser.add_argument('--summary', action='store_true', help="Also print a day-by-day summary of each plan to stderr")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        source = sys.stdin if args.input == '-' else stack.enter_context(open(args.input, 'r', encoding='utf-8'))
+        if args.output == '-':
+            out = sys.stdout
+        else:
+            # The output file appears once the whole batch is written
+            writer = stack.enter_context(AtomicWriter())
+            out = stack.enter_context(writer.open(args.output, 'w'))
+        batch = stack.enter_context(BatchPlanner(args.store, args.cities, args.workers, args.cache_size,
+                                                 args.matrix_max_places, args.matrix_metric,
+                                                 args.artifacts_dir))
+        for result in batch.run(source, ordered=not args.unordered):
+            out.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')) + '\n')
+            if args.summary:
+                if 'plan' in result:
+                    plan = result['plan']
+                    print(f"\n🗺️ {result['id']}: {plan['city']}, {plan['total_places']} places, "
+                          f"{plan['total_days']} days", file=sys.stderr)
+                    print('\n'.join(plan_summary(plan)), file=sys.stderr)
+                else:
+                    print(f"\n✗ {result['id']}: {result['error']}", file=sys.stderr)
+        stats = batch.stats
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{stats['requests']} requests: {stats['planned']} planned, {stats['reused']} reused, "
+          f"{stats['errors']} errors in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Build Plan Artifacts
+Precomputes each city's distance matrix, clusterings and preset plans from
+the attraction store into plan_artifacts/ (cities whose artifact is still
+current are skipped). The planning service and batch planner load them with
+--artifacts-dir.
+
+Usage:
+  python scripts/build_plan_artifacts.py [--store attractions.sqlite] [--out plan_artifacts] [--cities Paris Rome]
+  python scripts/build_plan_artifacts.py --limits 10 20 --distances-km 5 25 --places-per-day 4 5 --metric haversine
+"""
+
+import argparse
+import time
+
+from wayfare_scrapper.distance_matrix import METRICS
+from wayfare_scrapper.plan_artifacts import (DEFAULT_ARTIFACTS_DIR, DEFAULT_DISTANCES_KM, DEFAULT_LIMITS,
+                                             DEFAULT_MATRIX_PLACES, DEFAULT_PLACES_PER_DAY, build_artifacts, presets)
+from wayfare_scrapper.store import DEFAULT_STORE_PATH, AttractionStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute per-city plan artifacts")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help=f"Attraction store (default: {DEFAULT_STORE_PATH})")
+    parser.add_argument('--out', default=DEFAULT_ARTIFACTS_DIR, help=f"Artifact directory (default: {DEFAULT_ARTIFACTS_DIR})")
+    parser.add_argument('--cities', nargs='+', help="Only these cities (store city names)")
+    parser.add_argument('--cities-dir', help="Import changed city files from this directory into the store first")
+    parser.add_argument('--limits', nargs='+', type=int, default=list(DEFAULT_LIMITS),
+                        help=f"Preset place counts (default: {' '.join(map(str, DEFAULT_LIMITS))})")
+    parser.add_argument('--distances-km', nargs='+', type=float, default=list(DEFAULT_DISTANCES_KM),
+                        help=f"Preset max distances (default: {' '.join(f'{d:g}' for d in DEFAULT_DISTANCES_KM)})")
+    parser.add_argument('--places-per-day', nargs='+', type=int, default=list(DEFAULT_PLACES_PER_DAY),
+                        help=f"Preset places per day (default: {' '.join(map(str, DEFAULT_PLACES_PER_DAY))})")
+    parser.add_argument('--metric', default='geodesic', choices=METRICS, help="Distance metric (default: geodesic)")
+    parser.add_argument('--matrix-places', type=int, default=DEFAULT_MATRIX_PLACES,
+                        help=f"Most popular places covered by each matrix (default: {DEFAULT_MATRIX_PLACES})")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Rebuild artifacts that are still current")
+    args = parser.parse_args()
+
+    if args.cities_dir:
+        with AttractionStore(args.store) as store:
+            imported = store.import_cities(args.cities_dir, cities=args.cities, workers=args.workers)
+        print(f"Imported {len(imported)} changed city files")
+
+    start = time.perf_counter()
+    statuses = build_artifacts(args.store, args.out, args.cities,
+                               presets(args.limits, args.distances_km, args.places_per_day),
+                               args.metric, args.matrix_places, args.workers, args.force)
+    for city, status in sorted(statuses.items()):
+        mark = '✓' if status.startswith('built') or status == 'current' else '✗'
+        print(f"  {mark} {city}: {status}")
+    built = sum(status.startswith('built') for status in statuses.values())
+    print(f"\nBuilt {built} of {len(statuses)} artifacts in {args.out} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Convert City Files to Columnar Format
+Writes a memory-mappable .wfc copy next to (or away from) each city JSON file.
+Files whose JSON content has not changed since the last conversion are skipped.
+"""
+
+import argparse
+import os
+
+from wayfare_scrapper.data.columnar import convert_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert city JSON files to the columnar .wfc format")
+    parser.add_argument('cities_dir', nargs='?', default='cities', help="Directory of city JSON files (default: cities)")
+    parser.add_argument('--out-dir', help="Where to write .wfc files (default: next to the JSON files)")
+    parser.add_argument('--cities', nargs='+', help="Only convert these cities (file name prefix, e.g. New_York_City)")
+    parser.add_argument('--workers', type=int, help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Rebuild even when the JSON is unchanged")
+    args = parser.parse_args()
+
+    results, errors = convert_directory(args.cities_dir, out_dir=args.out_dir, cities=args.cities,
+                                        workers=args.workers, force=args.force)
+    for out_path, converted in results:
+        status = "converted" if converted else "up to date"
+        print(f"  {os.path.basename(out_path):<60} {status}")
+    for filename, error in errors:
+        print(f"✗ {filename}: {error}")
+
+    converted = sum(1 for _, was_converted in results if was_converted)
+    print(f"\n{len(results)} files, {converted} converted, {len(errors)} errors")
+
+
+if __name__ == "__main__":
+    main()
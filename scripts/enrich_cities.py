@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Enrich City Files
+Runs several enrichment stages over the city files in a single pass. Each city file is read once, every record flows through the selected stages
+and the file is written back at most once (atomically), instead of one full
+read/rewrite per maintenance script.
+
+Usage:
+  python scripts/enrich_cities.py                          # all stages
+  python scripts/enrich_cities.py --stages country city_id category_mapping
+  python scripts/enrich_cities.py --stages merge_fields validate_detail_urls --source-dir updated_cities
+"""
+
+import argparse
+import os
+
+from wayfare_scrapper.data.atomic import FSYNC_MODES, file_sha1
+from wayfare_scrapper.data.remap import CategoryLocationIndex, mapping_version
+from wayfare_scrapper.pipeline import order_stages, run_pipeline, stage_totals
+from wayfare_scrapper.transforms import (
+    CategoryMappingTransform,
+    CityIdTransform,
+    CountryTransform,
+    DetailUrlValidationTransform,
+    FieldMergeTransform,
+    PopularityTransform,
+)
+
+DEFAULT_STAGES = ['country', 'city_id', 'popularity', 'category_mapping']
+AVAILABLE_STAGES = DEFAULT_STAGES + ['merge_fields', 'validate_detail_urls']
+
+
+def build_stages(names, args):
+    factories = {
+        'country': lambda: CountryTransform(),
+        'city_id': lambda: CityIdTransform.from_cities_json(args.cities_json),
+        'popularity': lambda: PopularityTransform(raw_dir=args.raw_dir),
+        'category_mapping': lambda: CategoryMappingTransform(),
+        'merge_fields': lambda: FieldMergeTransform(source_dir=args.source_dir, fields=args.fields),
+        'validate_detail_urls': lambda: DetailUrlValidationTransform(),
+    }
+    return [factories[name]() for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply enrichment stages to every city file in one pass")
+    parser.add_argument('--stages', nargs='+', choices=AVAILABLE_STAGES, default=DEFAULT_STAGES,
+                        help=f"Stages to run (default: {' '.join(DEFAULT_STAGES)})")
+    parser.add_argument('--cities-dir', default='cities')
+    parser.add_argument('--cities', nargs='+', help="Only these city keys (e.g. Paris New_York_City)")
+    parser.add_argument('--cities-json', default='cities.json', help="Source of city ids for the city_id stage")
+    parser.add_argument('--raw-dir', default='raw_data', help="Ranked raw files for the popularity stage")
+    parser.add_argument('--source-dir', default='updated_cities', help="Source files for the merge_fields stage")
+    parser.add_argument('--fields', nargs='+', default=['detail_url'], help="Fields copied by merge_fields")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help="Run every stage but write nothing")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Process records one at a time (bounded memory for very large city files)")
+    parser.add_argument('--fsync', choices=FSYNC_MODES, help="Durability of file replacement (default: batch)")
+    args = parser.parse_args()
+
+    stages = build_stages(args.stages, args)
+    report = run_pipeline(stages, cities_dir=args.cities_dir, cities=args.cities,
+                          workers=args.workers, write=not args.dry_run, streaming=args.streaming,
+                          fsync=args.fsync)
+
+    if 'category_mapping' in args.stages and not args.dry_run:
+        # Keep the reverse index in sync so apply_category_mapping.py --incremental stays valid
+        location_index = CategoryLocationIndex.load(args.cities_dir)
+        for filename, locations, fingerprints in report.collected('category_locations'):
+            location_index.replace_file(filename, locations, fingerprints,
+                                        file_sha1(os.path.join(args.cities_dir, filename)))
+        if not report.errors:
+            location_index.version = mapping_version()
+        location_index.save(args.cities_dir)
+
+    totals = report.totals()
+    print("\n" + "=" * 50)
+    print(f"📊 SUMMARY ({' -> '.join(stage.name for stage in order_stages(stages))})")
+    print("=" * 50)
+    print(f"Files processed: {totals['files']}  written: {totals['written']}  "
+          f"skipped: {len(report.skipped)}  errors: {len(report.errors)}")
+    print(f"Records: {totals['records']}  changed: {totals['changed']}  ({report.seconds:.1f}s)")
+    for name, counts in stage_totals(report, stages).items():
+        print(f"  • {name}: {counts['changed']} records changed, {counts['skipped_files']} files skipped")
+
+    mismatches = report.collected('mismatches')
+    if mismatches:
+        print(f"\n⚠️  {len(mismatches)} detail_url mismatches (run generative_files/utils/validate_detail_urls.py for the full report)")
+    for result in report.errors:
+        print(f"✗ {result.filename}: {result.error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,51 +2,10 @@ import os
 import json
 import requests
 from bs4 import BeautifulSoup
-import re
-import urllib.parse
 import time
 import random
-
-
-def normalize_text(text):
-    """Normalize text for comparison"""
-    if not text:
-        return ""
-    
-    text = text.lower()
-    text = text.replace('_', ' ')
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = text.strip()
-    
-    common_words = ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by']
-    words = text.split()
-    words = [word for word in words if word not in common_words]
-    
-    return ' '.join(words)
-
-
-def extract_name_from_url(url):
-    """Extract attraction name from TripAdvisor URL"""
-    if not url:
-        return ""
-    
-    try:
-        parsed = urllib.parse.urlparse(url)
-        path = urllib.parse.unquote(parsed.path)
-        
-        if 'Reviews-' in path:
-            reviews_part = path.split('Reviews-')[-1]
-            if reviews_part.endswith('.html'):
-                reviews_part = reviews_part[:-5]
-            
-            parts = reviews_part.split('-')
-            if parts:
-                return parts[0]
-        
-        return ""
-    except:
-        return ""
+from wayfare_scrapper.matching import NameIndex, extract_name_from_url, word_overlap_ok
+from wayfare_scrapper.data.city_files import write_city_file
 
 
 def validate_url_correctness(attraction_name, url):
@@ -54,26 +13,11 @@ def validate_url_correctness(attraction_name, url):
     if not url or not attraction_name:
         return False
     
-    try:
-        url_name = extract_name_from_url(url)
-        if not url_name:
-            return False
-        
-        normalized_attraction = normalize_text(attraction_name)
-        normalized_url = normalize_text(url_name)
-        
-        if not normalized_attraction or not normalized_url:
-            return False
-        
-        attraction_words = set(normalized_attraction.split())
-        url_words = set(normalized_url.split())
-        overlap = attraction_words.intersection(url_words)
-        
-        min_overlap = min(len(attraction_words), len(url_words)) * 0.5
-        return len(overlap) >= min_overlap
-        
-    except Exception as e:
+    url_name = extract_name_from_url(url)
+    if not url_name:
         return False
+    
+    return word_overlap_ok(attraction_name, url_name)
 
 
 def get_city_urls():
@@ -151,8 +95,8 @@ def scrape_city_urls(city_name, max_pages=3):
     return all_attraction_links
 
 
-def fix_city_urls(city_name):
-    """Fix URLs for a specific city"""
+def fix_city_urls(city_name, min_score=0.85):
+    """Fix URLs for a specific city, accepting fuzzy name matches scoring at least `min_score`"""
     print(f"\nProcessing {city_name}...")
     
     # Load city data
@@ -175,6 +119,9 @@ def fix_city_urls(city_name):
         print(f"  No URLs scraped for {city_name}")
         return 0
     
+    # Index scraped names once so each lookup only touches candidates sharing trigrams
+    scraped_index = NameIndex(scraped_urls.keys(), scraped_urls.values())
+    
     # Fix URLs
     fixed_count = 0
     for i, entry in enumerate(data):
@@ -184,20 +131,15 @@ def fix_city_urls(city_name):
         if name and current_url:
             if not validate_url_correctness(name, current_url):
                 # Try to find correct URL from scraped data
-                normalized_name = normalize_text(name)
-                
-                for scraped_name, scraped_url in scraped_urls.items():
-                    normalized_scraped = normalize_text(scraped_name)
-                    if normalized_name == normalized_scraped:
-                        data[i]['detail_url'] = scraped_url
-                        fixed_count += 1
-                        print(f"    Fixed: '{name}' -> {scraped_url}")
-                        break
+                match = scraped_index.best(name, min_score=min_score)
+                if match:
+                    data[i]['detail_url'] = match.value
+                    fixed_count += 1
+                    print(f"    Fixed: '{name}' -> {match.value} (score {match.score:.2f})")
     
     # Save the updated file
     if fixed_count > 0:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_city_file(file_path, data)
         print(f"  ✓ Fixed {fixed_count} URLs in {city_name}")
     else:
         print(f"  No URLs could be fixed in {city_name}")
@@ -5,6 +5,8 @@ Generate a 4-day Paris travel plan and save to paris_plan.json
 
 import json
 from wayfare_scrapper import PlaceScraper, TravelPlanner, Place
+from wayfare_scrapper.data.atomic import atomic_write_text
+from wayfare_scrapper.planning import build_plan, plan_summary
 
 def generate_paris_plan():
     """Generate a comprehensive 4-day Paris travel plan"""
@@ -51,76 +53,25 @@ def generate_paris_plan():
     
     print(f"\n✅ Found coordinates for {len(places)} places")
     
-    # Create travel plan for 4 days
-    travel_plan = planner.create_travel_plan(places, max_places_per_day=5)
-    
-    # Prepare data for JSON output
-    plan_data = {
-        "city": "Paris",
-        "total_places": len(places),
-        "total_days": len(travel_plan),
-        "max_distance_km": 25.0,
-        "max_places_per_day": 5,
-        "days": {}
-    }
-    
-    # Process each day
-    for day_num, day_places in travel_plan.items():
-        # Optimize route for this day
-        optimized_route = planner.optimize_route(day_places)
-        
-        day_data = {
-            "day_number": day_num,
-            "total_places": len(optimized_route),
-            "total_distance_km": 0,
-            "places": []
-        }
-        
-        # Calculate distances and prepare place data
-        for i, place in enumerate(optimized_route):
-            place_data = {
-                "order": i + 1,
-                "name": place.name,
-                "address": place.address,
-                "latitude": place.latitude,
-                "longitude": place.longitude,
-                "rating": place.rating,
-                "distance_from_previous": 0
-            }
-            
-            # Calculate distance from previous place
-            if i > 0:
-                distance_km = planner.calculate_distance(optimized_route[i-1], place)
-                place_data["distance_from_previous"] = round(distance_km, 1)
-                day_data["total_distance_km"] += distance_km
-            
-            day_data["places"].append(place_data)
-        
-        day_data["total_distance_km"] = round(day_data["total_distance_km"], 1)
-        plan_data["days"][day_num] = day_data
+    # Create the travel plan once (grouping and route order); the JSON and the summary both use it
+    plan_data = build_plan(places, max_distance_km=25.0, max_places_per_day=5, city="Paris", planner=planner)
     
     # Save to JSON file
-    with open('paris_plan.json', 'w', encoding='utf-8') as f:
-        json.dump(plan_data, f, indent=2, ensure_ascii=False)
+    atomic_write_text('paris_plan.json', json.dumps(plan_data, indent=2, ensure_ascii=False))
     
     print(f"\n📄 Travel plan saved to 'paris_plan.json'")
     
     # Display summary
     print(f"\n🗺️ PARIS TRAVEL PLAN SUMMARY")
-    print(f"Total places: {len(places)}")
-    print(f"Total days: {len(travel_plan)}")
+    print(f"Total places: {plan_data['total_places']}")
+    print(f"Total days: {plan_data['total_days']}")
     print(f"Max distance between places: 25 km")
     print(f"Max places per day: 5")
     
-    for day_num, day_places in travel_plan.items():
-        optimized_route = planner.optimize_route(day_places)
-        total_distance = 0
-        for i in range(len(optimized_route) - 1):
-            total_distance += planner.calculate_distance(optimized_route[i], optimized_route[i + 1])
-        
-        print(f"\n📅 Day {day_num} ({len(optimized_route)} places, {total_distance:.1f} km):")
-        for i, place in enumerate(optimized_route, 1):
-            print(f"  {i}. {place.name}")
+    for line in plan_summary(plan_data):
+        if line.startswith("📅"):
+            print()
+        print(line)
     
     return plan_data
 
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Merge City Files
+Copies selected fields from one directory of city JSON files into another,
+joining attractions on normalized name plus city
+"""
+
+import argparse
+from wayfare_scrapper.merge import merge_directories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge fields between city JSON directories by attraction name")
+    parser.add_argument('source_dir', help="Directory holding the corrected data (e.g. updated_cities)")
+    parser.add_argument('target_dir', nargs='?', default='cities', help="Directory to update (default: cities)")
+    parser.add_argument('--fields', nargs='+', default=['detail_url'], help="Fields to copy (default: detail_url)")
+    parser.add_argument('--cities', nargs='+', help="Only merge these cities (file name prefix, e.g. New_York_City)")
+    parser.add_argument('--workers', type=int, help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--dry-run', action='store_true', help="Report changes without writing files")
+    args = parser.parse_args()
+
+    results, errors = merge_directories(args.target_dir, args.source_dir, fields=args.fields,
+                                        workers=args.workers, dry_run=args.dry_run, cities=args.cities)
+
+    print(f"{'File':<60} {'Records':>8} {'Matched':>8} {'Updated':>8}")
+    for result in results:
+        marker = " *" if result['written'] else ""
+        print(f"{result['filename']:<60} {result['records']:>8} {result['matched']:>8} {result['updated']:>8}{marker}")
+        if result['source_duplicates']:
+            print(f"  ⚠️  {result['source_duplicates']} duplicate names in source were ignored")
+    for filename, error in errors:
+        print(f"✗ {filename}: {error}")
+
+    written = sum(1 for result in results if result['written'])
+    print(f"\n{len(results)} files merged, {written} rewritten (*), {len(errors)} errors")
+    if args.dry_run:
+        print("Dry run: no files were written.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Planning Service
+Serves travel plans over HTTP from the SQLite attraction store
+
+  python scripts/planning_service.py --port 8080 --workers 8
+  curl -s localhost:8080/plan -d '{"city": "Paris", "limit": 20, "max_places_per_day": 4}'
+  curl -s -X POST localhost:8080/reload
+"""
+
+import argparse
+from wayfare_scrapper.plan_cache import DEFAULT_MAX_ENTRIES
+from wayfare_scrapper.service import DEFAULT_DEADLINE_MS, DEFAULT_PORT, serve
+from wayfare_scrapper.store import DEFAULT_STORE_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio HTTP service for travel plans")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help=f"Attraction store (default: {DEFAULT_STORE_PATH})")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument('--cities', nargs='+', help="Only serve these cities (store city names, e.g. New_York_City)")
+    parser.add_argument('--workers', type=int, help="Planning worker processes (default: CPU count)")
+    parser.add_argument('--max-pending', type=int, help="Requests in flight before new ones get 503 (default: 4 per worker)")
+    parser.add_argument('--deadline-ms', type=int, default=DEFAULT_DEADLINE_MS,
+                        help=f"Default per-request deadline (default: {DEFAULT_DEADLINE_MS})")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f"Plan cache entries per worker, 0 to disable (default: {DEFAULT_MAX_ENTRIES})")
+    parser.add_argument('--cache-dir', help="Directory for the on-disk plan cache tier shared by all workers")
+    parser.add_argument('--shared', action='store_true',
+                        help="Load the dataset once and share it with the workers through shared memory")
+    parser.add_argument('--dataset-file',
+                        help="Share the dataset through mmap'd files instead (implies --shared); "
+                             "version n of data.wfd is written to data.n.wfd")
+    parser.add_argument('--matrix-max-places', type=int, default=0,
+                        help="With --shared, also publish distance matrices for cities with at most this many places")
+    parser.add_argument('--matrix-metric', default='haversine', choices=['haversine', 'geodesic'],
+                        help="Metric of the published matrices; requests with the same metric use them (default: haversine)")
+    parser.add_argument('--reload-interval', type=float, default=0,
+                        help="Check the store for changes every N seconds and hot-reload the dataset (default: off; "
+                             "POST /reload always works)")
+    parser.add_argument('--cities-dir',
+                        help="With --reload-interval, first import changed city files from this directory into the store")
+    parser.add_argument('--artifacts-dir',
+                        help="Answer preset requests from precomputed plan artifacts (scripts/build_plan_artifacts.py)")
+    args = parser.parse_args()
+
+    serve(args.store, args.host, args.port, cities=args.cities, workers=args.workers,
+          max_pending=args.max_pending, default_deadline_ms=args.deadline_ms,
+          cache_size=args.cache_size, cache_dir=args.cache_dir, shared=args.shared,
+          dataset_path=args.dataset_file, matrix_max_places=args.matrix_max_places, matrix_metric=args.matrix_metric,
+          reload_interval=args.reload_interval, cities_dir=args.cities_dir,
+          artifacts_dir=args.artifacts_dir)
+
+
+if __name__ == "__main__":
+    main()
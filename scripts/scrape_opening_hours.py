@@ -8,6 +8,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from wayfare_scrapper.data.city_files import write_city_file
 
 # === CONFIG ===
 WAIT_SECONDS = 15
@@ -168,8 +169,7 @@ def process_all_cities():
 
                 # Save to the same file (overwrite)
                 if hours_updated > 0:
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        json.dump(existing_data, f, ensure_ascii=False, indent=2)
+                    write_city_file(file_path, existing_data)
                     log_and_print(f"💾 File updated: {file_path} ({hours_updated} hours updated)")
                     total_files_processed += 1
                     total_hours_updated += hours_updated
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+City File Snapshots
+Creates, lists, diffs and restores content-addressed snapshots of cities/
+
+  python scripts/snapshots.py create --label before-category-mapping
+  python scripts/snapshots.py diff <id>                 # snapshot vs. current files
+  python scripts/snapshots.py diff <id> --records       # plus per-attraction changes
+  python scripts/snapshots.py restore <id> --cities Paris
+"""
+
+import argparse
+from wayfare_scrapper.data.city_files import city_filename
+from wayfare_scrapper.snapshots import DEFAULT_STORE_DIR, SnapshotStore
+
+
+def cmd_create(store, args):
+    manifest = store.create(args.cities_dir, label=args.label)
+    stats = manifest['stats']
+    print(f"Snapshot {manifest['id']}: {stats['files']} files, {stats['rehashed']} re-read, "
+          f"{stats['new_blobs']} new blobs ({stats['bytes_copied']:,} bytes copied)")
+
+
+def cmd_list(store, args):
+    snapshots = store.list()
+    if not snapshots:
+        print(f"No snapshots in {store.store_dir}")
+    for manifest in snapshots:
+        print(f"{manifest['id']:<45} {manifest['created'][:19]}  {manifest['file_count']:>4} files  {manifest['source_dir']}")
+
+
+def cmd_diff(store, args):
+    diff = store.diff(args.old, args.new, directory=args.cities_dir if not args.new else None)
+    for label, filenames in (('+', diff.added), ('-', diff.removed), ('M', diff.modified)):
+        for filename in filenames:
+            print(f"{label} {filename}")
+            if args.records and label == 'M':
+                changes = store.diff_records(args.old, filename, args.new,
+                                             directory=args.cities_dir if not args.new else None)
+                for name in changes['added']:
+                    print(f"    + {name}")
+                for name in changes['removed']:
+                    print(f"    - {name}")
+                for name, fields in changes['changed']:
+                    print(f"    M {name}: {', '.join(fields)}")
+    print(f"\n{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.modified)} modified, "
+          f"{diff.unchanged} unchanged")
+
+
+def cmd_restore(store, args):
+    files = [city_filename(city) for city in args.cities] if args.cities else None
+    result = store.restore(args.snapshot, args.target_dir, files=files, delete_extra=args.delete_extra)
+    for filename in result['restored']:
+        print(f"  ✓ Restored: {filename}")
+    for filename in result['deleted']:
+        print(f"  ✗ Deleted: {filename}")
+    print(f"\n{len(result['restored'])} restored, {len(result['unchanged'])} already matched, "
+          f"{len(result['deleted'])} deleted")
+
+
+def cmd_delete(store, args):
+    for snapshot_id in args.snapshots:
+        store.delete(snapshot_id)
+        print(f"Deleted snapshot {snapshot_id}")
+    print(f"Removed {store.gc()} unreferenced blobs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed snapshots of the city JSON files")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help=f"Snapshot store directory (default: {DEFAULT_STORE_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create = subparsers.add_parser('create', help="Snapshot the current city files")
+    create.add_argument('--cities-dir', default='cities', help="Directory of city JSON files (default: cities)")
+    create.add_argument('--label', help="Label appended to the snapshot id")
+    create.set_defaults(func=cmd_create)
+
+    subparsers.add_parser('list', help="List snapshots").set_defaults(func=cmd_list)
+
+    diff = subparsers.add_parser('diff', help="Compare two snapshots, or a snapshot with the current files")
+    diff.add_argument('old', help="Snapshot id")
+    diff.add_argument('new', nargs='?', help="Second snapshot id (default: current files)")
+    diff.add_argument('--cities-dir', help="Directory to compare against (default: the snapshot's source)")
+    diff.add_argument('--records', action='store_true', help="Show per-attraction changes of modified files")
+    diff.set_defaults(func=cmd_diff)
+
+    restore = subparsers.add_parser('restore', help="Restore files from a snapshot")
+    restore.add_argument('snapshot', help="Snapshot id")
+    restore.add_argument('--target-dir', help="Directory to restore into (default: the snapshot's source)")
+    restore.add_argument('--cities', nargs='+', help="Only restore these cities (file name prefix, e.g. New_York_City)")
+    restore.add_argument('--delete-extra', action='store_true', help="Remove city files that are not in the snapshot")
+    restore.set_defaults(func=cmd_restore)
+
+    delete = subparsers.add_parser('delete', help="Delete snapshots and the blobs only they referenced")
+    delete.add_argument('snapshots', nargs='+', help="Snapshot ids")
+    delete.set_defaults(func=cmd_delete)
+
+    args = parser.parse_args()
+    args.func(SnapshotStore(args.store), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ import json
 import os
 from typing import List, Dict
 from wayfare_scrapper import PlaceScraper, TravelPlanner, Place
+from wayfare_scrapper.distance_matrix import DistanceMatrix
+from wayfare_scrapper.session import SESSION_SUFFIX, load_session, save_session
+from wayfare_scrapper.store import DEFAULT_STORE_PATH, AttractionStore
 
 class TravelPlannerApp:
     def __init__(self):
@@ -16,7 +19,9 @@ class TravelPlannerApp:
         self.places = []
         
     def load_places_from_file(self, filename: str) -> bool:
-        """Load places from a JSON file"""
+        """Load places from a JSON file, or a .wfs session file with its precomputed distances"""
+        if filename.endswith(SESSION_SUFFIX):
+            return self.load_session(filename)
         try:
             with open(filename, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -41,8 +46,52 @@ class TravelPlannerApp:
             print(f"Invalid JSON in {filename}")
             return False
     
+    def load_places_from_store(self, db_path: str, city: str, **filters) -> bool:
+        """Add places from the SQLite attraction store (see scripts/attraction_store.py)"""
+        if not os.path.exists(db_path):
+            print(f"Store {db_path} not found. Build it with: python scripts/attraction_store.py import")
+            return False
+        with AttractionStore(db_path, read_only=True) as store:
+            places = store.places(city=city, **filters)
+        if not places:
+            print(f"No attractions with coordinates found for {city}")
+            return False
+        self.places.extend(places)
+        print(f"Loaded {len(places)} places for {city} from {db_path}")
+        return True
+    
+    def load_session(self, filename: str) -> bool:
+        """Restore places plus their distance matrix and clusterings from a session file"""
+        try:
+            self.places, self.planner.distances = load_session(filename)
+        except FileNotFoundError:
+            print(f"File {filename} not found")
+            return False
+        except ValueError as e:
+            print(e)
+            return False
+        print(f"Loaded {len(self.places)} places and their distances from {filename}")
+        return True
+    
+    def save_session(self, filename: str) -> bool:
+        """Save places plus their distance matrix (computed now if needed) to a session file"""
+        if len(self.places) > 200:
+            print(f"Computing distances between {len(self.places)} places...")
+        self.planner.distances = DistanceMatrix.for_places(self.places, self.planner.distances)
+        # Cache the clustering for the current distance setting in the session too
+        self.planner.group_nearby_places(self.places)
+        try:
+            save_session(filename, self.places, self.planner.distances)
+        except OSError as e:
+            print(f"Error saving to {filename}: {e}")
+            return False
+        print(f"Saved {len(self.places)} places and their distances to {filename}")
+        return True
+    
     def save_places_to_file(self, filename: str) -> bool:
-        """Save places to a JSON file"""
+        """Save places to a JSON file, or to a .wfs session file"""
+        if filename.endswith(SESSION_SUFFIX):
+            return self.save_session(filename)
         try:
             data = []
             for place in self.places:
@@ -265,19 +314,20 @@ class TravelPlannerApp:
             print("5. Show current places")
             print("6. Remove a place")
             print("7. Create travel plan")
-            print("8. Exit")
+            print("8. Load places from attraction store")
+            print("9. Exit")
             
-            choice = input("\nSelect an option (1-8): ").strip()
+            choice = input("\nSelect an option (1-9): ").strip()
             
             if choice == '1':
                 self.add_places_manually()
             elif choice == '2':
                 self.add_places_from_list()
             elif choice == '3':
-                filename = input("Enter filename: ").strip()
+                filename = input(f"Enter filename (.json, or {SESSION_SUFFIX} session): ").strip()
                 self.load_places_from_file(filename)
             elif choice == '4':
-                filename = input("Enter filename: ").strip()
+                filename = input(f"Enter filename (.json, or {SESSION_SUFFIX} session): ").strip()
                 self.save_places_to_file(filename)
             elif choice == '5':
                 self.show_places()
@@ -286,6 +336,13 @@ class TravelPlannerApp:
             elif choice == '7':
                 self.create_travel_plan()
             elif choice == '8':
+                city = input("City (e.g. Rome, New_York_City): ").strip()
+                try:
+                    limit = int(input("Number of most popular places [10]: ") or "10")
+                except ValueError:
+                    limit = 10
+                self.load_places_from_store(DEFAULT_STORE_PATH, city, limit=limit)
+            elif choice == '9':
                 print("👋 Thanks for using the Travel Planner!")
                 break
             else:
@@ -1,7 +1,38 @@
-from .core import Place, PlaceScraper, TravelPlanner
+from typing import TYPE_CHECKING
+
+# Public names are resolved on first attribute access (PEP 562), so
+# `import wayfare_scrapper.data.category_mapping` or a worker process that
+# only needs one submodule does not import the rest of the package
+_EXPORTS = {
+    "Place": ".core",
+    "PlaceScraper": ".core",
+    "TravelPlanner": ".core",
+    "PlaceTable": ".place_table",
+    "PlaceRow": ".place_table",
+}
 
 __all__ = [
     "Place",
     "PlaceScraper",
     "TravelPlanner",
+    "PlaceTable",
+    "PlaceRow",
 ]
+
+if TYPE_CHECKING:
+    from .core import Place, PlaceScraper, TravelPlanner
+    from .place_table import PlaceRow, PlaceTable
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,170 @@
+"""
+Anytime Planning
+Plans under a time budget. build_plan_anytime first builds a complete plan
+the usual way (greedy day grouping, nearest-neighbour routes), then improves
+the day routes with 2-opt and relocate moves, and solves small days exactly,
+until nothing improves or the budget runs out. It always returns the best
+plan found so far together with its quality: the total distance, a lower
+bound for the same day grouping (each day's minimum spanning tree, or its
+exact optimum once solved) and the gap between the two.
+
+  result = build_plan_anytime(places, time_budget_ms=50, city='Paris')
+  result.plan        # paris_plan.json layout
+  result.metadata()  # {'status': 'optimal', 'total_distance_km': ..., 'gap': 0.0, ...}
+
+A progress callback receives a metadata snapshot after the first plan and
+after every improvement; returning False from it stops the search there.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .core import Place, TravelPlanner
+from .planning import DEFAULT_MAX_DISTANCE_KM, DEFAULT_MAX_PLACES_PER_DAY, add_day_minutes, plan_layout
+from .route_search import (EXACT_MAX_PLACES, exact_path, exact_seconds, local_search, nearest_neighbor,
+                           path_length, spanning_tree_length, square_distances, sub_distances)
+
+ProgressCallback = Callable[[Dict], Optional[bool]]
+
+
+@dataclass
+class AnytimeResult:
+    """Best plan found and how good it is.
+
+    status is 'optimal' (every day route is the shortest possible),
+    'local_optimum' (no move improves any day), 'deadline' (the budget ran
+    out first) or 'stopped' (the progress callback asked to stop).
+    """
+    plan: Dict
+    status: str
+    elapsed_ms: float
+    time_budget_ms: Optional[float]
+    initial_distance_km: float
+    total_distance_km: float
+    lower_bound_km: float
+    days: int
+    optimal_days: int
+    improvements: int
+
+    @property
+    def gap(self) -> float:
+        """Share of the total distance that a better route order could at most save"""
+        if self.total_distance_km <= 0:
+            return 0.0
+        return max(0.0, (self.total_distance_km - self.lower_bound_km) / self.total_distance_km)
+
+    def metadata(self) -> Dict:
+        return {
+            'status': self.status,
+            'elapsed_ms': round(self.elapsed_ms, 2),
+            'time_budget_ms': None if self.time_budget_ms is None else round(self.time_budget_ms, 2),
+            'initial_distance_km': round(self.initial_distance_km, 3),
+            'total_distance_km': round(self.total_distance_km, 3),
+            'lower_bound_km': round(self.lower_bound_km, 3),
+            'gap': round(self.gap, 4),
+            'days': self.days,
+            'optimal_days': self.optimal_days,
+            'improvements': self.improvements,
+        }
+
+
+class _DayRoute:
+    """One day's places, their distances and the best order found"""
+
+    def __init__(self, places: Sequence[Place], planner: TravelPlanner):
+        self.places = places
+        self.n = len(places)
+        self.d = square_distances(places, planner)
+        # The same first route as TravelPlanner.optimize_route
+        self.order = nearest_neighbor(self.d, self.n) if self.n else []
+        self.length = path_length(self.order, self.d, self.n)
+        self.bound = self.length if self.n <= 2 else spanning_tree_length(self.d, self.n)
+        # A path as short as the spanning tree cannot be beaten
+        self.optimal = self.length <= self.bound + 1e-9
+        self.bound = min(self.bound, self.length)
+
+    def route(self) -> List[Place]:
+        return [self.places[i] for i in self.order]
+
+
+def build_plan_anytime(places: Sequence[Place], time_budget_ms: Optional[float] = None,
+                       max_distance_km: float = DEFAULT_MAX_DISTANCE_KM,
+                       max_places_per_day: int = DEFAULT_MAX_PLACES_PER_DAY, city: Optional[str] = None,
+                       planner: Optional[TravelPlanner] = None,
+                       on_progress: Optional[ProgressCallback] = None, day_minutes: Optional[float] = None,
+                       travel_speed_kmh: Optional[float] = None) -> AnytimeResult:
+    """Plan like planning.build_plan, improving the routes until done or time_budget_ms is spent.
+
+    The first complete plan is always built, even past the budget; without a
+    budget the search runs until no day route improves.
+    """
+    start = time.monotonic()
+    deadline = start + time_budget_ms / 1000 if time_budget_ms is not None else None
+    planner = planner or TravelPlanner(max_distance_km=max_distance_km)
+    planner.max_distance_km = max_distance_km
+
+    travel_plan = planner.create_travel_plan(places, max_places_per_day, day_minutes, travel_speed_kmh)
+    days = {day_num: _DayRoute(day_places, planner) for day_num, day_places in travel_plan.items()}
+    initial_distance_km = sum(day.length for day in days.values())
+    improvements = 0
+
+    def result(status: str) -> AnytimeResult:
+        return AnytimeResult(
+            plan=None, status=status, elapsed_ms=(time.monotonic() - start) * 1000,
+            time_budget_ms=time_budget_ms, initial_distance_km=initial_distance_km,
+            total_distance_km=sum(day.length for day in days.values()),
+            lower_bound_km=sum(day.bound for day in days.values()), days=len(days),
+            optimal_days=sum(day.optimal for day in days.values()), improvements=improvements)
+
+    def finish(status: str) -> AnytimeResult:
+        final = result(status)
+        routes = {day_num: day.route() for day_num, day in days.items()}
+        final.plan = plan_layout(routes, planner, len(places), max_distance_km, max_places_per_day, city)
+        if day_minutes is not None:
+            add_day_minutes(final.plan, routes, day_minutes, travel_speed_kmh)
+        return final
+
+    def report(phase: str) -> bool:
+        """Whether to keep searching"""
+        if on_progress is None:
+            return True
+        return on_progress(dict(result('running').metadata(), phase=phase)) is not False
+
+    def improve(day: _DayRoute, order: List[int]) -> bool:
+        """Keep a better order; whether to keep searching"""
+        nonlocal improvements
+        length = path_length(order, day.d, day.n)
+        if length >= day.length - 1e-9:
+            return True
+        day.order, day.length = order, length
+        improvements += 1
+        if day.length <= day.bound + 1e-9:
+            day.optimal, day.bound = True, day.length
+        return report('improving')
+
+    if not report('initial'):
+        return finish('stopped')
+    # Days with the most room for improvement first, so a short budget goes where it matters
+    pending = sorted((day for day in days.values() if not day.optimal), key=lambda day: day.bound - day.length)
+    # Local search first: it is cheap and finds most of the savings on every day
+    for day in pending:
+        if day.optimal:
+            continue
+        order = list(day.order)
+        finished = local_search(order, day.d, day.n, deadline)
+        if not improve(day, order):
+            return finish('stopped')
+        if not finished:
+            return finish('deadline')
+    # Then prove (or find) the optimum of every day small enough to solve exactly, while time allows
+    for day in pending:
+        if day.optimal or day.n > EXACT_MAX_PLACES:
+            continue
+        if deadline is not None and time.monotonic() + exact_seconds(day.n) > deadline:
+            return finish('deadline')
+        order = [day.order[i] for i in exact_path(sub_distances(day.d, day.n, day.order), day.n)]
+        day.optimal, day.bound = True, path_length(order, day.d, day.n)
+        if not improve(day, order):
+            return finish('stopped')
+    return finish('optimal' if all(day.optimal for day in days.values()) else 'local_optimum')
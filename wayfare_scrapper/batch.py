@@ -0,0 +1,261 @@
+"""
+Batch Runner for City Files
+Fans city files out over a process pool, runs a per-record transform on each
+one, writes back files that changed and aggregates per-file results
+"""
+
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data.atomic import AtomicWriter
+from .data.city_files import city_from_filename, list_city_files, load_city_file, write_city_file
+from .data.streaming import JsonArrayWriter, iter_records
+
+
+class SkipFile(Exception):
+    """Raised from RecordTransform.begin_file to leave a city file untouched"""
+
+
+@dataclass
+class FileContext:
+    """Per-file state handed to every transform hook"""
+    path: str
+    filename: str
+    city: str
+    position: int = 0
+    records: int = 0
+    stats: Counter = field(default_factory=Counter)
+    collected: Dict[str, List[Any]] = field(default_factory=dict)
+    messages: List[str] = field(default_factory=list)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    def log(self, message: str):
+        """Queue a message; it is printed by the parent process once the file finishes"""
+        self.messages.append(message)
+
+    def collect(self, key: str, value: Any):
+        """Add a value to a per-run collection (merged across files in the report)"""
+        self.collected.setdefault(key, []).append(value)
+
+
+class RecordTransform:
+    """Base class for per-record city file transforms.
+
+    Subclasses override `transform`, returning True when a record changed, and
+    optionally `begin_file`/`end_file`. Instances are pickled to worker
+    processes, so keep attributes to plain data. `requires` names stages that
+    must run before this one when both are part of the same Pipeline.
+    """
+
+    name = 'transform'
+    read_only = False
+    requires: Tuple[str, ...] = ()
+
+    def begin_file(self, ctx: FileContext):
+        pass
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        raise NotImplementedError
+
+    def end_file(self, ctx: FileContext):
+        pass
+
+
+@dataclass
+class FileResult:
+    filename: str
+    city: str
+    records: int = 0
+    changed: int = 0
+    written: bool = False
+    skipped: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    stats: Counter = field(default_factory=Counter)
+    collected: Dict[str, List[Any]] = field(default_factory=dict)
+    messages: List[str] = field(default_factory=list)
+    # (temp_path, path) pairs written by a worker and awaiting the parent's batched fsync + rename
+    pending: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class BatchReport:
+    results: List[FileResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def errors(self) -> List[FileResult]:
+        return [result for result in self.results if result.error]
+
+    @property
+    def skipped(self) -> List[FileResult]:
+        return [result for result in self.results if result.skipped]
+
+    @property
+    def processed(self) -> List[FileResult]:
+        return [result for result in self.results if not result.error and not result.skipped]
+
+    def totals(self) -> Counter:
+        """Sum of record/changed counts and every transform stat over processed files"""
+        totals = Counter()
+        for result in self.processed:
+            totals['files'] += 1
+            totals['records'] += result.records
+            totals['changed'] += result.changed
+            totals['written'] += int(result.written)
+            totals.update(result.stats)
+        return totals
+
+    def collected(self, key: str) -> List[Any]:
+        """Every value collected under `key`, in file order"""
+        values = []
+        for result in self.results:
+            values.extend(result.collected.get(key, []))
+        return values
+
+
+def _stream_file(path: str, transform: RecordTransform, ctx: FileContext, result: FileResult,
+                 writer: Optional[AtomicWriter]):
+    """Transform records as they are parsed, writing each to a temp file that replaces the original if anything changed.
+
+    Memory stays bounded by one record plus whatever state the transform keeps.
+    """
+    pending = writer.open(path) if writer else None
+    records_out = JsonArrayWriter(pending.file) if pending else None
+    try:
+        for position, record in enumerate(iter_records(path)):
+            ctx.position = position
+            if transform.transform(record, ctx):
+                result.changed += 1
+            if records_out:
+                records_out.write(record)
+            result.records += 1
+        ctx.records = result.records
+        transform.end_file(ctx)
+    except BaseException:
+        if pending:
+            pending.abort()
+        raise
+
+    if pending:
+        if not result.changed:
+            pending.abort()
+            return
+        records_out.close()
+        result.written = pending.finish()
+
+
+def process_file(path: str, transform: RecordTransform, write: bool = True, streaming: bool = False,
+                 writer: Optional[AtomicWriter] = None) -> FileResult:
+    """Run a transform over one city file and write it back if any record changed.
+
+    With streaming=True records are read and written one at a time instead of
+    loading the whole file. Writes go through `writer` (one that flushes
+    right away is used when none is given).
+    """
+    if writer is None:
+        with AtomicWriter() as own_writer:
+            return process_file(path, transform, write, streaming, own_writer)
+
+    filename = os.path.basename(path)
+    ctx = FileContext(path=path, filename=filename, city=city_from_filename(filename))
+    result = FileResult(filename=filename, city=ctx.city)
+    start = time.perf_counter()
+
+    try:
+        transform.begin_file(ctx)
+        if streaming:
+            _stream_file(path, transform, ctx, result, writer if write and not transform.read_only else None)
+        else:
+            records = load_city_file(path)
+            for position, record in enumerate(records):
+                ctx.position = position
+                if transform.transform(record, ctx):
+                    result.changed += 1
+            result.records = ctx.records = len(records)
+            transform.end_file(ctx)
+
+            if result.changed and write and not transform.read_only:
+                result.written = write_city_file(path, records, writer)
+    except SkipFile as e:
+        result.skipped = str(e)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+    result.seconds = time.perf_counter() - start
+    result.stats = ctx.stats
+    result.collected = ctx.collected
+    result.messages = ctx.messages
+    return result
+
+
+def _process_file_worker(path: str, transform: RecordTransform, write: bool, streaming: bool,
+                         fsync: Optional[str]) -> FileResult:
+    """process_file in a pool worker: batched writes are handed back to the parent to fsync and rename"""
+    writer = AtomicWriter(fsync, batch_size=None)
+    try:
+        result = process_file(path, transform, write, streaming, writer)
+    except BaseException:
+        writer.discard()
+        raise
+    result.pending = writer.take_pending()
+    return result
+
+
+def _print_progress(done: int, total: int, result: FileResult):
+    if result.error:
+        status = f"✗ {result.error}"
+    elif result.skipped:
+        status = f"⏭️  skipped: {result.skipped}"
+    else:
+        status = f"✓ {result.changed}/{result.records} records changed" + (" (written)" if result.written else "")
+    print(f"[{done}/{total}] {result.filename}: {status}")
+    for message in result.messages:
+        print(f"    {message}")
+
+
+def run_batch(transform: RecordTransform, cities_dir: str = 'cities', paths: Optional[List[str]] = None,
+              cities: Optional[List[str]] = None, workers: Optional[int] = None, write: bool = True,
+              progress: bool = True, streaming: bool = False, fsync: Optional[str] = None) -> BatchReport:
+    """Run `transform` over every city file, one file per worker process.
+
+    `paths` overrides directory discovery. With workers=1 files are processed
+    in this process, which keeps tracebacks simple when debugging a transform.
+    streaming=True processes each file record by record (see process_file).
+    Changed files are replaced atomically; `fsync` picks the durability mode
+    (see data/atomic.py), and in 'batch' mode workers' files are fsynced and
+    renamed together by this process.
+    """
+    if paths is None:
+        paths = list_city_files(cities_dir, cities)
+
+    report = BatchReport()
+    start = time.perf_counter()
+    total = len(paths)
+
+    with AtomicWriter(fsync) as writer:
+        if workers == 1 or total <= 1:
+            for done, path in enumerate(paths, 1):
+                result = process_file(path, transform, write, streaming, writer)
+                report.results.append(result)
+                if progress:
+                    _print_progress(done, total, result)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_process_file_worker, path, transform, write, streaming, writer.fsync)
+                           for path in paths]
+                for done, future in enumerate(as_completed(futures), 1):
+                    result = future.result()
+                    writer.adopt(result.pending)
+                    result.pending = []
+                    report.results.append(result)
+                    if progress:
+                        _print_progress(done, total, result)
+
+    report.results.sort(key=lambda result: result.filename)
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,176 @@
+"""
+Batch Planning
+Plans a stream of requests, one JSON object per line (PlanRequest fields plus
+an optional "id"), in parallel worker processes and yields one result per
+request. The attraction store is loaded once and published to shared memory
+for the workers; identical requests in a batch are planned once and their
+result reused.
+
+  with BatchPlanner('attractions.sqlite', workers=8) as batch:
+      for result in batch.run(open('requests.ndjson')):
+          print(result['id'], result.get('plan', result.get('error')))
+"""
+
+import json
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Deque, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from .plan_cache import DEFAULT_MAX_ENTRIES, PlanCache
+from .planning import PlanningDataset, PlanRequest, plan_request
+from .shared_dataset import PublishedDataset, attach_dataset, publish_dataset
+from .store import DEFAULT_STORE_PATH
+
+QUEUE_PER_WORKER = 4
+
+# Worker process state, set once by _init_worker
+_dataset: Optional[PlanningDataset] = None
+_cache: Optional[PlanCache] = None
+
+
+def _init_worker(attach_args: Optional[Dict], cache_size: int, artifacts_dir: Optional[str]):
+    global _dataset, _cache
+    _dataset = attach_dataset(**attach_args) if attach_args else PlanningDataset({})
+    if artifacts_dir is not None:
+        _dataset.load_artifacts(artifacts_dir)
+    _cache = PlanCache(cache_size) if cache_size else None
+
+
+def _plan_worker(request: PlanRequest) -> Dict:
+    return plan_request(_dataset, request, _cache)
+
+
+def parse_request(line: str, number: int) -> Tuple[object, PlanRequest]:
+    """(request id, PlanRequest) of one NDJSON line; the id defaults to the line number"""
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("Plan request must be a JSON object")
+    request_id = data.pop('id', number)
+    try:
+        return request_id, PlanRequest.from_dict(data)
+    except ValueError as e:
+        raise ValueError(f"{e} (request {request_id})") from None
+
+
+class BatchPlanner:
+    """Parallel planner for request streams; use as a context manager"""
+
+    def __init__(self, store_path: str = DEFAULT_STORE_PATH, cities: Optional[Sequence[str]] = None,
+                 workers: Optional[int] = None, cache_size: int = DEFAULT_MAX_ENTRIES,
+                 matrix_max_places: int = 0, matrix_metric: str = 'haversine', artifacts_dir: Optional[str] = None):
+        # Without a store only requests with explicit places can be planned
+        if os.path.exists(store_path):
+            self.dataset = PlanningDataset.from_store(store_path, cities)
+        else:
+            self.dataset = PlanningDataset({})
+        if artifacts_dir is not None:
+            self.dataset.load_artifacts(artifacts_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.published: Optional[PublishedDataset] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self._cache = PlanCache(cache_size) if cache_size else None
+        if self.workers > 1:
+            if self.dataset.tables:
+                self.published = publish_dataset(self.dataset, matrix_max_places=matrix_max_places,
+                                                 matrix_metric=matrix_metric)
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                            initargs=(self.published.attach_args() if self.published else None,
+                                                      cache_size, artifacts_dir))
+        # Results of recent requests by their canonical JSON, so duplicates are planned once
+        self._recent: 'OrderedDict[str, Future]' = OrderedDict()
+        self.stats: Dict[str, int] = {'requests': 0, 'planned': 0, 'reused': 0, 'errors': 0}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.published is not None:
+            self.published.close()
+            self.published = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _submit(self, request: PlanRequest) -> Future:
+        key = json.dumps(request.to_dict(), sort_keys=True)
+        future = self._recent.get(key)
+        if future is not None:
+            self._recent.move_to_end(key)
+            self.stats['reused'] += 1
+            return future
+        if self.pool is not None:
+            future = self.pool.submit(_plan_worker, request)
+        else:
+            future = Future()
+            try:
+                future.set_result(plan_request(self.dataset, request, self._cache))
+            except Exception as e:
+                future.set_exception(e)
+        self.stats['planned'] += 1
+        self._recent[key] = future
+        while len(self._recent) > max(self.cache_size, self.workers * QUEUE_PER_WORKER):
+            self._recent.popitem(last=False)
+        return future
+
+    def _error(self, request_id, message: str) -> Dict:
+        self.stats['errors'] += 1
+        return {'id': request_id, 'error': message}
+
+    def _result(self, request_id, future: Future) -> Dict:
+        try:
+            return {'id': request_id, 'plan': future.result()}
+        except KeyError as e:
+            return self._error(request_id, f"Unknown city {e}")
+        except Exception as e:
+            return self._error(request_id, f"{type(e).__name__}: {e}")
+
+    def run(self, lines: Iterable[str], ordered: bool = True) -> Iterator[Dict]:
+        """{'id', 'plan'} or {'id', 'error'} per non-blank line.
+
+        Results come in input order (ordered=True) or as they finish; at most
+        QUEUE_PER_WORKER requests per worker are in flight, so input is read
+        lazily and memory stays flat on long streams.
+        """
+        window = self.workers * QUEUE_PER_WORKER
+        in_flight: Deque[Tuple[object, Future]] = deque()
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            self.stats['requests'] += 1
+            try:
+                request_id, request = parse_request(line, number)
+            except ValueError as e:
+                # json.JSONDecodeError is a ValueError too
+                in_flight.append((number, self._error(number, str(e))))
+            else:
+                if request.places is None and request.city not in self.dataset.tables:
+                    in_flight.append((request_id, self._error(request_id, f"Unknown city '{request.city}'")))
+                else:
+                    in_flight.append((request_id, self._submit(request)))
+            yield from self._drain(in_flight, ordered, block=len(in_flight) >= window)
+        while in_flight:
+            yield from self._drain(in_flight, ordered, block=True)
+
+    def _drain(self, in_flight: Deque, ordered: bool, block: bool) -> Iterator[Dict]:
+        """Yield finished results (waiting for at least one when block is set)"""
+        def done(entry) -> bool:
+            return not isinstance(entry[1], Future) or entry[1].done()
+
+        if ordered:
+            while in_flight and (done(in_flight[0]) or block):
+                request_id, outcome = in_flight.popleft()
+                block = False
+                yield self._result(request_id, outcome) if isinstance(outcome, Future) else outcome
+            return
+        if block and not any(done(entry) for entry in in_flight):
+            wait([outcome for _, outcome in in_flight], return_when=FIRST_COMPLETED)
+        finished = [entry for entry in in_flight if done(entry)]
+        for entry in finished:
+            in_flight.remove(entry)
+            request_id, outcome = entry
+            yield self._result(request_id, outcome) if isinstance(outcome, Future) else outcome
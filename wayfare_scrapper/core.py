@@ -1,12 +1,22 @@
-import requests
 import json
 import time
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
 import os
 from dataclasses import dataclass
-from geopy import distance
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from .day_packing import pack_days
+from .distance_matrix import DistanceMatrix, place_key
+from .plan_cache import PlanCache, plan_key
+from .visit_time import visit_minutes
+
+# requests and geopy are imported on first use: planning, data maintenance and
+# worker processes that never scrape or geocode should not pay their import time
+
+
+def _geodesic():
+    """geopy's geodesic distance, imported on first use"""
+    from geopy.distance import geodesic
+    return geodesic
+
 
 @dataclass
 class Place:
@@ -22,10 +32,19 @@ class Place:
 class PlaceScraper:
     def __init__(self, google_api_key: Optional[str] = None):
         self.google_api_key = google_api_key
-        self.geolocator = Nominatim(user_agent="travel_planner")
+        self._geolocator = None
+    
+    @property
+    def geolocator(self):
+        """Nominatim geocoder, created (and geopy imported) on first use"""
+        if self._geolocator is None:
+            from geopy.geocoders import Nominatim
+            self._geolocator = Nominatim(user_agent="travel_planner")
+        return self._geolocator
         
     def get_coordinates_from_address(self, address: str) -> Optional[Tuple[float, float]]:
         """Get coordinates from address using Nominatim (free geocoding service)"""
+        from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
         try:
             location = self.geolocator.geocode(address)
             if location:
@@ -41,6 +60,7 @@ class PlaceScraper:
             print("Google API key not provided. Using fallback geocoding.")
             return self._fallback_place_search(query)
         
+        import requests
         base_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
         params = {
             'query': query,
@@ -98,6 +118,7 @@ class PlaceScraper:
         if not self.google_api_key:
             return None
             
+        import requests
         url = "https://maps.googleapis.com/maps/api/place/details/json"
         params = {
             'place_id': place_id,
@@ -114,23 +135,73 @@ class PlaceScraper:
             return None
 
 class TravelPlanner:
-    def __init__(self, max_distance_km: float = 50.0):
+    """Groups places into days and orders each day's route.
+
+    Methods take a list of Place objects or a PlaceTable (whose rows expose
+    the same attributes); results hold the same kind of objects. With a
+    DistanceMatrix, distances between the places it covers are looked up
+    instead of computed, and clusterings of its full place list are cached.
+    With a PlanCache, create_travel_plan and optimize_route return stored
+    results for the same places and settings without computing anything;
+    load_artifact() adds a city's precomputed matrix, plans and routes.
+    """
+
+    def __init__(self, max_distance_km: float = 50.0, distances: Optional[DistanceMatrix] = None,
+                 cache: Optional[PlanCache] = None):
         self.max_distance_km = max_distance_km
+        self.distances = distances
+        self.cache = cache
+    
+    def load_artifact(self, artifact):
+        """Use a precomputed plan_artifacts.PlanArtifact: its distance matrix and clusterings (unless a
+        matrix is already set) and, through the plan cache, its stored day groupings and routes"""
+        if self.distances is None:
+            self.distances = artifact.matrix
+        if self.cache is None:
+            self.cache = PlanCache(0)
+        self.cache.pin(artifact.entries)
+    
+    def solver_settings(self) -> Dict:
+        """Settings that change results, as part of plan cache keys"""
+        return {'max_distance_km': self.max_distance_km,
+                'metric': self.distances.metric if self.distances is not None else 'geodesic'}
+    
+    def _cache_lookup(self, kind: str, places: Sequence[Place], **settings):
+        """(key, positions, cached value); key is None when the cache is off or places repeat"""
+        if self.cache is None:
+            return None, None, None
+        positions = {place_key(place): i for i, place in enumerate(places)}
+        if len(positions) != len(places):
+            return None, None, None
+        key = plan_key(kind, places, **settings, **self.solver_settings())
+        return key, positions, self.cache.get(key)
     
     def calculate_distance(self, place1: Place, place2: Place) -> float:
         """Calculate distance between two places in kilometers"""
+        if self.distances is not None:
+            known = self.distances.lookup(place1, place2)
+            if known is not None:
+                return known
         coords1 = (place1.latitude, place1.longitude)
         coords2 = (place2.latitude, place2.longitude)
-        return distance.geodesic(coords1, coords2).kilometers
+        return _geodesic()(coords1, coords2).kilometers
     
-    def group_nearby_places(self, places: List[Place]) -> List[List[Place]]:
+    def group_nearby_places(self, places: Sequence[Place]) -> List[List[Place]]:
         """Group places that are close to each other"""
         if not places:
             return []
         
         # Sort places by latitude to improve clustering
         sorted_places = sorted(places, key=lambda p: (p.latitude, p.longitude))
+        coordinates = [(p.latitude, p.longitude) for p in sorted_places]
         
+        matrix = self.distances
+        positions = matrix.indices(sorted_places) if matrix is not None else None
+        full_list = positions is not None and len(set(positions)) == len(matrix) == len(positions)
+        if full_list and self.max_distance_km in matrix.groupings:
+            return [[matrix.places[i] for i in group] for group in matrix.groupings[self.max_distance_km]]
+        
+        geodesic = _geodesic() if positions is None else None
         groups = []
         used_places = set()
         
@@ -147,37 +218,68 @@ class TravelPlanner:
                 if j in used_places or i == j:
                     continue
                     
-                distance_km = self.calculate_distance(place, other_place)
+                if positions is not None:
+                    distance_km = matrix.between(positions[i], positions[j])
+                else:
+                    distance_km = geodesic(coordinates[i], coordinates[j]).kilometers
                 if distance_km <= self.max_distance_km:
                     current_group.append(other_place)
                     used_places.add(j)
             
             groups.append(current_group)
         
+        if full_list:
+            matrix.groupings[self.max_distance_km] = [matrix.indices(group) for group in groups]
         return groups
     
-    def create_travel_plan(self, places: List[Place], max_places_per_day: int = 5) -> Dict[int, List[Place]]:
-        """Create a travel plan with places grouped by day"""
+    def create_travel_plan(self, places: Sequence[Place], max_places_per_day: int = 5,
+                           day_minutes: Optional[float] = None,
+                           travel_speed_kmh: Optional[float] = None) -> Dict[int, List[Place]]:
+        """Create a travel plan with places grouped by day.
+
+        With day_minutes, days are filled by time instead of by count: visit
+        durations of the places' categories plus travel at travel_speed_kmh
+        (see day_packing.py); max_places_per_day does not apply.
+        """
+        settings = {'max_places_per_day': max_places_per_day}
+        if day_minutes is not None:
+            # The days depend on each place's visit duration, not only on its types
+            settings.update(day_minutes=day_minutes, travel_speed_kmh=travel_speed_kmh,
+                            visit_minutes=[visit_minutes(place) for place in places])
+        key, positions, cached = self._cache_lookup('travel_plan', places, **settings)
+        if cached is not None:
+            return {day: [places[i] for i in indices] for day, indices in enumerate(cached, 1)}
+        
         groups = self.group_nearby_places(places)
         
         travel_plan = {}
         day = 1
         
         for group in groups:
-            # Split large groups into multiple days if needed
-            for i in range(0, len(group), max_places_per_day):
-                day_group = group[i:i + max_places_per_day]
+            if day_minutes is not None:
+                day_groups = pack_days(group, day_minutes, travel_speed_kmh, self)
+            else:
+                # Split large groups into multiple days if needed
+                day_groups = [group[i:i + max_places_per_day] for i in range(0, len(group), max_places_per_day)]
+            for day_group in day_groups:
                 travel_plan[day] = day_group
                 day += 1
         
+        if key is not None:
+            self.cache.put(key, [[positions[place_key(place)] for place in day_places]
+                                 for day_places in travel_plan.values()])
         return travel_plan
     
-    def optimize_route(self, places: List[Place]) -> List[Place]:
+    def optimize_route(self, places: Sequence[Place]) -> List[Place]:
         """Simple route optimization using nearest neighbor algorithm"""
         if len(places) <= 1:
-            return places
+            return list(places)
         
-        unvisited = places.copy()
+        key, positions, cached = self._cache_lookup('route', places)
+        if cached is not None:
+            return [places[i] for i in cached]
+        
+        unvisited = list(places)
         route = [unvisited.pop(0)]  # Start with first place
         
         while unvisited:
@@ -186,8 +288,17 @@ class TravelPlanner:
             route.append(nearest)
             unvisited.remove(nearest)
         
+        if key is not None:
+            self.cache.put(key, [positions[place_key(place)] for place in route])
         return route
 
+    def optimize_route_multi_start(self, places: Sequence[Place], starts: int = 32, workers: Optional[int] = None,
+                                   seed: int = 0, time_budget_ms: Optional[float] = None) -> List[Place]:
+        """Route optimization from many randomized starts, each improved by local search, on a process
+        pool; the shortest route wins (see multi_start.py). Meant for long routes: one big city day"""
+        from .multi_start import multi_start_route
+        return multi_start_route(places, self, starts, workers, seed, time_budget_ms=time_budget_ms).route
+
 
 def main():
     # Example usage
@@ -0,0 +1,215 @@
+"""
+Atomic File Writes
+Writes go to a temporary file in the target's directory, which replaces the
+target with os.replace only when its content differs. Readers never see a
+partial file, a crash leaves the old file intact, and unchanged output is not
+rewritten. Replaced files keep their permissions; new ones get the usual
+0666 & ~umask.
+
+fsync modes (default from the WAYFARE_FSYNC environment variable, else 'batch'):
+
+- always: fsync every file and its directory before/after its replace
+- batch:  queue replaced files and fsync them together every `batch_size`
+          files (and on flush), then rename them and fsync each directory once
+- never:  rely on the OS to flush (fastest; a power loss may lose recent writes)
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+from typing import IO, Dict, List, Optional, Tuple
+
+FSYNC_MODES = ('always', 'batch', 'never')
+DEFAULT_FSYNC = os.environ.get('WAYFARE_FSYNC', 'batch')
+DEFAULT_BATCH_SIZE = 32
+
+
+def file_sha1(path: str) -> str:
+    """SHA-1 of a file's bytes, read in 1 MiB chunks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def same_content(path_a: str, path_b: str) -> bool:
+    """True if both files exist and hold the same bytes (size check first, then hash)"""
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+    except OSError:
+        return False
+    return file_sha1(path_a) == file_sha1(path_b)
+
+
+_default_mode: Optional[int] = None
+
+
+def _file_mode(path: str) -> int:
+    """Permissions for a file written to `path`: the existing file's, else what open() would create"""
+    global _default_mode
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        if _default_mode is None:
+            # The umask can only be read by setting it; do it once
+            umask = os.umask(0o022)
+            os.umask(umask)
+            _default_mode = 0o666 & ~umask
+        return _default_mode
+
+
+def _fsync_path(path: str, directory: bool = False):
+    flags = os.O_RDONLY | (getattr(os, 'O_DIRECTORY', 0) if directory else 0)
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return  # e.g. directories cannot be opened on Windows
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _PendingFile:
+    """Context manager around one temp file; committed through its AtomicWriter on a clean exit"""
+
+    def __init__(self, writer: 'AtomicWriter', path: str, mode: str, encoding: Optional[str]):
+        self.writer = writer
+        self.path = path
+        directory, filename = os.path.split(os.path.abspath(path))
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{filename}.', suffix='.tmp')
+        self.file: IO = os.fdopen(fd, mode, encoding=encoding)
+        self.changed: Optional[bool] = None
+        self.aborted = False
+
+    def abort(self):
+        """Throw the temp file away and leave the target untouched"""
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        self.aborted = True
+        self.changed = False
+
+    def finish(self) -> bool:
+        """Close the temp file and commit it; returns whether the target changed"""
+        self.file.close()
+        self.changed = self.writer.commit(self.temp_path, self.path)
+        return self.changed
+
+    def __enter__(self) -> IO:
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.aborted:
+            return
+        if exc_type is not None:
+            self.abort()
+            return
+        self.finish()
+
+
+class AtomicWriter:
+    """Crash-safe writer with change detection and fsync batching.
+
+    >>> with AtomicWriter(fsync='batch') as writer:
+    ...     with writer.open('cities/Paris_attractions_with_hours_and_price.json') as f:
+    ...         f.write(text)
+    ...     writer.write_text(other_path, other_text)
+    # pending files are fsynced and renamed when the block exits
+    """
+
+    def __init__(self, fsync: Optional[str] = None, batch_size: Optional[int] = DEFAULT_BATCH_SIZE):
+        self.fsync = fsync or DEFAULT_FSYNC
+        if self.fsync not in FSYNC_MODES:
+            raise ValueError(f"Unknown fsync mode '{self.fsync}' (expected one of {FSYNC_MODES})")
+        # batch_size=None never flushes on its own (the caller hands pending files over, see take_pending)
+        self.batch_size = batch_size
+        self.pending: List[Tuple[str, str]] = []
+        self.stats: Dict[str, int] = {'written': 0, 'unchanged': 0, 'fsyncs': 0}
+
+    def open(self, path: str, mode: str = 'w', encoding: Optional[str] = 'utf-8') -> _PendingFile:
+        """Temp file for `path`; use as a context manager, then check `.changed`"""
+        return _PendingFile(self, path, mode, None if 'b' in mode else encoding)
+
+    def write_text(self, path: str, text: str, encoding: str = 'utf-8') -> bool:
+        pending = self.open(path, 'w', encoding)
+        with pending as f:
+            f.write(text)
+        return pending.changed
+
+    def write_bytes(self, path: str, data: bytes) -> bool:
+        pending = self.open(path, 'wb')
+        with pending as f:
+            f.write(data)
+        return pending.changed
+
+    def commit(self, temp_path: str, path: str) -> bool:
+        """Replace `path` with a finished temp file unless the content is identical; return whether it changed"""
+        if same_content(temp_path, path):
+            os.remove(temp_path)
+            self.stats['unchanged'] += 1
+            return False
+        # mkstemp creates 0600 files; give the replacement the target's permissions
+        os.chmod(temp_path, _file_mode(path))
+        self.stats['written'] += 1
+        if self.fsync == 'batch':
+            self.pending.append((temp_path, path))
+            if self.batch_size is not None and len(self.pending) >= self.batch_size:
+                self.flush()
+            return True
+        if self.fsync == 'always':
+            _fsync_path(temp_path)
+            self.stats['fsyncs'] += 1
+        os.replace(temp_path, path)
+        if self.fsync == 'always':
+            _fsync_path(os.path.dirname(os.path.abspath(path)), directory=True)
+            self.stats['fsyncs'] += 1
+        return True
+
+    def adopt(self, pending: List[Tuple[str, str]]):
+        """Queue (temp_path, path) pairs already compared by another writer (e.g. in a worker process)"""
+        self.pending.extend(pending)
+        if self.fsync != 'batch' or (self.batch_size is not None and len(self.pending) >= self.batch_size):
+            self.flush()
+
+    def take_pending(self) -> List[Tuple[str, str]]:
+        """Hand the queued files over to another writer instead of flushing them here"""
+        pending, self.pending = self.pending, []
+        return pending
+
+    def flush(self):
+        """fsync every queued temp file, rename them all, then fsync each directory once"""
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        if self.fsync != 'never':
+            for temp_path, _ in pending:
+                _fsync_path(temp_path)
+                self.stats['fsyncs'] += 1
+        for temp_path, path in pending:
+            os.replace(temp_path, path)
+        if self.fsync != 'never':
+            for directory in {os.path.dirname(os.path.abspath(path)) for _, path in pending}:
+                _fsync_path(directory, directory=True)
+                self.stats['fsyncs'] += 1
+
+    def discard(self):
+        """Drop queued files without replacing their targets"""
+        for temp_path, _ in self.take_pending():
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+
+def atomic_write_text(path: str, text: str, fsync: Optional[str] = None) -> bool:
+    """Atomically write one text file, skipping identical content; returns whether it changed"""
+    with AtomicWriter(fsync) as writer:
+        return writer.write_text(path, text)
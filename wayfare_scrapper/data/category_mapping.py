@@ -2,6 +2,8 @@
 # Maps current categories to standardized names with visit duration and type
 # Reorganized for more logical grouping and realistic durations
 
+from types import MappingProxyType
+
 CATEGORY_MAPPING = {
     # MAJOR ATTRACTIONS (2-4 hours) - Major museums, theme parks, large sites
     "Art Museums": {"new_category": "Major Museums", "duration": 180, "type": "major_attraction"},
@@ -220,53 +222,129 @@ CATEGORY_MAPPING = {
     "": {"new_category": "Other", "duration": 60, "type": "other"}
 }
 
-# Add mappings for combined categories (those with "•" separator)
-def add_combined_category_mappings():
-    """Add mappings for categories that contain multiple types separated by '•'"""
-    combined_mappings = {}
-    
-    for category, mapping in CATEGORY_MAPPING.items():
-        if "•" in category:
-            # For combined categories, use the first category as primary
-            primary_category = category.split("•")[0].strip()
-            if primary_category in CATEGORY_MAPPING:
-                combined_mappings[category] = CATEGORY_MAPPING[primary_category]
-            else:
-                # Default to medium visit for combined categories
-                combined_mappings[category] = {"new_category": "Combined Attractions", "duration": 180, "type": "tours_activities"}
-    
-    CATEGORY_MAPPING.update(combined_mappings)
+COMBINED_SEPARATOR = "•"
+COMBINED_DEFAULT = {"new_category": "Combined Attractions", "duration": 180, "type": "tours_activities"}
+DEFAULT_MAPPING = {"new_category": "Other", "duration": 60, "type": "other"}
+
+
+def _combined_mapping(category, mapping):
+    """Resolve a combined category ("A • B") to the mapping of its first part"""
+    primary_category = category.split(COMBINED_SEPARATOR)[0].strip()
+    if primary_category in mapping:
+        return mapping[primary_category]
+    # Default to medium visit for combined categories
+    return COMBINED_DEFAULT
+
+
+def expand_combined_categories(mapping):
+    """Return mappings for every key in `mapping` that combines several types separated by '•'"""
+    return {category: _combined_mapping(category, mapping) for category in mapping if COMBINED_SEPARATOR in category}
+
+
+class CategoryIndex:
+    """Frozen view of a category mapping with reverse indexes built once.
+
+    Entries are read-only mappings. Lookups by original category, new
+    category, visit type and duration are dict hits; list-returning queries
+    cost O(k) in the size of their result.
+    """
+
+    __slots__ = ('mapping', 'other', '_by_new_category', '_by_type',
+                 '_types_by_entry', '_by_duration', '_summary')
+
+    def __init__(self, mapping):
+        frozen = {category: MappingProxyType(dict(entry)) for category, entry in mapping.items()}
+        for category, entry in expand_combined_categories(frozen).items():
+            frozen[category] = MappingProxyType(dict(entry))
+        self.mapping = MappingProxyType(frozen)
+        self.other = self.mapping.get("Other", MappingProxyType(dict(DEFAULT_MAPPING)))
+
+        by_new_category = {}
+        by_type = {}
+        types_by_entry = {}
+        by_duration = {}
+        summary = {}
+        for category, entry in self.mapping.items():
+            by_new_category.setdefault(entry["new_category"], []).append(category)
+            by_type.setdefault(entry["type"], []).append(category)
+            types_by_entry.setdefault(entry["type"], []).append(entry["new_category"])
+            by_duration.setdefault(entry["duration"], []).append(category)
+            if entry["new_category"] not in summary:
+                summary[entry["new_category"]] = {"duration": entry["duration"], "type": entry["type"], "count": 0}
+            summary[entry["new_category"]]["count"] += 1
+
+        self._by_new_category = {key: tuple(value) for key, value in by_new_category.items()}
+        self._by_type = {key: tuple(value) for key, value in by_type.items()}
+        self._types_by_entry = {key: tuple(value) for key, value in types_by_entry.items()}
+        self._by_duration = {key: tuple(value) for key, value in by_duration.items()}
+        self._summary = MappingProxyType({key: MappingProxyType(value) for key, value in summary.items()})
+
+    def __contains__(self, category):
+        return category in self.mapping
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def get(self, category_name):
+        """Get the mapping for a category (combined '•' keys of the table are expanded), or Other"""
+        return self.mapping.get(category_name, self.other)
+
+    def new_categories(self):
+        """Unique new category names, in table order"""
+        return tuple(self._by_new_category)
+
+    def categories_for(self, new_category):
+        """Original categories that map to a new category"""
+        return self._by_new_category.get(new_category, ())
+
+    def categories_by_type(self, visit_type):
+        """Original categories with a given visit type"""
+        return self._by_type.get(visit_type, ())
+
+    def new_categories_by_type(self, visit_type):
+        """New category of every entry with a given visit type (one item per entry)"""
+        return self._types_by_entry.get(visit_type, ())
+
+    def categories_by_duration(self, duration):
+        """Original categories with a given visit duration in minutes"""
+        return self._by_duration.get(duration, ())
+
+    def durations(self):
+        """All distinct visit durations, ascending"""
+        return tuple(sorted(self._by_duration))
+
+    def summary(self):
+        """Read-only summary: new category -> duration, type and number of original categories"""
+        return self._summary
+
+
+_category_index = None
+
+
+def get_category_index():
+    """Return the CategoryIndex for CATEGORY_MAPPING, building it on first use"""
+    global _category_index
+    if _category_index is None:
+        _category_index = CategoryIndex(CATEGORY_MAPPING)
+    return _category_index
 
-# Initialize combined mappings
-add_combined_category_mappings()
 
 # Function to get category mapping
 def get_category_mapping(category_name):
-    """Get the mapping for a given category name"""
-    return CATEGORY_MAPPING.get(category_name, CATEGORY_MAPPING["Other"])
+    """Get the mapping for a given category name (a plain dict, safe to modify or serialize)"""
+    return dict(get_category_index().get(category_name))
 
 # Function to get all unique new categories
 def get_all_new_categories():
     """Get all unique new category names"""
-    return list(set(mapping["new_category"] for mapping in CATEGORY_MAPPING.values()))
+    return list(get_category_index().new_categories())
 
 # Function to get categories by duration type
 def get_categories_by_type(visit_type):
     """Get all categories for a specific visit type"""
-    return [mapping["new_category"] for mapping in CATEGORY_MAPPING.values() if mapping["type"] == visit_type]
+    return list(get_category_index().new_categories_by_type(visit_type))
 
 # Function to get summary of new category structure
 def get_category_summary():
     """Get a summary of the new category structure"""
-    categories = {}
-    for mapping in CATEGORY_MAPPING.values():
-        cat_name = mapping["new_category"]
-        if cat_name not in categories:
-            categories[cat_name] = {
-                "duration": mapping["duration"],
-                "type": mapping["type"],
-                "count": 0
-            }
-        categories[cat_name]["count"] += 1
-    
-    return categories
+    return {name: dict(info) for name, info in get_category_index().summary().items()}
@@ -0,0 +1,210 @@
+"""
+Compiled Category Matcher
+Resolves raw TripAdvisor categories to CATEGORY_MAPPING entries with the same
+rules as the original linear scan, compiled once into lookup structures
+"""
+
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .category_mapping import DEFAULT_MAPPING, get_category_index
+
+# Keyword fallbacks applied when no mapping key shares a word with the category
+FUZZY_MATCHES = {
+    'museum': 'Major Museums',
+    'park': 'Parks & Nature',
+    'garden': 'Parks & Nature',
+    'beach': 'Parks & Nature',
+    'castle': 'Cultural Sites',
+    'church': 'Religious Sites',
+    'cathedral': 'Religious Sites',
+    'temple': 'Religious Sites',
+    'mosque': 'Religious Sites',
+    'synagogue': 'Religious Sites',
+    'zoo': 'Zoos & Aquariums',
+    'aquarium': 'Zoos & Aquariums',
+    'theater': 'Entertainment',
+    'theatre': 'Entertainment',
+    'bar': 'Entertainment',
+    'club': 'Entertainment',
+    'restaurant': 'Entertainment',
+    'cafe': 'Entertainment',
+    'shopping': 'Shopping & Markets',
+    'market': 'Shopping & Markets',
+    'mall': 'Shopping & Markets',
+    'sport': 'Sports & Recreation',
+    'gym': 'Sports & Recreation',
+    'fitness': 'Sports & Recreation',
+    'tour': 'Tours & Activities',
+    'activity': 'Tours & Activities',
+    'spa': 'Wellness & Relaxation',
+    'bath': 'Wellness & Relaxation',
+    'monument': 'Landmarks & Monuments',
+    'statue': 'Landmarks & Monuments',
+    'fountain': 'Landmarks & Monuments',
+    'bridge': 'Landmarks & Monuments',
+    'tower': 'Landmarks & Monuments',
+    'landmark': 'Landmarks & Monuments',
+    'transport': 'Transportation',
+    'bus': 'Transportation',
+    'train': 'Transportation',
+    'metro': 'Transportation',
+    'subway': 'Transportation'
+}
+
+# Only words longer than this take part in partial matching
+MIN_WORD_LENGTH = 4
+
+
+class AhoCorasick:
+    """Multi-pattern substring search: reports every pattern id occurring in a text in one pass"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[int]] = [set()]
+
+        for pattern, pattern_id in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                state = nxt
+            self._out[state].add(pattern_id)
+
+        # Breadth-first pass to build failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[int]:
+        """Return the ids of all patterns occurring in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class CategoryMatcher:
+    """Category resolver compiled from a mapping table.
+
+    Resolution order matches the original scan in apply_category_mapping.py:
+    exact key, then the first mapping key (in table order) that shares a long
+    word with the category in either direction, then keyword fallbacks, then
+    "Other". Entries are plain dicts, memoized per raw category string.
+    """
+
+    def __init__(self, mapping: Optional[Dict[str, Dict]] = None, fuzzy_matches: Optional[Dict[str, str]] = None):
+        mapping = get_category_index().mapping if mapping is None else mapping
+        self.mapping = {key: dict(entry) for key, entry in mapping.items()}
+        self.fuzzy_matches = FUZZY_MATCHES if fuzzy_matches is None else fuzzy_matches
+        fuzzy_matches = self.fuzzy_matches
+
+        self._keys = list(self.mapping.keys())
+        self._values = [self.mapping[key] for key in self._keys]
+        self._keys_lower = [key.lower() for key in self._keys]
+
+        # Key words found inside the category: one automaton over every long key word
+        self._key_words = AhoCorasick(
+            (word, position)
+            for position, key_lower in enumerate(self._keys_lower)
+            for word in set(key_lower.split()) if len(word) >= MIN_WORD_LENGTH
+        )
+
+        # Category words found inside a key: trigram postings narrow the candidate keys
+        self._key_trigrams: Dict[str, Set[int]] = defaultdict(set)
+        for position, key_lower in enumerate(self._keys_lower):
+            for i in range(len(key_lower) - 2):
+                self._key_trigrams[key_lower[i:i + 3]].add(position)
+
+        # Keyword fallbacks, resolved to the first mapping with the target category
+        first_by_category = {}
+        for value in self._values:
+            first_by_category.setdefault(value['new_category'], value)
+        self._fuzzy_order = list(fuzzy_matches.keys())
+        self._fuzzy_targets = [first_by_category.get(fuzzy_matches[keyword]) for keyword in self._fuzzy_order]
+        self._fuzzy_words = AhoCorasick((keyword, i) for i, keyword in enumerate(self._fuzzy_order))
+
+        self.default = self.mapping.get("Other", DEFAULT_MAPPING)
+        self._cache: Dict[str, Optional[Dict]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _keys_containing(self, word: str) -> Set[int]:
+        candidates = None
+        for i in range(len(word) - 2):
+            postings = self._key_trigrams.get(word[i:i + 3])
+            if not postings:
+                return set()
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+        return {position for position in candidates if word in self._keys_lower[position]}
+
+    def _resolve(self, original_category: str) -> Optional[Dict]:
+        if not original_category:
+            return None
+
+        if original_category in self.mapping:
+            return self.mapping[original_category]
+
+        original_lower = original_category.lower().strip()
+
+        positions = self._key_words.find(original_lower)
+        for word in set(original_lower.split()):
+            if len(word) >= MIN_WORD_LENGTH:
+                positions |= self._keys_containing(word)
+        if positions:
+            return self._values[min(positions)]
+
+        keywords = self._fuzzy_words.find(original_lower)
+        for i in sorted(keywords):
+            if self._fuzzy_targets[i] is not None:
+                return self._fuzzy_targets[i]
+
+        return self.default
+
+    def match(self, original_category: str) -> Optional[Dict]:
+        """Return the mapping entry for a raw category (None for an empty category)"""
+        try:
+            result = self._cache[original_category]
+            self.hits += 1
+            return result
+        except KeyError:
+            self.misses += 1
+            result = self._cache[original_category] = self._resolve(original_category)
+            return result
+
+    def clear_cache(self):
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_default_matcher: Optional[CategoryMatcher] = None
+
+
+def get_category_matcher() -> CategoryMatcher:
+    """Return the process-wide matcher for CATEGORY_MAPPING, compiling it on first use"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = CategoryMatcher()
+    return _default_matcher
@@ -0,0 +1,73 @@
+"""
+City File Helpers
+Naming conventions and read/write helpers for cities/<City>_attractions_with_hours_and_price.json
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .atomic import AtomicWriter
+
+CITY_FILE_SUFFIX = '_attractions_with_hours_and_price.json'
+
+
+def city_from_filename(filename: str) -> str:
+    """Extract the city part of a city file name ('New_York_City_attractions_...json' -> 'New_York_City')"""
+    return os.path.basename(filename).split(CITY_FILE_SUFFIX)[0]
+
+
+def city_filename(city_name: str) -> str:
+    """File name for a city ('New York City' -> 'New_York_City_attractions_with_hours_and_price.json')"""
+    return f"{city_name.replace(' ', '_')}{CITY_FILE_SUFFIX}"
+
+
+def list_city_files(cities_dir: str = 'cities', cities: Optional[List[str]] = None) -> List[str]:
+    """Sorted paths of the city files in a directory, optionally limited to some city keys"""
+    wanted = set(cities) if cities else None
+    paths = []
+    for filename in sorted(os.listdir(cities_dir)):
+        if not filename.endswith(CITY_FILE_SUFFIX):
+            continue
+        if wanted is not None and city_from_filename(filename) not in wanted:
+            continue
+        paths.append(os.path.join(cities_dir, filename))
+    return paths
+
+
+def load_city_file(file_path: str) -> List[Dict]:
+    """Load every record of a city file"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_city_file(file_path: str, records: List[Dict], writer: Optional[AtomicWriter] = None) -> bool:
+    """Write records in the repository's city file format (UTF-8, indent=2); returns whether the file changed.
+
+    The write is atomic and skipped when the serialized content is identical
+    (see data/atomic.py). Pass a shared AtomicWriter to batch fsyncs across files.
+    """
+    if writer is None:
+        with AtomicWriter() as own_writer:
+            return write_city_file(file_path, records, own_writer)
+    pending = writer.open(file_path)
+    with pending as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    return pending.changed
+
+
+def record_coordinates(record: Dict) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) of a record, from latitude/longitude, lat/lng or a coordinates field; None if absent"""
+    coordinates = record.get('coordinates')
+    if isinstance(coordinates, dict):
+        lat = coordinates.get('latitude', coordinates.get('lat'))
+        lon = coordinates.get('longitude', coordinates.get('lng', coordinates.get('lon')))
+    elif isinstance(coordinates, (list, tuple)) and len(coordinates) == 2:
+        lat, lon = coordinates
+    else:
+        lat = record.get('latitude', record.get('lat'))
+        lon = record.get('longitude', record.get('lng', record.get('lon')))
+    try:
+        return (float(lat), float(lon)) if lat is not None and lon is not None else None
+    except (TypeError, ValueError):
+        return None
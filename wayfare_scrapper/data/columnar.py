@@ -0,0 +1,466 @@
+"""
+Columnar City Files
+A memory-mappable, column-oriented binary copy of a city JSON file. The JSON
+files stay the source of truth; the .wfc files are a derived read format for
+loads that only need a few fields (name/latitude/longitude for planning).
+
+Layout: 8-byte magic, uint32 header length, JSON header, then 8-byte aligned
+column buffers in native byte order. Column kinds:
+
+- float32: latitude, longitude, rating (NaN when missing)
+- int32:   popularity, duration (-1 when missing)
+- str:     uint32 offsets (rows + 1) into one UTF-8 buffer
+- dict:    int32 codes into a dictionary stored in the header (-1 when missing)
+- hours:   per (row, day) a state byte, a dictionary code for the raw string
+           and uint32 offsets into packed uint16 [open, close] minute pairs
+"""
+
+import json
+import math
+import mmap
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .atomic import AtomicWriter, file_sha1
+from .city_files import city_from_filename, list_city_files, load_city_file, record_coordinates
+from .opening_hours import DAYS_OF_WEEK, Interval, parse_hours
+
+MAGIC = b'WFCOL\x00\x01\x00'
+FORMAT_VERSION = 1
+COLUMNAR_SUFFIX = '.wfc'
+_ALIGNMENT = 8
+
+# Hours state per (row, day)
+HOURS_MISSING = -1   # day not present in opening_hours
+HOURS_UNKNOWN = 0    # empty or unparseable string (raw string still available)
+HOURS_CLOSED = 1
+HOURS_OPEN = 2
+
+COLUMN_KINDS = {
+    'name': 'str',
+    'detail_url': 'str',
+    'price': 'str',
+    'category': 'dict',
+    'wayfare_category': 'dict',
+    'country': 'dict',
+    'country_id': 'dict',
+    'city_id': 'dict',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'rating': 'float32',
+    'popularity': 'int32',
+    'duration': 'int32',
+    'opening_hours': 'hours',
+}
+
+PLANNING_COLUMNS = ('name', 'latitude', 'longitude')
+
+
+def columnar_path(json_path: str, out_dir: Optional[str] = None) -> str:
+    """Path of the columnar file for a city JSON file (same directory unless out_dir is given)"""
+    directory = out_dir or os.path.dirname(json_path)
+    filename = os.path.splitext(os.path.basename(json_path))[0] + COLUMNAR_SUFFIX
+    return os.path.join(directory, filename)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value not in (None, '') else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _to_int(value) -> int:
+    try:
+        return int(float(value)) if value not in (None, '') else -1
+    except (TypeError, ValueError):
+        return -1
+
+
+def _to_str(value) -> str:
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+class _Encoder:
+    """Accumulates the buffers of one column while records stream in"""
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.buffers: Dict[str, array] = {}
+        self.dictionary: List[str] = []
+        self._codes: Dict[str, int] = {}
+        if kind == 'float32':
+            self.buffers['values'] = array('f')
+        elif kind == 'int32':
+            self.buffers['values'] = array('i')
+        elif kind == 'str':
+            self.buffers['offsets'] = array('I', [0])
+            self.data = bytearray()
+        elif kind == 'dict':
+            self.buffers['codes'] = array('i')
+        elif kind == 'hours':
+            self.buffers['state'] = array('b')
+            self.buffers['codes'] = array('i')
+            self.buffers['offsets'] = array('I', [0])
+            self.buffers['minutes'] = array('H')
+        else:
+            raise ValueError(f"Unknown column kind: {kind}")
+
+    def _code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.dictionary)
+            self.dictionary.append(value)
+        return code
+
+    def append(self, record: Dict, coordinates: Optional[Tuple[float, float]]):
+        if self.name in ('latitude', 'longitude'):
+            value = coordinates[0 if self.name == 'latitude' else 1] if coordinates else math.nan
+            self.buffers['values'].append(value)
+            return
+        value = record.get(self.name)
+        if self.kind == 'float32':
+            self.buffers['values'].append(_to_float(value))
+        elif self.kind == 'int32':
+            self.buffers['values'].append(_to_int(value))
+        elif self.kind == 'str':
+            self.data += _to_str(value).encode('utf-8')
+            self.buffers['offsets'].append(len(self.data))
+        elif self.kind == 'dict':
+            self.buffers['codes'].append(self._code(_to_str(value)) if value not in (None, '') else -1)
+        else:
+            self._append_hours(value if isinstance(value, dict) else {})
+
+    def _append_hours(self, opening_hours: Dict):
+        state, codes = self.buffers['state'], self.buffers['codes']
+        offsets, minutes = self.buffers['offsets'], self.buffers['minutes']
+        for day in DAYS_OF_WEEK:
+            if day not in opening_hours:
+                state.append(HOURS_MISSING)
+                codes.append(-1)
+            else:
+                text = _to_str(opening_hours[day])
+                intervals = parse_hours(text)
+                codes.append(self._code(text))
+                if intervals is None:
+                    state.append(HOURS_UNKNOWN)
+                elif not intervals:
+                    state.append(HOURS_CLOSED)
+                else:
+                    state.append(HOURS_OPEN)
+                    for start, end in intervals:
+                        minutes.append(start)
+                        minutes.append(end)
+            offsets.append(len(minutes))
+
+    def finish(self) -> Tuple[Dict, List[bytes]]:
+        """Column header entry and its raw buffers, in order"""
+        names = list(self.buffers)
+        payloads = [self.buffers[name].tobytes() for name in names]
+        typecodes = [self.buffers[name].typecode for name in names]
+        if self.kind == 'str':
+            names.append('data')
+            payloads.append(bytes(self.data))
+            typecodes.append('B')
+        entry = {'kind': self.kind, 'buffers': {name: {'typecode': typecode} for name, typecode in zip(names, typecodes)}}
+        if self.dictionary:
+            entry['dictionary'] = self.dictionary
+        return entry, payloads
+
+
+def _pad(length: int) -> int:
+    return (-length) % _ALIGNMENT
+
+
+def write_columnar(records: Iterable[Dict], out_path: str, city: Optional[str] = None,
+                   columns: Optional[Sequence[str]] = None, source_sha1: Optional[str] = None) -> int:
+    """Encode records into a columnar file; returns the number of rows"""
+    encoders = [_Encoder(name, COLUMN_KINDS[name]) for name in (columns or COLUMN_KINDS)]
+    rows = 0
+    for record in records:
+        coordinates = record_coordinates(record)
+        for encoder in encoders:
+            encoder.append(record, coordinates)
+        rows += 1
+
+    header = {'version': FORMAT_VERSION, 'byteorder': sys.byteorder, 'city': city, 'rows': rows,
+              'source_sha1': source_sha1, 'columns': {}}
+    payloads = []
+    for encoder in encoders:
+        entry, buffers = encoder.finish()
+        header['columns'][encoder.name] = entry
+        payloads.append((entry, buffers))
+
+    # Buffer offsets depend on the header length, which depends on the offsets:
+    # iterate until the encoded header stops growing
+    header_length = 0
+    while True:
+        position = len(MAGIC) + 4 + header_length
+        position += _pad(position)
+        for entry, buffers in payloads:
+            for info, payload in zip(entry['buffers'].values(), buffers):
+                info['offset'] = position
+                info['length'] = len(payload)
+                position += len(payload) + _pad(len(payload))
+        encoded = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if len(encoded) <= header_length:
+            encoded += b' ' * (header_length - len(encoded))
+            break
+        header_length = len(encoded)
+
+    with AtomicWriter() as writer, writer.open(out_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(encoded).to_bytes(4, 'little'))
+        f.write(encoded)
+        f.write(b'\0' * _pad(f.tell()))
+        for _, buffers in payloads:
+            for payload in buffers:
+                f.write(payload)
+                f.write(b'\0' * _pad(len(payload)))
+    return rows
+
+
+def convert_city_file(json_path: str, out_path: Optional[str] = None, force: bool = False) -> Tuple[str, bool]:
+    """Convert one city JSON file; returns (out_path, converted).
+
+    An existing columnar file built from identical JSON content is kept.
+    """
+    out_path = out_path or columnar_path(json_path)
+    source_sha1 = file_sha1(json_path)
+    if not force and os.path.exists(out_path):
+        try:
+            with ColumnarCity(out_path) as existing:
+                if existing.source_sha1 == source_sha1:
+                    return out_path, False
+        except ValueError:
+            pass
+    write_columnar(load_city_file(json_path), out_path, city=city_from_filename(json_path), source_sha1=source_sha1)
+    return out_path, True
+
+
+def _convert_worker(args):
+    json_path, out_path, force = args
+    return convert_city_file(json_path, out_path, force)
+
+
+def convert_directory(cities_dir: str = 'cities', out_dir: Optional[str] = None, cities: Optional[List[str]] = None,
+                      workers: Optional[int] = None, force: bool = False) -> Tuple[List[Tuple[str, bool]], List[Tuple[str, str]]]:
+    """Convert every city file, one per worker process; returns (results, errors)"""
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = [(path, columnar_path(path, out_dir), force) for path in list_city_files(cities_dir, cities)]
+    results, errors = [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_convert_worker, job): os.path.basename(job[0]) for job in jobs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append((futures[future], str(e)))
+    results.sort()
+    return results, errors
+
+
+class StringColumn:
+    """Read-only sequence of strings decoded on access from an offsets + UTF-8 buffer pair"""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        if row < 0:
+            row += len(self)
+        return bytes(self.data[self.offsets[row]:self.offsets[row + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        data = bytes(self.data)
+        offsets = self.offsets
+        for row in range(len(self)):
+            yield data[offsets[row]:offsets[row + 1]].decode('utf-8')
+
+
+class DictColumn:
+    """Dictionary-encoded strings: int32 codes plus the distinct values"""
+
+    def __init__(self, codes: memoryview, dictionary: List[str]):
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        code = self.codes[row]
+        return self.dictionary[code] if code >= 0 else None
+
+    def __iter__(self):
+        dictionary = self.dictionary
+        for code in self.codes:
+            yield dictionary[code] if code >= 0 else None
+
+    def code_of(self, value: str) -> int:
+        """Code of a value, -1 if it does not occur (for filtering on codes without decoding)"""
+        try:
+            return self.dictionary.index(value)
+        except ValueError:
+            return -1
+
+
+class HoursColumn:
+    """Packed opening hours: intervals(row, day) without building per-record dicts"""
+
+    def __init__(self, state: memoryview, codes: memoryview, offsets: memoryview, minutes: memoryview,
+                 dictionary: List[str]):
+        self.state = state
+        self.codes = codes
+        self.offsets = offsets
+        self.minutes = minutes
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self.state) // len(DAYS_OF_WEEK)
+
+    def intervals(self, row: int, day: int) -> Optional[List[Interval]]:
+        """[(open, close)] minutes for a row and day index (0 = Sunday); [] closed, None unknown"""
+        slot = row * len(DAYS_OF_WEEK) + day
+        state = self.state[slot]
+        if state == HOURS_CLOSED:
+            return []
+        if state != HOURS_OPEN:
+            return None
+        start, end = self.offsets[slot], self.offsets[slot + 1]
+        return [(self.minutes[i], self.minutes[i + 1]) for i in range(start, end, 2)]
+
+    def __getitem__(self, row: int) -> Optional[Dict[str, str]]:
+        """The record's original opening_hours dict (days in DAYS_OF_WEEK order), None if it had none"""
+        week = {}
+        base = row * len(DAYS_OF_WEEK)
+        for day_index, day in enumerate(DAYS_OF_WEEK):
+            code = self.codes[base + day_index]
+            if code >= 0:
+                week[day] = self.dictionary[code]
+        return week or None
+
+
+class ColumnarCity:
+    """A memory-mapped columnar city file.
+
+    Numeric columns are zero-copy memoryviews over the mapping and are only
+    valid while the file is open; use as a context manager or call close().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: not a columnar city file")
+        self._view = memoryview(self._map)
+        self._exports: List[memoryview] = []
+        if bytes(self._view[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a columnar city file")
+        header_length = int.from_bytes(self._view[len(MAGIC):len(MAGIC) + 4], 'little')
+        start = len(MAGIC) + 4
+        self.header = json.loads(bytes(self._view[start:start + header_length]).decode('utf-8'))
+        if self.header.get('version') != FORMAT_VERSION or self.header.get('byteorder') != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path}: unsupported columnar format version or byte order")
+        self.rows: int = self.header['rows']
+        self.city: Optional[str] = self.header.get('city')
+        self.source_sha1: Optional[str] = self.header.get('source_sha1')
+        self._columns = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.header['columns'])
+
+    def _buffer(self, info: Dict) -> memoryview:
+        raw = self._view[info['offset']:info['offset'] + info['length']]
+        self._exports.append(raw)
+        if info['typecode'] == 'B':
+            return raw
+        typed = raw.cast(info['typecode'])
+        self._exports.append(typed)
+        return typed
+
+    def column(self, name: str):
+        """Typed column: memoryview for numbers, StringColumn, DictColumn or HoursColumn"""
+        if name in self._columns:
+            return self._columns[name]
+        if name not in self.header['columns']:
+            raise KeyError(f"{self.path}: no column '{name}'")
+        entry = self.header['columns'][name]
+        buffers = {key: self._buffer(info) for key, info in entry['buffers'].items()}
+        kind = entry['kind']
+        if kind in ('float32', 'int32'):
+            column = buffers['values']
+        elif kind == 'str':
+            column = StringColumn(buffers['offsets'], buffers['data'])
+        elif kind == 'dict':
+            column = DictColumn(buffers['codes'], entry.get('dictionary', []))
+        else:
+            column = HoursColumn(buffers['state'], buffers['codes'], buffers['offsets'], buffers['minutes'],
+                                 entry.get('dictionary', []))
+        self._columns[name] = column
+        return column
+
+    def __getitem__(self, name: str):
+        return self.column(name)
+
+    def to_records(self, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Decode rows into dicts holding only the requested columns (missing values omitted)"""
+        names = list(columns or self.columns)
+        decoded = []
+        for name in names:
+            column = self.column(name)
+            kind = self.header['columns'][name]['kind']
+            if kind == 'float32':
+                values = [None if math.isnan(value) else float(f'{value:.7g}') for value in column]
+            elif kind == 'int32':
+                values = [None if value < 0 else value for value in column]
+                if name == 'popularity':
+                    values = [None if value is None else str(value) for value in values]
+            else:
+                values = [column[row] for row in range(self.rows)] if kind == 'hours' else list(column)
+            decoded.append(values)
+        return [{name: values[row] for name, values in zip(names, decoded) if values[row] is not None}
+                for row in range(self.rows)]
+
+    def close(self):
+        """Unmap the file; column views handed out earlier become unusable"""
+        self._columns.clear()
+        for view in reversed(self._exports):
+            view.release()
+        self._exports.clear()
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_columns(path: str, columns: Sequence[str] = PLANNING_COLUMNS) -> Dict[str, list]:
+    """Column-pruned load into plain Python lists; only the requested columns' bytes are touched"""
+    with ColumnarCity(path) as city:
+        result = {}
+        for name in columns:
+            column = city.column(name)
+            result[name] = column.tolist() if isinstance(column, memoryview) else list(column)
+        return result
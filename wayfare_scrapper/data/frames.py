@@ -0,0 +1,87 @@
+"""
+Binary Frames
+The framing shared by the binary formats: 8-byte magic, uint32 header
+length, JSON header, then 8-byte aligned buffers in native byte order. The
+header records each buffer's offset, length and array typecode, so readers
+get zero-copy typed memoryviews over a file mapping or a shared-memory block.
+"""
+
+import json
+import sys
+from typing import IO, Dict, List, Sequence, Tuple
+
+ALIGNMENT = 8
+
+
+def _pad(length: int) -> int:
+    return (-length) % ALIGNMENT
+
+
+def _nbytes(buffer) -> int:
+    return memoryview(buffer).nbytes
+
+
+def _typecode(buffer) -> str:
+    return getattr(buffer, 'typecode', None) or memoryview(buffer).format
+
+
+def layout_frame(magic: bytes, header: Dict, buffers: Sequence) -> Tuple[bytes, int]:
+    """(prefix, total size): prefix is magic + length + header + padding; fills header['buffers']"""
+    header = dict(header, byteorder=sys.byteorder)
+    header_length = 0
+    # Buffer offsets depend on the header length, which depends on the offsets:
+    # iterate until the encoded header stops growing
+    while True:
+        position = len(magic) + 4 + header_length
+        position += _pad(position)
+        header['buffers'] = []
+        for buffer in buffers:
+            length = _nbytes(buffer)
+            header['buffers'].append({'offset': position, 'length': length, 'typecode': _typecode(buffer)})
+            position += length + _pad(length)
+        encoded = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if len(encoded) <= header_length:
+            encoded += b' ' * (header_length - len(encoded))
+            break
+        header_length = len(encoded)
+    prefix = magic + len(encoded).to_bytes(4, 'little') + encoded
+    return prefix + b'\0' * _pad(len(prefix)), position
+
+
+def write_frame(f: IO[bytes], magic: bytes, header: Dict, buffers: Sequence) -> int:
+    """Write a frame to a binary file; returns its size"""
+    prefix, size = layout_frame(magic, header, buffers)
+    f.write(prefix)
+    for buffer in buffers:
+        f.write(buffer)
+        f.write(b'\0' * _pad(_nbytes(buffer)))
+    return size
+
+
+def frame_into(target: memoryview, magic: bytes, header: Dict, buffers: Sequence):
+    """Write a frame into a writable buffer at least layout_frame(...)[1] bytes long"""
+    prefix, size = layout_frame(magic, header, buffers)
+    if len(target) < size:
+        raise ValueError(f"Frame needs {size} bytes, target has {len(target)}")
+    target[:len(prefix)] = prefix
+    position = len(prefix)
+    for buffer in buffers:
+        raw = memoryview(buffer).cast('B')
+        target[position:position + len(raw)] = raw
+        position += len(raw) + _pad(len(raw))
+
+
+def read_frame(view: memoryview, magic: bytes, what: str = 'file') -> Tuple[Dict, List[memoryview]]:
+    """(header, typed memoryviews of the buffers) of a frame; raises ValueError for other data"""
+    if bytes(view[:len(magic)]) != magic:
+        raise ValueError(f"not a {what}")
+    header_length = int.from_bytes(view[len(magic):len(magic) + 4], 'little')
+    start = len(magic) + 4
+    header = json.loads(bytes(view[start:start + header_length]).decode('utf-8'))
+    if header.get('byteorder') != sys.byteorder:
+        raise ValueError(f"{what} was written with {header.get('byteorder')}-endian byte order")
+    buffers = []
+    for info in header['buffers']:
+        raw = view[info['offset']:info['offset'] + info['length']]
+        buffers.append(raw if info['typecode'] == 'B' else raw.cast(info['typecode']))
+    return header, buffers
@@ -0,0 +1,84 @@
+"""
+Opening Hours Parsing
+Turns the scraped per-day strings ("9:00 AM - 5:00 PM", "Closed",
+"Open 24 hours", "10:00 AM - 1:00 PM, 2:00 PM - 6:00 PM") into minute
+intervals since midnight
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+DAYS_OF_WEEK = ("Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+MINUTES_PER_DAY = 24 * 60
+
+Interval = Tuple[int, int]
+
+_TIME_RE = re.compile(r'^(\d{1,2})(?:[:.](\d{2}))?\s*(a\.?m\.?|p\.?m\.?)?$', re.IGNORECASE)
+_RANGE_SPLIT_RE = re.compile(r'\s*(?:-|–|—|\bto\b)\s*', re.IGNORECASE)
+_LIST_SPLIT_RE = re.compile(r'\s*(?:,|;|\band\b)\s*', re.IGNORECASE)
+_CLOSED = {'closed', 'closed today'}
+_ALWAYS_OPEN = {'open 24 hours', '24 hours', 'open all day'}
+
+
+def parse_time(text: str) -> Optional[int]:
+    """Minutes since midnight for '9:00 AM', '9 pm', '17:30' or 'noon'; None if unparseable"""
+    text = text.strip().lower()
+    if text == 'noon':
+        return 12 * 60
+    if text == 'midnight':
+        return 0
+    match = _TIME_RE.match(text)
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if minute >= 60:
+        return None
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.startswith('p') else 0)
+    elif hour > 24 or (hour == 24 and minute):
+        return None
+    return hour * 60 + minute
+
+
+@lru_cache(maxsize=4096)
+def _parse_hours_cached(text: str) -> Optional[Tuple[Interval, ...]]:
+    normalized = ' '.join(text.split()).lower()
+    if not normalized:
+        return None
+    if normalized in _CLOSED:
+        return ()
+    if normalized in _ALWAYS_OPEN:
+        return ((0, MINUTES_PER_DAY),)
+
+    intervals = []
+    for part in _LIST_SPLIT_RE.split(normalized):
+        if not part:
+            continue
+        bounds = _RANGE_SPLIT_RE.split(part)
+        if len(bounds) != 2:
+            return None
+        start, end = parse_time(bounds[0]), parse_time(bounds[1])
+        if start is None or end is None:
+            return None
+        # Ranges that close after midnight ("6:00 PM - 2:00 AM") run into the next day
+        if end <= start:
+            end += MINUTES_PER_DAY
+        intervals.append((start, end))
+    return tuple(intervals) if intervals else None
+
+
+def parse_hours(text: Optional[str]) -> Optional[List[Interval]]:
+    """Intervals for one day's hours string: [] when closed, None when empty or unparseable"""
+    if not text or not isinstance(text, str):
+        return None
+    parsed = _parse_hours_cached(text)
+    return None if parsed is None else list(parsed)
+
+
+def parse_week(opening_hours: Optional[Dict[str, str]]) -> Dict[str, Optional[List[Interval]]]:
+    """parse_hours for every day of a record's opening_hours dict (missing days -> None)"""
+    opening_hours = opening_hours or {}
+    return {day: parse_hours(opening_hours.get(day)) for day in DAYS_OF_WEEK}
@@ -0,0 +1,248 @@
+"""
+Incremental Category Re-mapping
+Stamps city records with a hash of the mapping that produced their
+wayfare_category/duration and keeps a reverse index from original category
+to record locations, so a CATEGORY_MAPPING change only rewrites the records
+whose resolved mapping actually changed. The index also keeps each file's
+SHA-1, so files edited since (e.g. new scraped records) are mapped again in
+full.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from .atomic import atomic_write_text, file_sha1
+from .category_matcher import CategoryMatcher, get_category_matcher
+from .city_files import CITY_FILE_SUFFIX, load_city_file, write_city_file
+
+STAMP_FIELD = 'wayfare_mapping_version'
+INDEX_FILENAME = '.category_index'
+
+
+def mapping_fingerprint(entry) -> str:
+    """Hash of the fields a mapping entry writes into a record"""
+    payload = f"{entry['new_category']}|{entry['duration']}"
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def mapping_version(matcher: Optional[CategoryMatcher] = None) -> str:
+    """Hash of the whole mapping table and keyword fallbacks the matcher was compiled from"""
+    matcher = matcher or get_category_matcher()
+    table = [[key, dict(entry)] for key, entry in matcher.mapping.items()]
+    payload = json.dumps([table, matcher.fuzzy_matches], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def apply_mapping(entry: Dict, mapping) -> bool:
+    """Write mapping fields and stamp into a record; return True if anything changed"""
+    stamp = mapping_fingerprint(mapping)
+    changed = (entry.get('wayfare_category') != mapping['new_category']
+               or entry.get('duration') != mapping['duration']
+               or entry.get(STAMP_FIELD) != stamp)
+    entry['wayfare_category'] = mapping['new_category']
+    entry['duration'] = mapping['duration']
+    entry[STAMP_FIELD] = stamp
+    return changed
+
+
+def is_managed(entry: Dict, mapping) -> bool:
+    """Whether a record's fields may be (re)written from the mapping.
+
+    Stamped records always are. Records mapped before stamping existed are
+    adopted only when their fields already equal the current mapping, so
+    hand-edited or scraped durations are left alone.
+    """
+    if STAMP_FIELD in entry:
+        return True
+    if 'wayfare_category' in entry and 'duration' in entry:
+        return entry['wayfare_category'] == mapping['new_category'] and entry['duration'] == mapping['duration']
+    return True
+
+
+class CategoryLocationIndex:
+    """Reverse index: original category -> fingerprint it was mapped with and {filename: [record positions]},
+    plus the SHA-1 of each file as it was when indexed"""
+
+    def __init__(self, version: Optional[str] = None, categories: Optional[Dict] = None,
+                 file_hashes: Optional[Dict[str, str]] = None):
+        self.version = version
+        self.categories: Dict[str, Dict] = categories or {}
+        self.file_hashes: Dict[str, str] = file_hashes or {}
+
+    @classmethod
+    def load(cls, cities_dir: str) -> 'CategoryLocationIndex':
+        path = os.path.join(cities_dir, INDEX_FILENAME)
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('mapping_version'), data.get('categories', {}), data.get('files', {}))
+
+    def save(self, cities_dir: str):
+        data = {'mapping_version': self.version, 'categories': self.categories, 'files': self.file_hashes}
+        atomic_write_text(os.path.join(cities_dir, INDEX_FILENAME), json.dumps(data, ensure_ascii=False))
+
+    def files(self) -> set:
+        return set(self.file_hashes) | {filename for info in self.categories.values() for filename in info['locations']}
+
+    def replace_file(self, filename: str, locations: Dict[str, List[int]], fingerprints: Dict[str, str],
+                     sha1: Optional[str] = None):
+        """Replace every location recorded for one file, and its SHA-1 (None forgets the file)"""
+        if sha1 is None:
+            self.file_hashes.pop(filename, None)
+        else:
+            self.file_hashes[filename] = sha1
+        for category in list(self.categories):
+            info = self.categories[category]
+            info['locations'].pop(filename, None)
+            if not info['locations']:
+                del self.categories[category]
+        for category, positions in locations.items():
+            info = self.categories.setdefault(category, {'fingerprint': fingerprints[category], 'locations': {}})
+            info['fingerprint'] = fingerprints[category]
+            info['locations'][filename] = positions
+
+
+def map_record(entry: Dict, matcher: CategoryMatcher):
+    """Map one record in place; return (mapping, changed), or (None, False) for records without a category"""
+    original_category = entry.get('category', '')
+    if not original_category:
+        return None, False
+    mapping = matcher.match(original_category) or matcher.default
+    changed = is_managed(entry, mapping) and apply_mapping(entry, mapping)
+    return mapping, changed
+
+
+def map_records(data: List[Dict], matcher: CategoryMatcher) -> Tuple[Dict, Dict[str, List[int]], Dict[str, str]]:
+    """Map every record of a loaded city file; return (counts, locations, fingerprints)"""
+    counts = {'updated': 0, 'skipped': 0}
+    locations: Dict[str, List[int]] = {}
+    fingerprints: Dict[str, str] = {}
+    for position, entry in enumerate(data):
+        mapping, changed = map_record(entry, matcher)
+        if mapping is None:
+            continue
+        locations.setdefault(entry['category'], []).append(position)
+        fingerprints[entry['category']] = mapping_fingerprint(mapping)
+        counts['updated' if changed else 'skipped'] += 1
+    return counts, locations, fingerprints
+
+
+def remap_file(file_path: str, changes: Dict[str, Dict], locations: Dict[str, List[int]]) -> Dict:
+    """Rewrite only the records listed in `locations` whose category appears in `changes`.
+
+    If any indexed position no longer holds the expected category (the file
+    was edited or reordered since the index was built) the whole file is
+    re-mapped and its locations rebuilt.
+    """
+    data = load_city_file(file_path)
+
+    result = {'filename': os.path.basename(file_path), 'touched': 0, 'rescanned': False,
+              'locations': None, 'fingerprints': None, 'sha1': None}
+
+    stale = any(position >= len(data) or data[position].get('category') != category
+                for category, positions in locations.items() for position in positions)
+    if stale:
+        counts, result['locations'], result['fingerprints'] = map_records(data, get_category_matcher())
+        result['touched'] = counts['updated']
+        result['rescanned'] = True
+    else:
+        for category, positions in locations.items():
+            mapping = changes[category]
+            for position in positions:
+                entry = data[position]
+                if is_managed(entry, mapping) and apply_mapping(entry, mapping):
+                    result['touched'] += 1
+
+    if result['touched']:
+        write_city_file(file_path, data)
+    result['sha1'] = file_sha1(file_path)
+    return result
+
+
+def _remap_worker(args):
+    file_path, changes, locations = args
+    return remap_file(file_path, changes, locations)
+
+
+def _map_worker(file_path):
+    data = load_city_file(file_path)
+    counts, locations, fingerprints = map_records(data, get_category_matcher())
+    if counts['updated']:
+        write_city_file(file_path, data)
+    return {'filename': os.path.basename(file_path), 'touched': counts['updated'], 'rescanned': True,
+            'locations': locations, 'fingerprints': fingerprints, 'sha1': file_sha1(file_path)}
+
+
+def remap_cities(cities_dir: str = 'cities', workers: Optional[int] = None) -> Dict:
+    """Bring every city file up to date with the current mapping, touching only what changed.
+
+    Categories whose resolved mapping fingerprint differs from the indexed one
+    are re-applied at their recorded locations; city files missing from the
+    index, or whose content changed since they were indexed, are mapped in
+    full. Files run in parallel, one per worker process.
+    """
+    matcher = get_category_matcher()
+    version = mapping_version(matcher)
+    index = CategoryLocationIndex.load(cities_dir)
+
+    city_files = sorted(f for f in os.listdir(cities_dir) if f.endswith(CITY_FILE_SUFFIX))
+    indexed_files = index.files()
+    # Files edited since they were indexed (indexes without hashes rescan everything once)
+    new_files = [f for f in city_files
+                 if f not in indexed_files or index.file_hashes.get(f) != file_sha1(os.path.join(cities_dir, f))]
+    rescan = set(new_files)
+
+    changes = {}
+    jobs: Dict[str, Dict[str, List[int]]] = {}
+    if index.version != version:
+        for category, info in index.categories.items():
+            mapping = matcher.match(category) or matcher.default
+            if mapping_fingerprint(mapping) != info['fingerprint']:
+                changes[category] = dict(mapping)
+                for filename, positions in info['locations'].items():
+                    if filename in city_files and filename not in rescan:
+                        jobs.setdefault(filename, {})[category] = positions
+
+    summary = {'mapping_version': version, 'changed_categories': sorted(changes), 'files_touched': 0,
+               'records_touched': 0, 'files_rescanned': 0, 'errors': []}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for filename, locations in jobs.items():
+            future = executor.submit(_remap_worker, (os.path.join(cities_dir, filename), changes, locations))
+            futures[future] = filename
+        for filename in new_files:
+            futures[executor.submit(_map_worker, os.path.join(cities_dir, filename))] = filename
+
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                summary['errors'].append((filename, str(e)))
+                continue
+            if result['touched']:
+                summary['files_touched'] += 1
+                summary['records_touched'] += result['touched']
+            if result['rescanned']:
+                summary['files_rescanned'] += 1
+                index.replace_file(filename, result['locations'], result['fingerprints'], result['sha1'])
+            else:
+                index.file_hashes[filename] = result['sha1']
+
+    # Forget files that no longer exist
+    for filename in indexed_files - set(city_files):
+        index.replace_file(filename, {}, {})
+
+    # On errors keep the old fingerprints so the next run retries the same categories
+    if not summary['errors']:
+        for category, mapping in changes.items():
+            if category in index.categories:
+                index.categories[category]['fingerprint'] = mapping_fingerprint(mapping)
+        index.version = version
+    index.save(cities_dir)
+    return summary
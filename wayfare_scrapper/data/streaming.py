@@ -0,0 +1,213 @@
+"""
+Streaming JSON helpers for city files
+Reads and writes top-level JSON arrays one record at a time, with orjson as an
+optional faster backend (used automatically when installed)
+"""
+
+import json
+import re
+from typing import Any, BinaryIO, Dict, Iterator, Optional, TextIO
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+CHUNK_SIZE = 64 * 1024
+BACKENDS = ('json', 'orjson')
+DEFAULT_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Validate a backend name; None means DEFAULT_BACKEND"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{backend}' (expected one of {BACKENDS})")
+    if backend == 'orjson' and orjson is None:
+        raise ValueError("The orjson backend needs the orjson package (pip install orjson)")
+    return backend
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_TEXT_SCALAR_END_RE = re.compile(r'[,\]\s]')
+
+
+def _skip(buffer: str, pos: int, chars: str) -> int:
+    while pos < len(buffer) and buffer[pos] in chars:
+        pos += 1
+    return pos
+
+
+def iter_json_array(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array from an open text file without loading it whole"""
+    buffer = ''
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        if not eof and len(buffer) - pos < chunk_size:
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+
+        pos = _skip(buffer, pos, _WHITESPACE)
+        if not started:
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError("Expected a JSON array, got an empty file")
+                continue
+            if buffer[pos] != '[':
+                raise ValueError(f"Expected a JSON array, got {buffer[pos]!r}")
+            started = True
+            pos += 1
+            continue
+
+        pos = _skip(buffer, pos, _WHITESPACE + ',')
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        # A number or literal is complete only once something follows it (it may continue in the next chunk)
+        if (not eof and pos < len(buffer) and buffer[pos] not in '{["'
+                and not _TEXT_SCALAR_END_RE.search(buffer, pos)):
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            continue
+
+        try:
+            item, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The item is split across chunks; read more unless the file is exhausted
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            continue
+
+        yield item
+        pos = end
+
+
+# Strings (complete or not) and brackets; everything else is skipped by the scan
+_TOKEN_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|"|[\[\]{}]', re.DOTALL)
+_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR_END_RE = re.compile(rb'[,\]\s]')
+_SPACE_RE = re.compile(rb'[ \t\n\r]*')
+_SEPARATOR_RE = re.compile(rb'[ \t\n\r,]*')
+
+
+def _item_end(buffer: bytes, pos: int, eof: bool) -> int:
+    """End offset of the JSON value starting at pos, or -1 if it continues past the buffer"""
+    first = buffer[pos]
+    if first in b'{[':
+        depth = 0
+        for match in _TOKEN_RE.finditer(buffer, pos):
+            token = match.group()
+            if token == b'"':
+                return -1  # unterminated string
+            if token[0] == 0x22:
+                continue
+            depth += 1 if token in (b'{', b'[') else -1
+            if depth == 0:
+                return match.end()
+        return -1
+    if first == 0x22:
+        match = _STRING_RE.match(buffer, pos)
+        return match.end() if match else -1
+    match = _SCALAR_END_RE.search(buffer, pos)
+    if match:
+        return match.start()
+    return len(buffer) if eof else -1
+
+
+def iter_json_array_bytes(f: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """iter_json_array for a binary file, decoding each item with orjson.
+
+    Item boundaries are found with a bracket/string scan so only one record at
+    a time is handed to the C parser.
+    """
+    buffer = b''
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        pos = (_SEPARATOR_RE if started else _SPACE_RE).match(buffer, pos).end()
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != 0x5B:
+                    raise ValueError(f"Expected a JSON array, got {chr(buffer[pos])!r}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == 0x5D:
+                return
+            end = _item_end(buffer, pos, eof)
+            if end >= 0:
+                yield orjson.loads(buffer[pos:end])
+                pos = end
+                continue
+
+        # Need more data: the buffer is exhausted or ends inside an item
+        if eof:
+            raise ValueError("Unterminated JSON array" if started else "Expected a JSON array, got an empty file")
+        chunk = f.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+
+def iter_records(file_path: str, backend: Optional[str] = None) -> Iterator[Dict]:
+    """Yield attraction records from a city JSON file one at a time"""
+    if resolve_backend(backend) == 'orjson':
+        with open(file_path, 'rb') as f:
+            yield from iter_json_array_bytes(f)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from iter_json_array(f)
+
+
+def dumps_record(record: Any, indent: int = 2, backend: Optional[str] = None) -> str:
+    """One value as indented JSON text.
+
+    The orjson backend only supports indent=2 and differs from json.dumps only
+    in float exponents (1e20 instead of 1e+20); values orjson cannot encode
+    (huge ints, non-string keys) fall back to json.
+    """
+    if indent == 2 and resolve_backend(backend) == 'orjson':
+        try:
+            return orjson.dumps(record, option=orjson.OPT_INDENT_2).decode('utf-8')
+        except (orjson.JSONEncodeError, TypeError):
+            pass
+    return json.dumps(record, ensure_ascii=False, indent=indent)
+
+
+class JsonArrayWriter:
+    """Write records as a JSON array, like json.dump(records, f, ensure_ascii=False, indent=2)"""
+
+    def __init__(self, f: TextIO, indent: int = 2, backend: Optional[str] = None):
+        self.f = f
+        self.indent = indent
+        self.backend = resolve_backend(backend)
+        self.count = 0
+
+    def write(self, record: Any):
+        text = dumps_record(record, self.indent, self.backend)
+        prefix = ' ' * self.indent
+        self.f.write(('[\n' if self.count == 0 else ',\n') + prefix + text.replace('\n', '\n' + prefix))
+        self.count += 1
+
+    def close(self):
+        self.f.write('\n]' if self.count else '[]')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
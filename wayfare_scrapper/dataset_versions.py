@@ -0,0 +1,142 @@
+"""
+Dataset Versions
+Versioned, double-buffered datasets for long-running processes. A loader
+builds each new version next to the current one (optionally in a background
+thread) and swap() makes it current atomically. Readers pin the version they
+start with, so a request in flight sees one consistent dataset from start to
+finish; a replaced version is released (its release callback runs) as soon
+as its last reader unpins it.
+
+  versions = DatasetVersions(lambda: PlanningDataset.from_store(path))
+  with versions.acquire() as version:
+      plan_request(version.dataset, request)
+  versions.reload_in_background()     # after the store was refreshed
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class DatasetVersion:
+    number: int
+    dataset: Any
+    loaded_at: float
+    load_seconds: float = 0.0
+    readers: int = 0
+    retired: bool = False
+
+    def to_dict(self) -> Dict:
+        return {'version': self.number, 'loaded_at': self.loaded_at, 'load_seconds': round(self.load_seconds, 3),
+                'readers': self.readers, 'current': not self.retired}
+
+
+class DatasetVersions:
+    """The current dataset version plus any retired versions still pinned by readers"""
+
+    def __init__(self, loader: Callable[[], Any], release: Optional[Callable[[Any], None]] = None):
+        self._loader = loader
+        self._release = release
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._versions: Dict[int, DatasetVersion] = {}
+        self._last_number = 0
+        self.current: Optional[DatasetVersion] = None
+        self.reload()
+
+    def _load(self) -> DatasetVersion:
+        start = time.perf_counter()
+        dataset = self._loader()
+        return DatasetVersion(0, dataset, time.time(), time.perf_counter() - start)
+
+    def swap(self, dataset: Any, load_seconds: float = 0.0) -> DatasetVersion:
+        """Make `dataset` the current version; the previous one is released once unpinned"""
+        return self._install(DatasetVersion(0, dataset, time.time(), load_seconds))
+
+    def _install(self, version: DatasetVersion) -> DatasetVersion:
+        with self._lock:
+            self._last_number += 1
+            version.number = self._last_number
+            self._versions[version.number] = version
+            previous, self.current = self.current, version
+            released = self._retire(previous) if previous is not None else None
+        if released is not None:
+            self._release_dataset(released)
+        return version
+
+    def _retire(self, version: DatasetVersion) -> Optional[DatasetVersion]:
+        """Mark a version retired; returns it if nothing pins it (call with the lock held)"""
+        version.retired = True
+        if version.readers:
+            return None
+        del self._versions[version.number]
+        return version
+
+    def _release_dataset(self, version: DatasetVersion):
+        if self._release is not None:
+            self._release(version.dataset)
+
+    def reload(self) -> DatasetVersion:
+        """Build a new version with the loader and swap it in (one reload at a time).
+
+        If the loader raises, the current version stays in place.
+        """
+        with self._reload_lock:
+            return self._install(self._load())
+
+    def reload_in_background(self) -> Future:
+        """reload() in a background thread; the returned future resolves to the new version"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix='dataset-reload')
+        return self._executor.submit(self.reload)
+
+    # Readers
+
+    def pin(self) -> DatasetVersion:
+        """The current version, kept alive until the matching unpin()"""
+        with self._lock:
+            version = self.current
+            version.readers += 1
+            return version
+
+    def unpin(self, version: DatasetVersion):
+        with self._lock:
+            version.readers -= 1
+            released = version if version.retired and not version.readers else None
+            if released is not None:
+                del self._versions[released.number]
+        if released is not None:
+            self._release_dataset(released)
+
+    @contextmanager
+    def acquire(self) -> Iterator[DatasetVersion]:
+        version = self.pin()
+        try:
+            yield version
+        finally:
+            self.unpin(version)
+
+    def live(self) -> List[DatasetVersion]:
+        """Versions not yet released, oldest first"""
+        with self._lock:
+            return [self._versions[number] for number in sorted(self._versions)]
+
+    def oldest_live(self) -> int:
+        with self._lock:
+            return min(self._versions)
+
+    def close(self):
+        """Release every version, pinned or not (for shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            versions, self._versions = list(self._versions.values()), {}
+            self.current = None
+        for version in versions:
+            self._release_dataset(version)
@@ -0,0 +1,181 @@
+"""
+Day Packing
+Fills days by time instead of by count: a day holds as many places as its
+visits (category durations, see visit_time.py) plus the travel between them
+fit into day_minutes, so four theme parks and four lookouts no longer both
+make one day each.
+
+Packing is a bin-packing heuristic with a local-search repair:
+
+1. Order the places along a Hilbert curve over their bounding box, so
+   places next to each other in the order are close on the map.
+2. Next fit: extend the current day with the next place while the day's
+   route still fits, otherwise start a new day.
+3. Repair: try to empty each of the lightest days into the NEAREST_DAYS
+   days around it in curve order (near on the map too), each place going
+   where its day stays shortest, and drop the day when every place found
+   room.
+
+A day's time is measured on the route TravelPlanner.optimize_route will
+take (nearest neighbour from its first place), with distances from the
+planner's matrix where it covers the places, otherwise haversine. A place
+whose visit alone is longer than a day gets a day of its own.
+
+  days = pack_days(places, day_minutes=480, planner=planner)
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .geo import haversine_km
+from .visit_time import DEFAULT_TRAVEL_SPEED_KMH, visit_minutes
+
+NEAREST_DAYS = 3     # days on each side in curve order
+HILBERT_ORDER = 10    # a 1024 x 1024 grid: cells of a few tens of meters over a city
+
+
+def hilbert_index(x: int, y: int, order: int = HILBERT_ORDER) -> int:
+    """Position of cell (x, y) along a Hilbert curve over a 2**order square grid"""
+    index = 0
+    s = 1 << (order - 1)
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        index += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x, y = s - 1 - x, s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return index
+
+
+def hilbert_order(places: Sequence) -> List[int]:
+    """Positions of the places sorted along a Hilbert curve over their bounding box"""
+    if len(places) <= 2:
+        return list(range(len(places)))
+    latitudes = [place.latitude for place in places]
+    longitudes = [place.longitude for place in places]
+    min_lat, min_lon = min(latitudes), min(longitudes)
+    span = max(max(latitudes) - min_lat, max(longitudes) - min_lon) or 1.0
+    cells = (1 << HILBERT_ORDER) - 1
+    keys = [hilbert_index(int((lon - min_lon) / span * cells), int((lat - min_lat) / span * cells))
+            for lat, lon in zip(latitudes, longitudes)]
+    return sorted(range(len(places)), key=keys.__getitem__)
+
+
+class _Packer:
+    """Day routes over positions into `places`, timed in minutes"""
+
+    def __init__(self, places: Sequence, day_minutes: float, travel_speed_kmh: float, planner=None):
+        self.places = places
+        self.capacity = day_minutes
+        self.minutes_per_km = 60 / travel_speed_kmh
+        self.visits = [visit_minutes(place) for place in places]
+        matrix = planner.distances if planner is not None else None
+        positions = matrix.indices(places) if matrix is not None else None
+        if positions is not None:
+            between = matrix.between
+            self.distance = lambda i, j: between(positions[i], positions[j])
+        self._distances: Dict[Tuple[int, int], float] = {}
+
+    def distance(self, i: int, j: int) -> float:
+        """Haversine distance, computed once per pair (replaced by matrix lookups when the planner has them)"""
+        key = (i, j) if i < j else (j, i)
+        known = self._distances.get(key)
+        if known is None:
+            a, b = self.places[i], self.places[j]
+            known = self._distances[key] = haversine_km(a.latitude, a.longitude, b.latitude, b.longitude)
+        return known
+
+    def route(self, day: Sequence[int]) -> Tuple[List[int], List[float]]:
+        """(order, leg km) of the nearest-neighbour route from the day's first place, as optimize_route takes it"""
+        if not day:
+            return [], []
+        return self._finish([day[0]], [], list(day[1:]))
+
+    def _finish(self, order: List[int], legs: List[float],
+                unvisited: List[int]) -> Tuple[List[int], List[float]]:
+        distance = self.distance
+        current = order[-1]
+        while unvisited:
+            nearest = min(unvisited, key=lambda j: distance(current, j))
+            legs.append(distance(current, nearest))
+            unvisited.remove(nearest)
+            order.append(nearest)
+            current = nearest
+        return order, legs
+
+    def extend(self, day: Sequence[int], order: List[int], legs: List[float],
+               i: int) -> Tuple[List[int], List[float]]:
+        """The route of day + [i], from the route of day: unchanged up to the first stop nearer to i than
+        to the next place, nearest neighbour from there on"""
+        if not order:
+            return [i], []
+        distance = self.distance
+        for t, step in enumerate(legs):
+            if distance(order[t], i) < step:
+                visited = set(order[:t + 1])
+                return self._finish(order[:t + 1], legs[:t], [j for j in day if j not in visited] + [i])
+        return order + [i], legs + [distance(order[-1], i)]
+
+    def next_fit(self, order: Sequence[int]) -> List[List[int]]:
+        visits, capacity = self.visits, self.capacity
+        days, current, route, legs, load = [], [], [], [], 0
+        for i in order:
+            extended, extended_legs = self.extend(current, route, legs, i)
+            if current and load + visits[i] + sum(extended_legs) * self.minutes_per_km > capacity:
+                days.append(current)
+                current, load, extended, extended_legs = [], 0, [i], []
+            current.append(i)
+            load += visits[i]
+            route, legs = extended, extended_legs
+        if current:
+            days.append(current)
+        return days
+
+    def repair(self, days: List[List[int]]) -> List[List[int]]:
+        """Empty the lightest days into nearby ones where everything fits"""
+        visits, capacity = self.visits, self.capacity
+        loads = [sum(visits[i] for i in day) for day in days]
+        routes = [self.route(day) for day in days]
+        for position in sorted(range(len(days)), key=loads.__getitem__):
+            day = days[position]
+            # Emptied days stay in the list (as []) so positions keep their curve order
+            nearest = ([p for p in range(position - 1, -1, -1) if days[p]][:NEAREST_DAYS]
+                       + [p for p in range(position + 1, len(days)) if days[p]][:NEAREST_DAYS])
+            # Quick reject: the day's visits alone need more than the neighbours have left
+            if not nearest or loads[position] > sum(capacity - loads[p] - sum(routes[p][1]) * self.minutes_per_km
+                                                     for p in nearest):
+                continue
+            moves = {p: (list(days[p]), routes[p], loads[p]) for p in nearest}
+            for i in sorted(day, key=visits.__getitem__, reverse=True):
+                best, best_minutes = None, math.inf
+                for p in nearest:
+                    members, (order, legs), load = moves[p]
+                    # A day that is already too full for the visit alone is not worth routing
+                    if load + sum(legs) * self.minutes_per_km + visits[i] > capacity:
+                        continue
+                    extended = self.extend(members, order, legs, i)
+                    minutes = load + visits[i] + sum(extended[1]) * self.minutes_per_km
+                    if minutes <= capacity and minutes < best_minutes:
+                        best, best_minutes, best_route = p, minutes, extended
+                if best is None:
+                    break
+                members, _, load = moves[best]
+                moves[best] = (members + [i], best_route, load + visits[i])
+            else:
+                for p in nearest:
+                    days[p], routes[p], loads[p] = moves[p]
+                days[position] = []
+        return [day for day in days if day]
+
+
+def pack_days(places: Sequence, day_minutes: float, travel_speed_kmh: Optional[float] = None,
+              planner=None) -> List[List]:
+    """Split places into days whose visits plus travel fit day_minutes (a place longer than a day stands alone)"""
+    if not places:
+        return []
+    packer = _Packer(places, day_minutes, travel_speed_kmh or DEFAULT_TRAVEL_SPEED_KMH, planner)
+    days = packer.repair(packer.next_fit(hilbert_order(places)))
+    return [[places[i] for i in day] for day in days]
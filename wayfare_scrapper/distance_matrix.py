@@ -0,0 +1,120 @@
+"""
+Distance Matrix
+Pairwise distances between a fixed list of places, computed once and looked
+up by TravelPlanner instead of running a geodesic solve per pair. Stored as
+the condensed upper triangle (n * (n - 1) / 2 float64s).
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from .geo import haversine_km
+
+METRICS = ('geodesic', 'haversine')
+
+
+def place_key(place):
+    """Lookup key of a place: hashable rows (PlaceRow) by value, Place objects by identity"""
+    return place if type(place).__hash__ is not None else id(place)
+
+
+class DistanceMatrix:
+    """Symmetric distances (km) between `places`, indexed by position.
+
+    `groupings` caches TravelPlanner clusterings of the full place list by
+    max_distance_km, as lists of index groups.
+    """
+
+    def __init__(self, places: Sequence, values: Sequence[float], metric: str = 'geodesic'):
+        n = len(places)
+        if len(values) != n * (n - 1) // 2:
+            raise ValueError(f"Expected {n * (n - 1) // 2} distances for {n} places, got {len(values)}")
+        self.values = values
+        self.metric = metric
+        self.groupings: Dict[float, List[List[int]]] = {}
+        row_index = getattr(places, 'row_index', None)
+        if row_index is not None:
+            # A PlaceTable maps its own rows to positions without a per-place dict
+            self.places = places
+            self._position = row_index
+        else:
+            self.places = list(places)
+            index = {place_key(place): i for i, place in enumerate(self.places)}
+            self._position = lambda place: index.get(place_key(place))
+
+    @classmethod
+    def compute(cls, places: Sequence, metric: str = 'geodesic') -> 'DistanceMatrix':
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}' (expected one of {METRICS})")
+        if metric == 'geodesic':
+            from geopy.distance import geodesic
+
+            def measure(lat1, lon1, lat2, lon2):
+                return geodesic((lat1, lon1), (lat2, lon2)).kilometers
+        else:
+            measure = haversine_km
+        coordinates = [(place.latitude, place.longitude) for place in places]
+        values = array('d')
+        for i, (lat1, lon1) in enumerate(coordinates):
+            for lat2, lon2 in coordinates[i + 1:]:
+                values.append(measure(lat1, lon1, lat2, lon2))
+        return cls(places, values, metric)
+
+    @classmethod
+    def for_places(cls, places: Sequence, existing: Optional['DistanceMatrix'] = None,
+                   metric: str = 'geodesic') -> 'DistanceMatrix':
+        """`existing` if it covers exactly `places` in order, otherwise a freshly computed matrix"""
+        if existing is not None and len(existing) == len(places) and existing.indices(places) == list(range(len(places))):
+            return existing
+        return cls.compute(places, metric)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def between(self, i: int, j: int) -> float:
+        if i == j:
+            return 0.0
+        if i > j:
+            i, j = j, i
+        n = len(self.places)
+        return self.values[i * (2 * n - i - 1) // 2 + j - i - 1]
+
+    def square(self) -> array:
+        """Every distance as a row-major n * n array (for route search loops)"""
+        n = len(self.places)
+        values = self.values if isinstance(self.values, array) else array('d', bytes(memoryview(self.values)))
+        square = array('d', bytes(8 * n * n))
+        offset = 0
+        for i in range(n - 1):
+            row = values[offset:offset + n - i - 1]
+            offset += n - i - 1
+            square[i * n + i + 1:(i + 1) * n] = row
+            # The same distances, as column i below the diagonal
+            square[(i + 1) * n + i::n] = row
+        return square
+
+    def index_of(self, place) -> Optional[int]:
+        return self._position(place)
+
+    def indices(self, places: Sequence) -> Optional[List[int]]:
+        """Positions of every place, or None if any of them is not covered"""
+        position_of = self._position
+        positions = []
+        for place in places:
+            position = position_of(place)
+            if position is None:
+                return None
+            positions.append(position)
+        return positions
+
+    def lookup(self, place1, place2) -> Optional[float]:
+        i, j = self.index_of(place1), self.index_of(place2)
+        if i is None or j is None:
+            return None
+        return self.between(i, j)
+
+    def covers(self, places: Sequence) -> bool:
+        return self.indices(places) is not None
+
+    def nbytes(self) -> int:
+        return self.values.itemsize * len(self.values)
@@ -0,0 +1,59 @@
+"""
+Geographic Helpers
+Great-circle distance, bounding boxes and a grid index for filtering and
+ranking places without a geodesic solver per pair
+"""
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometers (within ~0.5% of the geodesic distance)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing every point within radius_km of (lat, lon)"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+    return (max(-90.0, lat - dlat), min(90.0, lat + dlat), lon - dlon, lon + dlon)
+
+
+class GridIndex:
+    """Points bucketed into square cells of about cell_km, for radius queries
+    that only look at nearby cells instead of every point"""
+
+    def __init__(self, points: Sequence[Tuple[float, float]], cell_km: float = 1.0):
+        self.points = list(points)
+        latitudes = [lat for lat, _ in self.points] or [0.0]
+        reference = math.cos(math.radians(sum(latitudes) / len(latitudes)))
+        self.cell_lat = cell_km / KM_PER_DEGREE_LAT
+        self.cell_lon = cell_km / (KM_PER_DEGREE_LAT * max(reference, 1e-6))
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (lat, lon) in enumerate(self.points):
+            self.cells.setdefault(self._cell(lat, lon), []).append(i)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_lat), math.floor(lon / self.cell_lon)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[int]:
+        """Indices of the points within radius_km of (lat, lon)"""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        row_min, col_min = self._cell(min_lat, min_lon)
+        row_max, col_max = self._cell(max_lat, max_lon)
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self.cells):
+            candidates = (i for cell in self.cells.values() for i in cell)
+        else:
+            candidates = (i for row in range(row_min, row_max + 1) for col in range(col_min, col_max + 1)
+                          for i in self.cells.get((row, col), ()))
+        points = self.points
+        return [i for i in candidates if haversine_km(lat, lon, *points[i]) <= radius_km]
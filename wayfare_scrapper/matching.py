@@ -0,0 +1,186 @@
+"""
+Name Matching Utilities
+Normalizes attraction names and indexes them for fast fuzzy lookups
+"""
+
+import re
+import unicodedata
+import urllib.parse
+import heapq
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Words that rarely survive into TripAdvisor URLs
+STOP_WORDS = frozenset(['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+
+_RANK_PREFIX_RE = re.compile(r'^\d+\.\s*')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_SEPARATOR_RE = re.compile(r'[_\-/]+')
+_SPACES_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=65536)
+def normalize_text(text: str) -> str:
+    """Normalize text for comparison (lowercase, no accents, punctuation or stop words)"""
+    if not text:
+        return ""
+
+    text = text.lower()
+    text = ''.join(ch for ch in unicodedata.normalize('NFD', text) if unicodedata.category(ch) != 'Mn')
+    text = _SEPARATOR_RE.sub(' ', text)
+    text = _PUNCTUATION_RE.sub('', text)
+    text = _SPACES_RE.sub(' ', text).strip()
+
+    return ' '.join(word for word in text.split() if word not in STOP_WORDS)
+
+
+def strip_rank_prefix(name: str) -> str:
+    """Remove a leading ranking such as '12. ' from a raw attraction name"""
+    return _RANK_PREFIX_RE.sub('', name or '')
+
+
+def extract_name_from_url(url: str) -> str:
+    """Extract the attraction name from a TripAdvisor URL"""
+    if not url:
+        return ""
+
+    try:
+        parsed = urllib.parse.urlparse(url)
+        path = urllib.parse.unquote(parsed.path)
+
+        # TripAdvisor URLs look like /Attraction_Review-...-Reviews-{Attraction_Name}-{Location}.html
+        if 'Reviews-' in path:
+            reviews_part = path.split('Reviews-')[-1]
+            if reviews_part.endswith('.html'):
+                reviews_part = reviews_part[:-5]
+
+            parts = reviews_part.split('-')
+            if parts:
+                return parts[0]
+
+        return ""
+    except Exception:
+        return ""
+
+
+def word_overlap_ok(name_a: str, name_b: str, min_overlap: float = 0.5) -> bool:
+    """Check that two names share at least `min_overlap` of the shorter name's words"""
+    words_a = set(normalize_text(name_a).split())
+    words_b = set(normalize_text(name_b).split())
+    if not words_a or not words_b:
+        return False
+
+    overlap = words_a.intersection(words_b)
+    return len(overlap) >= min(len(words_a), len(words_b)) * min_overlap
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    score: float
+    name: str
+    value: Any
+    index: int
+
+
+class NameIndex:
+    """Inverted token/trigram index over attraction names.
+
+    Build it once per city, then call `search` or `best` for every name that
+    needs a partner. Exact normalized matches score 1.0; everything else is
+    ranked by trigram Dice similarity with a bonus for shared whole words.
+    """
+
+    def __init__(self, names: Iterable[str] = (), values: Optional[Iterable[Any]] = None):
+        self._names: List[str] = []
+        self._values: List[Any] = []
+        self._trigram_counts: List[int] = []
+        self._token_counts: List[int] = []
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        self._by_trigram: Dict[str, List[int]] = defaultdict(list)
+        self._by_token: Dict[str, List[int]] = defaultdict(list)
+
+        names = list(names)
+        values = list(values) if values is not None else names
+        if len(values) != len(names):
+            raise ValueError("names and values must have the same length")
+        for name, value in zip(names, values):
+            self.add(name, value)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, value: Any = None) -> int:
+        """Index a name and return its position"""
+        position = len(self._names)
+        normalized = normalize_text(name)
+        tokens = frozenset(normalized.split())
+        trigrams = _trigrams(normalized) if normalized else set()
+
+        self._names.append(name)
+        self._values.append(name if value is None else value)
+        self._trigram_counts.append(len(trigrams))
+        self._token_counts.append(len(tokens))
+
+        if normalized:
+            self._exact[normalized].append(position)
+        for gram in trigrams:
+            self._by_trigram[gram].append(position)
+        for token in tokens:
+            self._by_token[token].append(position)
+
+        return position
+
+    def exact(self, name: str) -> List[NameMatch]:
+        """Return entries whose normalized name equals the normalized query"""
+        positions = self._exact.get(normalize_text(name), [])
+        return [NameMatch(1.0, self._names[i], self._values[i], i) for i in positions]
+
+    def search(self, name: str, limit: int = 5, min_score: float = 0.0) -> List[NameMatch]:
+        """Return up to `limit` candidates ranked by similarity, best first"""
+        normalized = normalize_text(name)
+        if not normalized:
+            return []
+
+        query_trigrams = _trigrams(normalized)
+        query_tokens = set(normalized.split())
+
+        shared = Counter(chain.from_iterable(self._by_trigram.get(gram, ()) for gram in query_trigrams))
+        shared_tokens = Counter(chain.from_iterable(self._by_token.get(token, ()) for token in query_tokens))
+
+        # A candidate needs enough shared trigrams to reach min_score even with every word shared
+        query_size = len(query_trigrams)
+        required_dice = (min_score - 0.3) / 0.7
+
+        exact_positions = set(self._exact.get(normalized, ()))
+        scored = []
+        for position, count in shared.items():
+            if position in exact_positions:
+                scored.append((1.0, position))
+                continue
+            dice = 2.0 * count / (query_size + self._trigram_counts[position])
+            if dice < required_dice:
+                continue
+            token_score = shared_tokens[position] / max(len(query_tokens), self._token_counts[position])
+            # Exact equality is reserved for 1.0
+            score = min(0.99, 0.7 * dice + 0.3 * token_score)
+            if score >= min_score:
+                scored.append((score, position))
+
+        best = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+        return [NameMatch(score, self._names[i], self._values[i], i) for score, i in best]
+
+    def best(self, name: str, min_score: float = 0.8) -> Optional[NameMatch]:
+        """Return the single best candidate scoring at least `min_score`"""
+        exact = self.exact(name)
+        if exact:
+            return exact[0]
+        matches = self.search(name, limit=1, min_score=min_score)
+        return matches[0] if matches else None
@@ -0,0 +1,125 @@
+"""
+Key-Based City File Merge
+Copies selected fields from one set of city files into another, joining records
+on normalized name plus city rather than on list position
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .data.atomic import AtomicWriter
+from .data.city_files import city_from_filename, list_city_files
+from .data.streaming import JsonArrayWriter, iter_records
+from .matching import normalize_text, strip_rank_prefix
+
+
+def record_key(record: Dict, city: str) -> Tuple[str, str]:
+    """Stable join key for an attraction record: (city, normalized name)"""
+    return (city, normalize_text(strip_rank_prefix(record.get('name', ''))))
+
+
+def build_field_index(file_path: str, fields: Sequence[str], city: Optional[str] = None) -> Tuple[Dict[Tuple[str, str], Dict], int]:
+    """Stream a source file into {key: {field: value}}, keeping only the fields to merge.
+
+    Returns the index and the number of duplicate keys. The first record for a
+    key wins; later duplicates are counted but ignored.
+    """
+    city = city or city_from_filename(file_path)
+    index = {}
+    duplicates = 0
+    for record in iter_records(file_path):
+        key = record_key(record, city)
+        if not key[1]:
+            continue
+        if key in index:
+            duplicates += 1
+            continue
+        index[key] = {field: record[field] for field in fields if record.get(field)}
+    return index, duplicates
+
+
+def merge_city_file(target_path: str, source_path: str, fields: Sequence[str] = ('detail_url',),
+                    dry_run: bool = False) -> Dict:
+    """Merge `fields` from source_path into target_path, rewriting the target only if something changed.
+
+    Only non-empty source values that differ from the target are copied. The
+    target is streamed into a temporary file next to it, which atomically
+    replaces the original when at least one record changed and is discarded
+    otherwise.
+    """
+    city = city_from_filename(target_path)
+    index, duplicates = build_field_index(source_path, fields, city)
+
+    result = {
+        'filename': os.path.basename(target_path),
+        'records': 0,
+        'matched': 0,
+        'unmatched': 0,
+        'updated': 0,
+        'source_duplicates': duplicates,
+        'written': False,
+    }
+
+    with AtomicWriter() as atomic_writer:
+        pending = atomic_writer.open(target_path)
+        with pending as out:
+            writer = JsonArrayWriter(out)
+            for record in iter_records(target_path):
+                result['records'] += 1
+                updates = index.get(record_key(record, city))
+                if updates is None:
+                    result['unmatched'] += 1
+                else:
+                    result['matched'] += 1
+                    changed = False
+                    for field, value in updates.items():
+                        if record.get(field) != value:
+                            record[field] = value
+                            changed = True
+                    if changed:
+                        result['updated'] += 1
+                writer.write(record)
+            writer.close()
+
+            if not result['updated'] or dry_run:
+                pending.abort()
+        result['written'] = bool(pending.changed)
+
+    return result
+
+
+def _merge_worker(args):
+    target_path, source_path, fields, dry_run = args
+    return merge_city_file(target_path, source_path, fields, dry_run)
+
+
+def merge_directories(target_dir: str, source_dir: str, fields: Sequence[str] = ('detail_url',),
+                      workers: Optional[int] = None, dry_run: bool = False,
+                      cities: Optional[Iterable[str]] = None) -> Tuple[List[Dict], List[Tuple[str, str]]]:
+    """Merge every city file present in both directories, one city per worker process.
+
+    Returns (results, errors) where errors holds (filename, message) pairs.
+    """
+    jobs = []
+    for target_path in list_city_files(target_dir, list(cities) if cities else None):
+        filename = os.path.basename(target_path)
+        source_path = os.path.join(source_dir, filename)
+        if not os.path.exists(source_path):
+            print(f"Warning: No corresponding file found in {source_dir} for {filename}. Skipping.")
+            continue
+        jobs.append((target_path, source_path, tuple(fields), dry_run))
+
+    results = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_merge_worker, job): os.path.basename(job[0]) for job in jobs}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append((filename, str(e)))
+
+    results.sort(key=lambda result: result['filename'])
+    return results, errors
@@ -0,0 +1,150 @@
+"""
+Multi-Start Route Search
+Orders one long route from many starting points at once. Each start builds a
+nearest-neighbour route from a different place (randomized, once every place
+has been a start) and improves it by neighbour-list local search (2-opt and
+relocate); the shortest route wins. The first start is always
+TravelPlanner.optimize_route's construction from the first place, so the
+result is never longer than that route after local search.
+
+Starts run on a process pool. The distances (a row-major n * n array) and
+nearest-neighbour lists are written once into a shared-memory block in the
+data.frames layout; workers attach read-only, so every extra worker costs CPU,
+not another copy of the matrix.
+
+  result = multi_start_route(places, planner, starts=64, workers=8)
+  result.route, result.distance_km
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+from .core import TravelPlanner
+from .data.frames import frame_into, layout_frame, read_frame
+from .route_search import (local_search, nearest_neighbor, neighbor_lists, path_length,
+                           randomized_nearest_neighbor, square_distances)
+
+MAGIC = b'WFMSR\x00\x01\x00'
+FORMAT_VERSION = 1
+DEFAULT_STARTS = 32
+DEFAULT_CANDIDATES = 2   # randomized starts pick each step among this many nearest unvisited places
+
+# Worker process state, set once by _init_worker
+_shm: Optional[shared_memory.SharedMemory] = None
+_distances: Optional[Sequence[float]] = None
+_neighbors: Optional[Sequence[int]] = None
+_places = 0
+
+
+def _init_worker(name: str):
+    global _shm, _distances, _neighbors, _places
+    _shm = shared_memory.SharedMemory(name=name)
+    header, buffers = read_frame(_shm.buf.toreadonly(), MAGIC, 'route search block')
+    _places = header['places']
+    _distances, _neighbors = buffers
+
+
+def _search(d: Sequence[float], n: int, neighbors: Sequence[int], start: int, seed: Optional[int],
+            candidates: int, deadline: Optional[float]) -> Tuple[Optional[float], List[int]]:
+    """(length, route) of one start; seed None is the plain nearest-neighbour construction.
+
+    `deadline` is a time.time() value (comparable across processes); starts
+    other than the first that begin after it are skipped, returning (None, []).
+    """
+    if deadline is not None and (start, seed) != (0, None) and time.time() >= deadline:
+        return None, []
+    if seed is None:
+        order = nearest_neighbor(d, n, start)
+    else:
+        order = randomized_nearest_neighbor(d, n, start, random.Random(seed), candidates, neighbors)
+    local_deadline = time.monotonic() + (deadline - time.time()) if deadline is not None else None
+    local_search(order, d, n, local_deadline, neighbors)
+    return path_length(order, d, n), order
+
+
+def _pool_search(start: int, seed: Optional[int], candidates: int,
+                 deadline: Optional[float]) -> Tuple[Optional[float], List[int]]:
+    return _search(_distances, _places, _neighbors, start, seed, candidates, deadline)
+
+
+@dataclass
+class MultiStartResult:
+    """Best route of a multi-start search"""
+    route: List                 # the places, in visiting order
+    distance_km: float
+    first_distance_km: float    # the first start (optimize_route's construction) after local search
+    lengths: List[float]        # every finished start's route length, in start order
+    workers: int
+    elapsed_ms: float
+
+    @property
+    def starts(self) -> int:
+        return len(self.lengths)
+
+
+def _start_plan(n: int, starts: int, seed: int) -> List[Tuple[int, Optional[int]]]:
+    """(start place, construction seed) per start: the first place, then the others in random order.
+
+    Plain nearest-neighbour routes from distinct places beat randomized ones
+    from the same place, so constructions are only randomized once the
+    starts outnumber the places.
+    """
+    rng = random.Random(seed)
+    others = list(range(1, n))
+    rng.shuffle(others)
+    order = [0] + others
+    return [(order[number % n], None if number < n else seed * 1_000_003 + number) for number in range(starts)]
+
+
+def multi_start_search(d: Sequence[float], n: int, starts: int = DEFAULT_STARTS, workers: Optional[int] = None,
+                       seed: int = 0, candidates: int = DEFAULT_CANDIDATES,
+                       time_budget_ms: Optional[float] = None) -> Tuple[List[int], List[float], int]:
+    """(best route, lengths of the finished starts, workers used) over a square distance array.
+
+    Within time_budget_ms (counted from here, neighbour lists included),
+    starts not yet begun are skipped and running ones stop improving; the
+    first start always finishes its construction.
+    """
+    if n <= 2:
+        return list(range(n)), [path_length(list(range(n)), d, n)], 1
+    deadline = time.time() + time_budget_ms / 1000 if time_budget_ms is not None else None
+    neighbors = neighbor_lists(d, n)
+    jobs = _start_plan(n, max(1, starts), seed)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        results = [_search(d, n, neighbors, start, job_seed, candidates, deadline) for start, job_seed in jobs]
+    else:
+        header = {'version': FORMAT_VERSION, 'places': n}
+        _, size = layout_frame(MAGIC, header, [d, neighbors])
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            frame_into(shm.buf, MAGIC, header, [d, neighbors])
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shm.name,)) as executor:
+                results = list(executor.map(_pool_search, [start for start, _ in jobs],
+                                            [job_seed for _, job_seed in jobs], [candidates] * len(jobs),
+                                            [deadline] * len(jobs)))
+        finally:
+            shm.close()
+            shm.unlink()
+    finished = [(length, order) for length, order in results if length is not None]
+    best = min(finished, key=lambda result: result[0])
+    return best[1], [length for length, _ in finished], workers
+
+
+def multi_start_route(places: Sequence, planner: Optional[TravelPlanner] = None, starts: int = DEFAULT_STARTS,
+                      workers: Optional[int] = None, seed: int = 0, candidates: int = DEFAULT_CANDIDATES,
+                      time_budget_ms: Optional[float] = None) -> MultiStartResult:
+    """Order places by a multi-start search; distances come from the planner (its matrix, else geodesic)"""
+    started = time.monotonic()
+    planner = planner or TravelPlanner()
+    n = len(places)
+    d = square_distances(places, planner)
+    order, lengths, workers = multi_start_search(d, n, starts, workers, seed, candidates, time_budget_ms)
+    return MultiStartResult(route=[places[i] for i in order], distance_km=path_length(order, d, n),
+                            first_distance_km=lengths[0], lengths=lengths, workers=workers,
+                            elapsed_ms=(time.monotonic() - started) * 1000)
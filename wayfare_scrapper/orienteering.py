@@ -0,0 +1,327 @@
+"""
+Orienteering
+Plans "the best things to do in N days" instead of scheduling every place:
+picks the subset of candidates with the highest total score whose day routes
+fit the daily time budget, and orders each day. A candidate's score is its
+popularity (by rank: candidates come most popular first) scaled by its
+rating, so little-known places are worth little however short; a day's time
+is its visits (category durations, see visit_time.py) plus the travel
+between them.
+
+Sized for whole cities (a few thousand candidates) at interactive speed:
+
+1. Pool: the POOL_SIZE best-scored candidates, plus the places within
+   POOL_NEIGHBOR_KM of them (grid index), so cheap stops next to strong
+   places are considered too.
+2. Distances: a row per place that enters a route, from the city's
+   DistanceMatrix when it covers the pool, otherwise haversine.
+3. Greedy insertion: the candidate with the highest score per added minute
+   goes to its cheapest position in any day, until nothing fits.
+4. Improvement: shorten each day route (exactly for small days), refill the
+   time saved, and swap planned places for better-scored ones that fit,
+   until no swap helps or time_budget_ms runs out.
+
+  result = best_plan(places, days=3, city='Paris')
+  result.plan          # paris_plan.json layout, with visit and travel minutes per day
+  result.metadata()    # {'score': ..., 'selected': 9, 'candidates': 2841, 'pool': 600, ...}
+"""
+
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .core import TravelPlanner
+from .distance_matrix import DistanceMatrix
+from .geo import EARTH_RADIUS_KM, GridIndex
+from .planning import plan_layout
+from .route_search import EXACT_MAX_PLACES, exact_path, local_search, path_length, sub_distances
+from .visit_time import DEFAULT_DAY_MINUTES, DEFAULT_TRAVEL_SPEED_KMH, visit_minutes
+
+POOL_SIZE = 300
+POOL_NEIGHBOR_KM = 0.5
+POOL_MAX = 600
+POPULARITY_HALF_RANK = 20     # popularity halves by this rank (1 for the most popular place)
+RATING_WEIGHT = 0.5           # share of the score that depends on the rating (5 stars keeps it all)
+DEFAULT_RATING = 3.5          # unrated places
+
+_UNKNOWN = -1.0
+
+
+def place_score(rank: int, rating: Optional[float], rating_weight: float = RATING_WEIGHT) -> float:
+    """Score of a candidate (0..1): popularity by rank, scaled down by a rating under 5 stars"""
+    popularity = 1 / (1 + rank / POPULARITY_HALF_RANK)
+    quality = (DEFAULT_RATING if rating is None else rating) / 5
+    return popularity * (1 - rating_weight + rating_weight * quality)
+
+
+def candidate_pool(places: Sequence, scores: Sequence[float], size: int = POOL_SIZE,
+                   neighbor_km: float = POOL_NEIGHBOR_KM, limit: int = POOL_MAX) -> List[int]:
+    """Positions of the candidates worth solving over: the best-scored ones, then their neighbours"""
+    ranked = sorted(range(len(places)), key=scores.__getitem__, reverse=True)
+    if len(ranked) <= limit:
+        return ranked
+    pool = ranked[:size]
+    chosen = set(pool)
+    grid = GridIndex([(place.latitude, place.longitude) for place in places], neighbor_km)
+    for i in ranked[:size]:
+        for j in sorted(grid.within(places[i].latitude, places[i].longitude, neighbor_km),
+                        key=scores.__getitem__, reverse=True):
+            if j not in chosen:
+                if len(pool) >= limit:
+                    return pool
+                chosen.add(j)
+                pool.append(j)
+    return pool
+
+
+@dataclass
+class OrienteeringResult:
+    """Best selection found and its routes.
+
+    status is 'converged' (no swap or insertion improves the score) or
+    'deadline' (time_budget_ms ran out first).
+    """
+    plan: Dict
+    status: str
+    score: float
+    selected: int
+    candidates: int
+    pool: int
+    days: int
+    day_minutes: float
+    travel_speed_kmh: float
+    rounds: int
+    elapsed_ms: float
+
+    def metadata(self) -> Dict:
+        return {
+            'status': self.status,
+            'score': round(self.score, 4),
+            'selected': self.selected,
+            'candidates': self.candidates,
+            'pool': self.pool,
+            'days': self.days,
+            'day_minutes': self.day_minutes,
+            'travel_speed_kmh': self.travel_speed_kmh,
+            'rounds': self.rounds,
+            'elapsed_ms': round(self.elapsed_ms, 2),
+        }
+
+
+class _Tours:
+    """Day routes over the pool (positions 0..n-1) with lazily loaded distance rows"""
+
+    def __init__(self, places: Sequence, scores: Sequence[float], visits: Sequence[float], days: int,
+                 day_minutes: float, travel_speed_kmh: float, matrix: Optional[DistanceMatrix]):
+        self.places = places
+        self.n = n = len(places)
+        self.scores = scores
+        self.visits = visits
+        self.capacity = day_minutes
+        self.minutes_per_km = 60 / travel_speed_kmh
+        self.d = array('d', [_UNKNOWN]) * (n * n)
+        self.loaded = bytearray(n)
+        self.matrix = matrix
+        self.positions = matrix.indices(places) if matrix is not None else None
+        self.radians = [(math.radians(place.latitude), math.radians(place.longitude)) for place in places]
+        self.cosines = [math.cos(lat) for lat, _ in self.radians]
+        self.routes: List[List[int]] = [[] for _ in range(days)]
+        self.minutes = [0.0] * days
+        self.unvisited = set(range(n))
+        self.changed = set()       # days whose route changed since they were last shortened
+
+    def load(self, i: int):
+        """Distances from place i to every pool place (both directions of the square array)"""
+        if self.loaded[i]:
+            return
+        self.loaded[i] = 1
+        d, n = self.d, self.n
+        if self.positions is not None:
+            between, positions = self.matrix.between, self.positions
+            row = [between(positions[i], position) for position in positions]
+        else:
+            # geo.haversine_km with the radians and cosines computed once per place
+            lat, lon = self.radians[i]
+            cos_lat, sin, asin, sqrt = self.cosines[i], math.sin, math.asin, math.sqrt
+            row = [2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(sin((lat2 - lat) / 2) ** 2
+                                                            + cos_lat * cos2 * sin((lon2 - lon) / 2) ** 2)))
+                   for (lat2, lon2), cos2 in zip(self.radians, self.cosines)]
+        d[i * n:(i + 1) * n] = array('d', row)
+        d[i::n] = array('d', row)
+
+    def route_minutes(self, route: Sequence[int]) -> float:
+        return (sum(self.visits[i] for i in route)
+                + path_length(route, self.d, self.n) * self.minutes_per_km)
+
+    def insertion(self, c: int, route: Sequence[int]):
+        """(added minutes, position) of the cheapest place for c in a route"""
+        if not route:
+            return self.visits[c], 0
+        d, n = self.d, self.n
+        base = c * n
+        prev = route[0]
+        best, position = d[base + prev], 0
+        for p in range(1, len(route)):
+            nxt = route[p]
+            delta = d[base + prev] + d[base + nxt] - d[prev * n + nxt]
+            if delta < best:
+                best, position = delta, p
+            prev = nxt
+        if d[base + prev] < best:
+            best, position = d[base + prev], len(route)
+        return self.visits[c] + best * self.minutes_per_km, position
+
+    def insert(self, c: int, day: int, position: int):
+        self.load(c)
+        self.routes[day].insert(position, c)
+        self.minutes[day] = self.route_minutes(self.routes[day])
+        self.unvisited.discard(c)
+        self.changed.add(day)
+
+    def fill(self) -> int:
+        """Greedy insertion by score per added minute until nothing fits; returns the places added"""
+        days = range(len(self.routes))
+        options = [self._insertions(day) for day in days]
+        tops = [_top(found) for found in options]
+        added = 0
+        while True:
+            day = max((day for day in days if tops[day] is not None), key=lambda day: tops[day][0], default=None)
+            if day is None:
+                return added
+            c = tops[day][1]
+            self.insert(c, day, options[day][c][1])
+            added += 1
+            for other in days:
+                if options[other].pop(c, None) is not None and tops[other][1] == c:
+                    tops[other] = _top(options[other])
+            options[day] = self._insertions(day)
+            tops[day] = _top(options[day])
+
+    def _insertions(self, day: int) -> Dict[int, tuple]:
+        """(score per added minute, position) of every unvisited place that fits into a day"""
+        route, slack = self.routes[day], self.capacity - self.minutes[day]
+        scores, visits, found = self.scores, self.visits, {}
+        for c in self.unvisited:
+            if visits[c] > slack:
+                continue
+            minutes, position = self.insertion(c, route)
+            if minutes <= slack:
+                found[c] = (scores[c] / max(minutes, 1e-9), position)
+        return found
+
+    def shorten_changed(self, deadline: Optional[float]):
+        for day in sorted(self.changed):
+            self.shorten(day, deadline)
+        self.changed.clear()
+
+    def shorten(self, day: int, deadline: Optional[float]):
+        """Reorder a day route for the least travel"""
+        route = self.routes[day]
+        m = len(route)
+        if m <= 2:
+            return
+        sub = sub_distances(self.d, self.n, route)
+        if m <= EXACT_MAX_PLACES:
+            order = exact_path(sub, m)
+        else:
+            order = list(range(m))
+            local_search(order, sub, m, deadline)
+        if path_length(order, sub, m) < path_length(range(m), sub, m) - 1e-9:
+            self.routes[day] = [route[i] for i in order]
+            self.minutes[day] = self.route_minutes(self.routes[day])
+
+    def swap(self) -> Optional[int]:
+        """Replace one planned place by a better-scored unvisited one that fits; returns the day changed"""
+        scores, visits = self.scores, self.visits
+        waiting = sorted(self.unvisited, key=scores.__getitem__, reverse=True)
+        best_gain, best_move = 1e-12, None
+        for day, route in enumerate(self.routes):
+            for q, v in enumerate(route):
+                if not waiting or scores[waiting[0]] - scores[v] <= best_gain:
+                    continue
+                rest = route[:q] + route[q + 1:]
+                slack = self.capacity - self.route_minutes(rest)
+                for c in waiting:
+                    gain = scores[c] - scores[v]
+                    if gain <= best_gain:
+                        break
+                    if visits[c] > slack:
+                        continue
+                    minutes, position = self.insertion(c, rest)
+                    if minutes <= slack:
+                        best_gain, best_move = gain, (day, v, c, position)
+                        break
+        if best_move is None:
+            return None
+        day, v, c, position = best_move
+        route = self.routes[day]
+        route.remove(v)
+        self.unvisited.add(v)
+        self.insert(c, day, position)
+        return day
+
+    def score(self) -> float:
+        return sum(self.scores[i] for route in self.routes for i in route)
+
+
+def _top(options: Dict[int, tuple]) -> Optional[tuple]:
+    """(ratio, place) of the best insertion option, or None"""
+    return max(((ratio, c) for c, (ratio, _) in options.items()), default=None)
+
+
+def best_plan(places: Sequence, days: int = 1, day_minutes: float = DEFAULT_DAY_MINUTES,
+              travel_speed_kmh: float = DEFAULT_TRAVEL_SPEED_KMH, city: Optional[str] = None,
+              planner: Optional[TravelPlanner] = None, matrix: Optional[DistanceMatrix] = None,
+              time_budget_ms: Optional[float] = None,
+              rating_weight: float = RATING_WEIGHT) -> OrienteeringResult:
+    """Select and route the best-scoring places (most popular first) that fit `days` of day_minutes each.
+
+    Travel times come from `matrix` (default: the planner's) where it covers
+    the candidates, else from haversine distances; the plan's per-leg
+    distances come from the planner as usual. The first greedy selection is
+    always made, even past time_budget_ms.
+    """
+    start = time.monotonic()
+    deadline = start + time_budget_ms / 1000 if time_budget_ms is not None else None
+    planner = planner or TravelPlanner()
+    matrix = matrix if matrix is not None else planner.distances
+
+    scores = [place_score(rank, place.rating, rating_weight) for rank, place in enumerate(places)]
+    pool = candidate_pool(places, scores)
+    pool_places = [places[i] for i in pool]
+    if matrix is not None and not matrix.covers(pool_places):
+        matrix = None
+    tours = _Tours(pool_places, [scores[i] for i in pool], [visit_minutes(place) for place in pool_places],
+                   days, day_minutes, travel_speed_kmh, matrix)
+
+    tours.fill()
+    status, rounds = 'converged', 0
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            status = 'deadline'
+            break
+        rounds += 1
+        tours.shorten_changed(deadline)
+        refilled = tours.fill()
+        if tours.swap() is None and not refilled:
+            break
+
+    routes = [route for route in tours.routes if route]
+    selected = sum(len(route) for route in routes)
+    plan = plan_layout({day: [pool_places[i] for i in route] for day, route in enumerate(routes, 1)},
+                       planner, selected, None, None, city)
+    for day, route in enumerate(routes, 1):
+        day_data = plan["days"][day]
+        visit_total = sum(tours.visits[i] for i in route)
+        travel_total = path_length(route, tours.d, tours.n) * tours.minutes_per_km
+        for place_data, i in zip(day_data["places"], route):
+            place_data["visit_minutes"] = tours.visits[i]
+        day_data["visit_minutes"] = visit_total
+        day_data["travel_minutes"] = round(travel_total, 1)
+        day_data["total_minutes"] = round(visit_total + travel_total, 1)
+    return OrienteeringResult(plan=plan, status=status, score=tours.score(), selected=selected,
+                              candidates=len(places), pool=len(pool), days=days, day_minutes=day_minutes,
+                              travel_speed_kmh=travel_speed_kmh, rounds=rounds,
+                              elapsed_ms=(time.monotonic() - start) * 1000)
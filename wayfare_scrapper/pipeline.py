@@ -0,0 +1,101 @@
+"""
+Enrichment Pipeline
+Chains record transforms into one pass per city file: each record flows
+through every stage in dependency order, and the file is read once and
+written (atomically) at most once
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from .batch import BatchReport, FileContext, RecordTransform, SkipFile, run_batch
+
+
+def order_stages(stages: Sequence[RecordTransform]) -> List[RecordTransform]:
+    """Topologically sort stages by their `requires`, keeping the given order where there is a choice.
+
+    Requirements on stages that are not part of the pipeline are ignored.
+    """
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+
+    ordered = []
+    state: Dict[str, str] = {}
+
+    def visit(stage, path):
+        if state.get(stage.name) == 'done':
+            return
+        if state.get(stage.name) == 'visiting':
+            raise ValueError(f"Stage dependency cycle: {' -> '.join(path + [stage.name])}")
+        state[stage.name] = 'visiting'
+        for requirement in stage.requires:
+            if requirement in by_name:
+                visit(by_name[requirement], path + [stage.name])
+        state[stage.name] = 'done'
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage, [])
+    return ordered
+
+
+class Pipeline(RecordTransform):
+    """A RecordTransform that runs several stages per record.
+
+    A stage raising SkipFile from begin_file is switched off for that file
+    only; the other stages still run. Per-stage change counts are reported
+    as '<stage>_changed' stats.
+    """
+
+    name = 'pipeline'
+
+    def __init__(self, stages: Sequence[RecordTransform]):
+        self.stages = order_stages(stages)
+        self.read_only = all(stage.read_only for stage in self.stages)
+
+    def begin_file(self, ctx: FileContext):
+        active = []
+        for stage in self.stages:
+            try:
+                stage.begin_file(ctx)
+                active.append(stage)
+            except SkipFile as e:
+                ctx.stats[f'{stage.name}_skipped_files'] += 1
+                ctx.log(f"{stage.name}: skipped ({e})")
+        if not active:
+            raise SkipFile("every stage skipped this file")
+        ctx.state['pipeline_active'] = active
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        changed = False
+        for stage in ctx.state['pipeline_active']:
+            if stage.transform(record, ctx):
+                ctx.stats[f'{stage.name}_changed'] += 1
+                changed = changed or not stage.read_only
+        return changed
+
+    def end_file(self, ctx: FileContext):
+        for stage in ctx.state['pipeline_active']:
+            stage.end_file(ctx)
+
+    def describe(self) -> str:
+        return ' -> '.join(stage.name for stage in self.stages)
+
+
+def run_pipeline(stages: Sequence[RecordTransform], cities_dir: str = 'cities', cities: Optional[List[str]] = None,
+                 workers: Optional[int] = None, write: bool = True, progress: bool = True,
+                 streaming: bool = False, fsync: Optional[str] = None) -> BatchReport:
+    """Run all stages over every city file in one read and at most one write per file"""
+    return run_batch(Pipeline(stages), cities_dir=cities_dir, cities=cities, workers=workers,
+                     write=write, progress=progress, streaming=streaming, fsync=fsync)
+
+
+def stage_totals(report: BatchReport, stages: Sequence[RecordTransform]) -> Dict[str, Counter]:
+    """Per-stage changed-record and skipped-file counts from a pipeline report"""
+    totals = report.totals()
+    return {stage.name: Counter(changed=totals[f'{stage.name}_changed'],
+                                skipped_files=totals[f'{stage.name}_skipped_files'])
+            for stage in order_stages(stages)}
@@ -0,0 +1,323 @@
+"""
+Place Table
+A struct-of-arrays container for many places: coordinates and ratings in flat
+typed arrays, names/addresses/ids as offsets into shared UTF-8 buffers, and
+category types and opening hours interned once per distinct value. Rows are
+exposed as lightweight PlaceRow views that TravelPlanner accepts wherever it
+takes a Place.
+"""
+
+import json
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .core import Place
+from .data.city_files import city_from_filename, load_city_file, record_coordinates
+from .data.columnar import ColumnarCity
+
+
+class _StringPool:
+    """Append-only strings stored as one UTF-8 buffer plus end offsets"""
+
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('I', [0])
+
+    def append(self, value: Optional[str]):
+        if value:
+            self.data += value.encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def get(self, index: int) -> str:
+        # str() rather than .decode() so a memoryview over shared buffers works too
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.itemsize * len(self.offsets)
+
+
+class _Interner:
+    """Distinct values and the code of each"""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values: List = []
+        self.codes: Dict = {}
+
+    def code(self, key, value=None) -> int:
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(key if value is None else value)
+        return code
+
+
+class PlaceRow:
+    """A zero-copy, read-only view of one PlaceTable row with the Place attributes"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'PlaceTable', index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def table(self) -> 'PlaceTable':
+        return self._table
+
+    @property
+    def name(self) -> str:
+        return self._table._names.get(self._index)
+
+    @property
+    def address(self) -> str:
+        return self._table._addresses.get(self._index)
+
+    @property
+    def latitude(self) -> float:
+        return self._table.latitudes[self._index]
+
+    @property
+    def longitude(self) -> float:
+        return self._table.longitudes[self._index]
+
+    @property
+    def place_id(self) -> Optional[str]:
+        return self._table._place_ids.get(self._index) or None
+
+    @property
+    def rating(self) -> Optional[float]:
+        rating = self._table.ratings[self._index]
+        return None if math.isnan(rating) else rating
+
+    @property
+    def types(self) -> Optional[List[str]]:
+        return self._table.types_of(self._index)
+
+    @property
+    def opening_hours(self) -> Optional[Dict]:
+        code = self._table.hours_codes[self._index]
+        return dict(self._table._hours.values[code]) if code >= 0 else None
+
+    def to_place(self) -> Place:
+        return self._table.place(self._index)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PlaceRow) and other._table is self._table and other._index == self._index
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._index))
+
+    def __repr__(self) -> str:
+        return f"PlaceRow({self._index}, name={self.name!r}, latitude={self.latitude}, longitude={self.longitude})"
+
+
+class PlaceTable:
+    """Columnar storage for places.
+
+    Per place it holds three float64s (coordinates and rating), three
+    string offsets and small integer codes, instead of a Place instance with
+    its own dict, strings, types list and opening-hours dict.
+    """
+
+    __slots__ = ('latitudes', 'longitudes', 'ratings', 'hours_codes', 'type_offsets', 'type_codes',
+                 '_names', '_addresses', '_place_ids', '_types', '_hours')
+
+    _ARRAYS = ('latitudes', 'longitudes', 'ratings', 'hours_codes', 'type_offsets', 'type_codes')
+    _POOLS = ('_names', '_addresses', '_place_ids')
+
+    def __init__(self):
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.ratings = array('d')
+        self.hours_codes = array('i')
+        self.type_offsets = array('I', [0])
+        self.type_codes = array('I')
+        self._names = _StringPool()
+        self._addresses = _StringPool()
+        self._place_ids = _StringPool()
+        self._types = _Interner()
+        self._hours = _Interner()
+
+    # Building
+
+    def append(self, name: str, address: str, latitude: float, longitude: float, place_id: Optional[str] = None,
+               rating: Optional[float] = None, types: Optional[Sequence[str]] = None,
+               opening_hours: Optional[Dict] = None) -> int:
+        """Add a place; returns its row index"""
+        self._names.append(name)
+        self._addresses.append(address)
+        self._place_ids.append(place_id)
+        self.latitudes.append(latitude)
+        self.longitudes.append(longitude)
+        self.ratings.append(math.nan if rating is None else rating)
+        for place_type in types or ():
+            self.type_codes.append(self._types.code(place_type))
+        self.type_offsets.append(len(self.type_codes))
+        if opening_hours:
+            key = json.dumps(opening_hours, sort_keys=True, ensure_ascii=False)
+            self.hours_codes.append(self._hours.code(key, dict(opening_hours)))
+        else:
+            self.hours_codes.append(-1)
+        return len(self.latitudes) - 1
+
+    def append_place(self, place: Place) -> int:
+        return self.append(place.name, place.address, place.latitude, place.longitude, place.place_id,
+                           place.rating, place.types, place.opening_hours)
+
+    @classmethod
+    def from_places(cls, places: Iterable[Place]) -> 'PlaceTable':
+        table = cls()
+        for place in places:
+            table.append_place(place)
+        return table
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], city: str = '') -> 'PlaceTable':
+        """Build from city file records; records without coordinates are left out"""
+        table = cls()
+        city_name = city.replace('_', ' ')
+        for record in records:
+            coordinates = record_coordinates(record)
+            if coordinates is None:
+                continue
+            name = record.get('name', '')
+            rating = record.get('rating')
+            try:
+                rating = float(rating) if rating not in (None, '') else None
+            except (TypeError, ValueError):
+                rating = None
+            table.append(
+                name, f"{name}, {city_name}" if city_name else name, coordinates[0], coordinates[1],
+                record.get('detail_url') or None, rating,
+                [value for value in (record.get('wayfare_category'), record.get('category')) if value],
+                record.get('opening_hours') or None,
+            )
+        return table
+
+    @classmethod
+    def from_city_file(cls, path: str) -> 'PlaceTable':
+        """Build from a city JSON file, or from its columnar .wfc copy"""
+        if path.endswith('.wfc'):
+            with ColumnarCity(path) as city:
+                columns = [name for name in ('name', 'latitude', 'longitude', 'detail_url', 'rating',
+                                             'category', 'wayfare_category', 'opening_hours') if name in city.columns]
+                return cls.from_records(city.to_records(columns), city.city or '')
+        return cls.from_records(load_city_file(path), city_from_filename(path))
+
+    # Zero-copy export
+
+    def export_buffers(self) -> Tuple[Dict, Dict[str, object]]:
+        """(meta, buffers): JSON-compatible interned values plus every array and string buffer by name"""
+        meta = {'types': list(self._types.values), 'hours': list(self._hours.values)}
+        buffers = {name: getattr(self, name) for name in self._ARRAYS}
+        for name in self._POOLS:
+            pool = getattr(self, name)
+            buffers[f"{name}_offsets"] = pool.offsets
+            buffers[f"{name}_data"] = pool.data
+        return meta, buffers
+
+    @classmethod
+    def from_buffers(cls, meta: Dict, buffers: Dict[str, memoryview]) -> 'PlaceTable':
+        """Read-only table over export_buffers() output, e.g. memoryviews of shared memory or an mmap"""
+        table = cls.__new__(cls)
+        for name in cls._ARRAYS:
+            setattr(table, name, buffers[name])
+        for name in cls._POOLS:
+            pool = _StringPool.__new__(_StringPool)
+            pool.offsets = buffers[f"{name}_offsets"]
+            pool.data = buffers[f"{name}_data"]
+            setattr(table, name, pool)
+        table._types = _Interner()
+        table._types.values = list(meta['types'])
+        table._hours = _Interner()
+        table._hours.values = list(meta['hours'])
+        return table
+
+    # Access
+
+    def row_index(self, place) -> Optional[int]:
+        """Row number of a PlaceRow of this table, else None"""
+        return place.index if isinstance(place, PlaceRow) and place.table is self else None
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[PlaceRow, List[PlaceRow]]:
+        if isinstance(index, slice):
+            return [PlaceRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PlaceTable index out of range")
+        return PlaceRow(self, index)
+
+    def __iter__(self) -> Iterator[PlaceRow]:
+        for index in range(len(self)):
+            yield PlaceRow(self, index)
+
+    def head(self, size: int) -> 'PlaceTableHead':
+        """The first `size` rows (e.g. the most popular places a DistanceMatrix covers)"""
+        return PlaceTableHead(self, min(size, len(self)))
+
+    def types_of(self, index: int) -> Optional[List[str]]:
+        start, end = self.type_offsets[index], self.type_offsets[index + 1]
+        if start == end:
+            return None
+        values = self._types.values
+        return [values[code] for code in self.type_codes[start:end]]
+
+    def place(self, index: int) -> Place:
+        """Materialize one row as a regular Place"""
+        row = PlaceRow(self, index)
+        return Place(name=row.name, address=row.address, latitude=row.latitude, longitude=row.longitude,
+                     place_id=row.place_id, rating=row.rating, types=row.types, opening_hours=row.opening_hours)
+
+    def to_places(self) -> List[Place]:
+        return [self.place(index) for index in range(len(self))]
+
+    @property
+    def type_vocabulary(self) -> List[str]:
+        return list(self._types.values)
+
+    def nbytes(self) -> int:
+        """Approximate payload size of the arrays and buffers (excluding interned values)"""
+        arrays = (self.latitudes, self.longitudes, self.ratings, self.hours_codes, self.type_offsets, self.type_codes)
+        return (sum(a.itemsize * len(a) for a in arrays)
+                + self._names.nbytes() + self._addresses.nbytes() + self._place_ids.nbytes())
+
+
+class PlaceTableHead:
+    """The first rows of a PlaceTable as a sequence of PlaceRows; rows past the head are not in it"""
+
+    __slots__ = ('table', 'size')
+
+    def __init__(self, table: PlaceTable, size: int):
+        self.table = table
+        self.size = size
+
+    def row_index(self, place) -> Optional[int]:
+        index = self.table.row_index(place)
+        return index if index is not None and index < self.size else None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> PlaceRow:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("PlaceTableHead index out of range")
+        return PlaceRow(self.table, index)
+
+    def __iter__(self) -> Iterator[PlaceRow]:
+        for index in range(self.size):
+            yield PlaceRow(self.table, index)
@@ -0,0 +1,239 @@
+"""
+Plan Artifacts
+Planning data for each city's most popular attractions, precomputed offline
+from the attraction store. An artifact holds the distance matrix over the top
+places, their clusterings at every preset distance, and the plans, day
+groupings and routes of common request presets, stored as plan cache entries.
+There is one `.wfa` file per city in the data.frames layout; loading mmaps the
+matrix.
+
+Each artifact records a fingerprint of the places it was built from: every
+field its plans show or group by (id, name, address, coordinates, rating,
+types), in popularity order. Once any of them changes for a city's top places
+in the store, its artifact is reported stale and ignored, and plans are
+computed again until the artifact is rebuilt.
+
+  build_artifacts('attractions.sqlite', 'plan_artifacts')
+  dataset = PlanningDataset.from_store()
+  dataset.load_artifacts('plan_artifacts')
+  plan_request(dataset, PlanRequest('Paris', limit=20))   # a preset: answered from the artifact
+"""
+
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .core import TravelPlanner
+from .data.atomic import AtomicWriter
+from .data.frames import read_frame, write_frame
+from .distance_matrix import DistanceMatrix
+from .place_table import PlaceTable
+from .plan_cache import KEY_VERSION, PlanCache, plan_key
+from .planning import PlanningDataset, PlanRequest, plan_request
+from .store import DEFAULT_STORE_PATH, AttractionStore
+
+MAGIC = b'WFPLA\x00\x01\x00'
+FORMAT_VERSION = 1
+EXTENSION = '.wfa'
+DEFAULT_ARTIFACTS_DIR = 'plan_artifacts'
+DEFAULT_LIMITS = (10, 20, 30)
+DEFAULT_DISTANCES_KM = (5.0, 10.0, 25.0)
+DEFAULT_PLACES_PER_DAY = (3, 4, 5)
+DEFAULT_MATRIX_PLACES = 100
+
+Preset = Tuple[int, float, int]   # (limit, max_distance_km, max_places_per_day)
+
+
+def presets(limits: Sequence[int] = DEFAULT_LIMITS, distances_km: Sequence[float] = DEFAULT_DISTANCES_KM,
+            places_per_day: Sequence[int] = DEFAULT_PLACES_PER_DAY) -> List[Preset]:
+    """Every combination of the given request settings"""
+    return [(limit, float(distance_km), per_day)
+            for limit in limits for distance_km in distances_km for per_day in places_per_day]
+
+
+def _preset_name(limit, max_distance_km, max_places_per_day) -> str:
+    return f"{limit}/{float(max_distance_km):g}/{max_places_per_day}"
+
+
+def places_fingerprint(places: Sequence) -> str:
+    """Hash of every place field the stored plans depend on (the per-place part of plan_key)"""
+    return plan_key('places', places)
+
+
+def artifact_path(directory: str, city: str) -> str:
+    return os.path.join(directory, f"{city}{EXTENSION}")
+
+
+def _read(path: str) -> Tuple[Dict, List[memoryview]]:
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # The views keep the mapping alive
+    return read_frame(memoryview(mapped), MAGIC, 'plan artifact')
+
+
+def read_header(path: str) -> Optional[Dict]:
+    """Header of an artifact file, or None if it is missing or unreadable"""
+    try:
+        return _read(path)[0]
+    except (OSError, ValueError):
+        return None
+
+
+class PlanArtifact:
+    """One city's precomputed matrix, clusterings and preset plans.
+
+    `entries` are plan cache entries (JSON text by key) for TravelPlanner and
+    build_plan; `presets` maps each preset to the key of its whole plan.
+    """
+
+    def __init__(self, city: str, matrix: DistanceMatrix, entries: Dict[str, str], presets: Dict[str, str],
+                 header: Dict):
+        self.city = city
+        self.matrix = matrix
+        self.metric = matrix.metric
+        self.entries = entries
+        self.presets = presets
+        self.header = header
+        self._plans: Dict[str, Dict] = {}
+
+    @classmethod
+    def build(cls, city: str, table: PlaceTable, preset_list: Sequence[Preset], metric: str = 'geodesic',
+              matrix_places: int = DEFAULT_MATRIX_PLACES, source: Optional[str] = None) -> 'PlanArtifact':
+        """Compute the artifact of a city table (most popular first)"""
+        head = table.head(max([matrix_places] + [limit for limit, _, _ in preset_list]))
+        matrix = DistanceMatrix.compute(head, metric)
+        rows = list(head)
+        for max_distance_km in sorted({distance_km for _, distance_km, _ in preset_list}):
+            # Fills matrix.groupings[max_distance_km]
+            TravelPlanner(max_distance_km, distances=matrix).group_nearby_places(rows)
+
+        dataset = PlanningDataset({city: table}, {city: matrix})
+        cache = PlanCache(sys.maxsize)
+        preset_keys = {}
+        for limit, max_distance_km, max_places_per_day in preset_list:
+            request = PlanRequest(city, limit=limit, max_distance_km=max_distance_km,
+                                  max_places_per_day=max_places_per_day, metric=metric)
+            plan_request(dataset, request, cache)
+            preset_keys[_preset_name(limit, max_distance_km, max_places_per_day)] = plan_key(
+                'plan', dataset.select(request), city=city, max_places_per_day=max_places_per_day,
+                max_distance_km=max_distance_km, metric=metric)
+
+        header = {
+            'version': FORMAT_VERSION,
+            'key_version': KEY_VERSION,
+            'city': city,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'source': source,
+            'metric': metric,
+            'places': len(head),
+            'fingerprint': places_fingerprint(head),
+            'groupings': {f"{distance_km:g}": groups for distance_km, groups in matrix.groupings.items()},
+            'presets': preset_keys,
+            'entries': cache.export(),
+        }
+        return cls(city, matrix, header['entries'], preset_keys, header)
+
+    def save(self, path: str) -> int:
+        """Write the artifact file; returns its size"""
+        with AtomicWriter() as writer, writer.open(path, 'wb') as f:
+            return write_frame(f, MAGIC, self.header, [self.matrix.values])
+
+    @classmethod
+    def load(cls, path: str, table: PlaceTable) -> 'PlanArtifact':
+        """Load an artifact for the city table it was built from; raises ValueError if it is stale"""
+        header, buffers = _read(path)
+        if header.get('version') != FORMAT_VERSION or header.get('key_version') != KEY_VERSION:
+            raise ValueError("built by another version")
+        head = table.head(header['places'])
+        if len(head) != header['places'] or places_fingerprint(head) != header['fingerprint']:
+            raise ValueError("stale: the city's top places changed since it was built")
+        matrix = DistanceMatrix(head, buffers[0], header['metric'])
+        matrix.groupings = {float(distance_km): groups for distance_km, groups in header['groupings'].items()}
+        return cls(header['city'], matrix, header['entries'], header['presets'], header)
+
+    def plan_for(self, request: PlanRequest) -> Optional[Dict]:
+        """The stored plan of a preset request (the top places, no filters), or None"""
+        if (request.metric != self.metric or request.names or request.places or request.categories
+                or request.min_rating is not None or request.days is not None
+                or request.time_budget_ms is not None or request.mode != 'all'
+                or request.day_minutes is not None):
+            return None
+        key = self.presets.get(_preset_name(request.limit, request.max_distance_km, request.max_places_per_day))
+        plan = self._plans.get(key)
+        if plan is None:
+            text = self.entries.get(key) if key is not None else None
+            if text is None:
+                return None
+            plan = json.loads(text)
+            # JSON turned the day numbers into strings
+            plan["days"] = {int(day): day_data for day, day_data in plan["days"].items()}
+            self._plans[key] = plan
+        # Decoding is the expensive part, so plans are decoded once and handed out as copies
+        return _copy_plan(plan)
+
+
+def _copy_plan(plan: Dict) -> Dict:
+    """Copy of a build_plan() result (its dicts and lists; the values are immutable)"""
+    return dict(plan, days={day: dict(day_data, places=[dict(place) for place in day_data["places"]])
+                            for day, day_data in plan["days"].items()})
+
+
+def load_artifacts(dataset: PlanningDataset, directory: str = DEFAULT_ARTIFACTS_DIR) -> Dict[str, str]:
+    """Attach the artifacts in `directory` to the dataset's cities; returns 'loaded' or the reason not, by city"""
+    statuses = {}
+    for city, table in dataset.tables.items():
+        path = artifact_path(directory, city)
+        if not os.path.exists(path):
+            statuses[city] = 'missing'
+            continue
+        try:
+            dataset.artifacts[city] = PlanArtifact.load(path, table)
+        except ValueError as e:
+            statuses[city] = str(e)
+        else:
+            statuses[city] = 'loaded'
+    return statuses
+
+
+def _build_city(store_path: str, directory: str, city: str, preset_list: Sequence[Preset], metric: str,
+                matrix_places: int, source: Optional[str], force: bool) -> Tuple[str, str]:
+    """(city, status) after building one city's artifact; runs in worker processes"""
+    table = PlanningDataset.from_store(store_path, [city]).tables.get(city)
+    if table is None or len(table) < 2:
+        return city, 'skipped: fewer than 2 geocoded places'
+    path = artifact_path(directory, city)
+    size = max([matrix_places] + [limit for limit, _, _ in preset_list])
+    header = None if force else read_header(path)
+    if (header is not None and header.get('version') == FORMAT_VERSION and header.get('key_version') == KEY_VERSION
+            and header.get('metric') == metric
+            and set(header.get('presets', ())) == {_preset_name(*preset) for preset in preset_list}
+            and header.get('places') == min(size, len(table))
+            and header.get('fingerprint') == places_fingerprint(table.head(size))):
+        return city, 'current'
+    artifact = PlanArtifact.build(city, table, preset_list, metric, matrix_places, source)
+    artifact.save(path)
+    return city, f"built ({len(artifact.presets)} presets, {len(artifact.matrix)} places)"
+
+
+def build_artifacts(store_path: str = DEFAULT_STORE_PATH, directory: str = DEFAULT_ARTIFACTS_DIR,
+                    cities: Optional[Sequence[str]] = None, preset_list: Optional[Sequence[Preset]] = None,
+                    metric: str = 'geodesic', matrix_places: int = DEFAULT_MATRIX_PLACES,
+                    workers: Optional[int] = None, force: bool = False) -> Dict[str, str]:
+    """Build (or keep, when still current) the artifact of every city in the store; returns statuses by city"""
+    preset_list = list(preset_list or presets())
+    with AttractionStore(store_path, read_only=True) as store:
+        cities = list(cities or store.cities(geocoded=True))
+        sources = store.sources()
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(store_path, directory, city, preset_list, metric, matrix_places, sources.get(city), force)
+            for city in cities]
+    if workers == 1 or len(jobs) <= 1:
+        results = [_build_city(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_build_city, *zip(*jobs)))
+    return dict(results)
@@ -0,0 +1,132 @@
+"""
+Plan Cache
+Results of TravelPlanner computations keyed by a canonical hash of the input
+places (every field a plan shows or groups by, in order) and every planner
+setting that changes the result. An in-memory LRU holds the hottest entries; an optional
+directory tier keeps them across restarts and shares them between worker
+processes.
+
+Entries are stored as JSON text, so each hit returns a fresh copy that the
+caller may modify. Pinned entries (precomputed plan artifacts) are checked
+first and never evicted.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+from .data.atomic import atomic_write_text
+
+DEFAULT_MAX_ENTRIES = 1024
+KEY_VERSION = 2
+
+
+def plan_key(kind: str, places: Sequence, **settings) -> str:
+    """SHA-256 of the places and settings a computation depends on.
+
+    Each place contributes its id, name, address, coordinates, rating and
+    types: cached plans repeat the first ones and visit durations come from
+    the types. Coordinates are rounded to 7 decimals (~1 cm) so float noise
+    from different loaders does not split entries.
+    """
+    canonical = {
+        'version': KEY_VERSION,
+        'kind': kind,
+        'places': [[place.place_id, place.name, place.address, round(place.latitude, 7), round(place.longitude, 7),
+                    place.rating, list(place.types or ())]
+                   for place in places],
+        'settings': settings,
+    }
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class PlanCache:
+    """LRU cache of JSON-compatible plan results with an optional on-disk tier"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._pinned: Dict[str, str] = {}
+        self._pinned_sources: Dict[int, Dict[str, str]] = {}
+        self.stats: Dict[str, int] = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, text: str):
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for `key` (a fresh copy), or None"""
+        text = self._pinned.get(key)
+        if text is not None:
+            self.stats['hits'] += 1
+            return json.loads(text)
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return json.loads(text)
+        if self.directory is not None:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                self._remember(key, text)
+                self.stats['hits'] += 1
+                self.stats['disk_hits'] += 1
+                return json.loads(text)
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, value: Any):
+        text = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        self._remember(key, text)
+        self.stats['stores'] += 1
+        if self.directory is not None:
+            os.makedirs(os.path.dirname(self._path(key)), exist_ok=True)
+            atomic_write_text(self._path(key), text, fsync='never')
+
+    def pin(self, entries: Dict[str, str]):
+        """Serve these entries (JSON text by key) from memory, never evicted; pinning the same dict again is free"""
+        if id(entries) not in self._pinned_sources:
+            self._pinned_sources[id(entries)] = entries
+            self._pinned.update(entries)
+
+    def unpin(self, entries: Dict[str, str]):
+        """Stop serving entries pinned from this dict (e.g. the artifact of a replaced dataset version)"""
+        if self._pinned_sources.pop(id(entries), None) is not None:
+            self._pinned = {}
+            for source in self._pinned_sources.values():
+                self._pinned.update(source)
+
+    def export(self) -> Dict[str, str]:
+        """The memory tier's entries as JSON text by key (e.g. to store in a plan artifact)"""
+        return dict(self._entries)
+
+    def clear(self, disk: bool = False):
+        """Drop the memory tier (and the disk tier with disk=True)"""
+        self._entries.clear()
+        if disk and self.directory is not None and os.path.isdir(self.directory):
+            for prefix in os.listdir(self.directory):
+                prefix_dir = os.path.join(self.directory, prefix)
+                for filename in os.listdir(prefix_dir):
+                    os.remove(os.path.join(prefix_dir, filename))
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
@@ -0,0 +1,345 @@
+"""
+Plan Building
+Request-level planning shared by the planning service and batch tools: pick a
+city's places from a dataset loaded once, group them into days, order each
+day once and report per-leg distances in the paris_plan.json layout.
+"""
+
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .core import Place, TravelPlanner
+from .distance_matrix import METRICS, DistanceMatrix
+from .matching import NameIndex
+from .place_table import PlaceTable
+from .plan_cache import PlanCache, plan_key
+from .store import DEFAULT_STORE_PATH, AttractionStore
+from .visit_time import DEFAULT_DAY_MINUTES, DEFAULT_TRAVEL_SPEED_KMH, travel_minutes, visit_minutes
+
+DEFAULT_MAX_DISTANCE_KM = 25.0
+DEFAULT_MAX_PLACES_PER_DAY = 5
+DEFAULT_LIMIT = 20
+MODES = ('all', 'best')
+
+
+@dataclass
+class PlanRequest:
+    """What to plan: which places of a city, and the planner settings"""
+    city: str
+    limit: Optional[int] = DEFAULT_LIMIT
+    categories: Optional[List[str]] = None   # matched against wayfare_category and category
+    min_rating: Optional[float] = None
+    names: Optional[List[str]] = None        # explicit attractions instead of the most popular ones
+    places: Optional[List[Dict]] = None      # or explicit places with coordinates ({name, latitude, longitude, ...})
+    days: Optional[int] = None               # spread the places over this many days (sets places per day)
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM
+    max_places_per_day: int = DEFAULT_MAX_PLACES_PER_DAY
+    metric: str = 'geodesic'
+    time_budget_ms: Optional[float] = None   # improve the routes for up to this long (see anytime.py)
+    mode: str = 'all'                        # 'best': only the best places that fit `days` (see orienteering.py)
+    day_minutes: Optional[float] = None      # fill days by visit plus travel time, not count ('best' mode default: 480)
+    travel_speed_kmh: float = DEFAULT_TRAVEL_SPEED_KMH
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlanRequest':
+        """Validate a decoded JSON request; raises ValueError with a message fit for the caller"""
+        if not isinstance(data, dict):
+            raise ValueError("Plan request must be a JSON object")
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown plan request fields: {', '.join(sorted(unknown))}")
+        if not isinstance(data.get('city'), str) or not data['city']:
+            raise ValueError("'city' is required")
+        request = cls(**data)
+        if isinstance(request.categories, str):
+            request.categories = [request.categories]
+        if isinstance(request.names, str):
+            request.names = [request.names]
+        try:
+            request.max_distance_km = float(request.max_distance_km)
+            request.max_places_per_day = int(request.max_places_per_day)
+            request.limit = None if request.limit is None else int(request.limit)
+            request.min_rating = None if request.min_rating is None else float(request.min_rating)
+            request.days = None if request.days is None else int(request.days)
+            request.time_budget_ms = None if request.time_budget_ms is None else float(request.time_budget_ms)
+            request.day_minutes = None if request.day_minutes is None else float(request.day_minutes)
+            request.travel_speed_kmh = float(request.travel_speed_kmh)
+        except (TypeError, ValueError):
+            raise ValueError("limit, min_rating, days, max_distance_km, max_places_per_day, time_budget_ms, "
+                             "day_minutes and travel_speed_kmh must be numbers")
+        if not math.isfinite(request.max_distance_km) or request.max_distance_km <= 0:
+            raise ValueError("'max_distance_km' must be positive")
+        if request.max_places_per_day < 1:
+            raise ValueError("'max_places_per_day' must be at least 1")
+        if request.limit is not None and request.limit < 1:
+            raise ValueError("'limit' must be at least 1")
+        if request.days is not None and request.days < 1:
+            raise ValueError("'days' must be at least 1")
+        if request.time_budget_ms is not None and not (math.isfinite(request.time_budget_ms)
+                                                       and request.time_budget_ms >= 0):
+            raise ValueError("'time_budget_ms' must be a non-negative number")
+        if request.day_minutes is not None and not (math.isfinite(request.day_minutes) and request.day_minutes > 0):
+            raise ValueError("'day_minutes' must be positive")
+        if not math.isfinite(request.travel_speed_kmh) or request.travel_speed_kmh <= 0:
+            raise ValueError("'travel_speed_kmh' must be positive")
+        if request.mode not in MODES:
+            raise ValueError(f"'mode' must be one of {', '.join(MODES)}")
+        if request.places is not None:
+            request.places = [_place_fields(place) for place in request.places]
+        if request.metric not in METRICS:
+            raise ValueError(f"'metric' must be one of {', '.join(METRICS)}")
+        return request
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _place_fields(data) -> Dict:
+    """Check one explicit place of a request ({name, latitude, longitude} plus optional address, rating, category)"""
+    if not isinstance(data, dict) or not isinstance(data.get('name'), str):
+        raise ValueError("Each of 'places' must be an object with a 'name'")
+    try:
+        latitude, longitude = float(data['latitude']), float(data['longitude'])
+        rating = None if data.get('rating') is None else float(data['rating'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Place '{data['name']}' needs numeric 'latitude' and 'longitude'")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f"Place '{data['name']}' has coordinates out of range")
+    # 'category' as sent by callers, 'types' as stored (so to_dict() round-trips)
+    types = [data['category']] if isinstance(data.get('category'), str) and data['category'] else data.get('types')
+    if types is not None and not (isinstance(types, list) and all(isinstance(value, str) for value in types)):
+        raise ValueError(f"Place '{data['name']}' has an invalid 'category'")
+    return {'name': data['name'], 'address': data.get('address') or data['name'],
+            'latitude': latitude, 'longitude': longitude, 'rating': rating, 'types': types}
+
+
+class PlanningDataset:
+    """Per-city PlaceTables (most popular first) loaded once and shared by every request.
+
+    `matrices` optionally holds a DistanceMatrix over a city's whole table;
+    requests with the same metric look distances up in it. `artifacts` holds
+    precomputed plan_artifacts.PlanArtifacts (see load_artifacts).
+    """
+
+    def __init__(self, tables: Dict[str, PlaceTable], matrices: Optional[Dict[str, DistanceMatrix]] = None):
+        self.tables = tables
+        self.matrices = matrices or {}
+        self.artifacts: Dict = {}
+        self._name_indexes: Dict[str, NameIndex] = {}
+
+    @classmethod
+    def from_store(cls, path: str = DEFAULT_STORE_PATH, cities: Optional[Sequence[str]] = None) -> 'PlanningDataset':
+        tables = {}
+        with AttractionStore(path, read_only=True) as store:
+            for city in cities or store.cities():
+                table = PlaceTable.from_places(store.places(city=city, order_by='popularity'))
+                if len(table):
+                    tables[city] = table
+        return cls(tables)
+
+    def cities(self) -> List[str]:
+        return sorted(self.tables)
+
+    def load_artifacts(self, directory: str) -> Dict[str, str]:
+        """Attach the current plan artifacts in `directory`; returns 'loaded' or the reason not, by city"""
+        from .plan_artifacts import load_artifacts
+        return load_artifacts(self, directory)
+
+    def name_index(self, city: str) -> NameIndex:
+        """Fuzzy name index of a city, built on first use"""
+        index = self._name_indexes.get(city)
+        if index is None:
+            table = self.tables[city]
+            index = self._name_indexes[city] = NameIndex((row.name for row in table), range(len(table)))
+        return index
+
+    def select(self, request: PlanRequest) -> List:
+        """The places a request asks for, as PlaceRows of the city's table (or Places, for explicit places).
+
+        In 'best' mode every matching place is a candidate: `limit` does not apply.
+        """
+        if request.places is not None:
+            return [Place(**place) for place in request.places]
+        table = self.tables.get(request.city)
+        if table is None:
+            raise KeyError(request.city)
+        if request.names:
+            index = self.name_index(request.city)
+            rows, seen = [], set()
+            for name in request.names:
+                match = index.best(name)
+                if match is not None and match.value not in seen:
+                    seen.add(match.value)
+                    rows.append(table[match.value])
+            return rows
+
+        categories = set(request.categories) if request.categories else None
+        limit = request.limit if request.mode == 'all' else None
+        rows = []
+        for row in table:
+            if request.min_rating is not None and (row.rating is None or row.rating < request.min_rating):
+                continue
+            if categories is not None and not categories.intersection(table.types_of(row.index) or ()):
+                continue
+            rows.append(row)
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+
+def plan_layout(routes: Dict[int, Sequence[Place]], planner: TravelPlanner, total_places: int,
+                max_distance_km: float, max_places_per_day: int, city: Optional[str] = None) -> Dict:
+    """The paris_plan.json structure of ordered day routes, with per-leg distances"""
+    plan_data = {
+        "city": city,
+        "total_places": total_places,
+        "total_days": len(routes),
+        "max_distance_km": max_distance_km,
+        "max_places_per_day": max_places_per_day,
+        "days": {},
+    }
+    for day_num, optimized_route in routes.items():
+        day_data = {
+            "day_number": day_num,
+            "total_places": len(optimized_route),
+            "total_distance_km": 0,
+            "places": [],
+        }
+        for i, place in enumerate(optimized_route):
+            place_data = {
+                "order": i + 1,
+                "name": place.name,
+                "address": place.address,
+                "latitude": place.latitude,
+                "longitude": place.longitude,
+                "rating": place.rating,
+                "distance_from_previous": 0,
+            }
+            if i > 0:
+                distance_km = planner.calculate_distance(optimized_route[i - 1], place)
+                place_data["distance_from_previous"] = round(distance_km, 1)
+                day_data["total_distance_km"] += distance_km
+            day_data["places"].append(place_data)
+        day_data["total_distance_km"] = round(day_data["total_distance_km"], 1)
+        plan_data["days"][day_num] = day_data
+    return plan_data
+
+
+def add_day_minutes(plan_data: Dict, routes: Dict[int, Sequence[Place]], day_minutes: float,
+                    travel_speed_kmh: Optional[float] = None) -> Dict:
+    """Add visit minutes per place and visit, travel and total minutes per day to a plan_layout() result"""
+    speed = travel_speed_kmh or DEFAULT_TRAVEL_SPEED_KMH
+    plan_data["day_minutes"] = day_minutes
+    for day_num, route in routes.items():
+        day_data = plan_data["days"][day_num]
+        visits = [visit_minutes(place) for place in route]
+        for place_data, minutes in zip(day_data["places"], visits):
+            place_data["visit_minutes"] = minutes
+        travel = travel_minutes(day_data["total_distance_km"], speed)
+        day_data["visit_minutes"] = sum(visits)
+        day_data["travel_minutes"] = round(travel, 1)
+        day_data["total_minutes"] = round(sum(visits) + travel, 1)
+    return plan_data
+
+
+def build_plan(places: Sequence[Place], max_distance_km: float = DEFAULT_MAX_DISTANCE_KM,
+               max_places_per_day: int = DEFAULT_MAX_PLACES_PER_DAY, city: Optional[str] = None,
+               planner: Optional[TravelPlanner] = None, day_minutes: Optional[float] = None,
+               travel_speed_kmh: Optional[float] = None) -> Dict:
+    """Group places into days and order each day once; returns the paris_plan.json structure.
+
+    With day_minutes, days are filled by visit plus travel time instead of
+    max_places_per_day, and every day reports its minutes. With a planner
+    that has a PlanCache, the whole plan is cached too.
+    """
+    planner = planner or TravelPlanner(max_distance_km=max_distance_km)
+    planner.max_distance_km = max_distance_km
+    settings = {'max_places_per_day': max_places_per_day}
+    if day_minutes is not None:
+        settings.update(day_minutes=day_minutes, travel_speed_kmh=travel_speed_kmh,
+                        visit_minutes=[visit_minutes(place) for place in places])
+    key = None
+    if planner.cache is not None:
+        key = plan_key('plan', places, city=city, **settings, **planner.solver_settings())
+        cached = planner.cache.get(key)
+        if cached is not None:
+            # JSON turned the day numbers into strings
+            cached["days"] = {int(day): day_data for day, day_data in cached["days"].items()}
+            return cached
+    travel_plan = planner.create_travel_plan(places, max_places_per_day, day_minutes, travel_speed_kmh)
+    routes = {day_num: planner.optimize_route(day_places) for day_num, day_places in travel_plan.items()}
+    plan_data = plan_layout(routes, planner, len(places), max_distance_km, max_places_per_day, city)
+    if day_minutes is not None:
+        add_day_minutes(plan_data, routes, day_minutes, travel_speed_kmh)
+    if key is not None:
+        planner.cache.put(key, plan_data)
+    return plan_data
+
+
+def plan_summary(plan_data: Dict) -> List[str]:
+    """Printable day-by-day summary lines of a build_plan() result (no recomputation)"""
+    lines = []
+    for day_num, day_data in plan_data["days"].items():
+        lines.append(f"📅 Day {day_num} ({day_data['total_places']} places, {day_data['total_distance_km']:.1f} km):")
+        for place_data in day_data["places"]:
+            lines.append(f"  {place_data['order']}. {place_data['name']}")
+    return lines
+
+
+def plan_request(dataset: PlanningDataset, request: PlanRequest, cache: Optional[PlanCache] = None,
+                 on_progress=None) -> Dict:
+    """Select a request's places from the dataset and build its plan (preset plans come from the city's artifact).
+
+    Requests with a time_budget_ms are planned by anytime.build_plan_anytime,
+    which reports to on_progress; their plan carries its quality metadata
+    under "optimization". 'best' mode requests are planned by
+    orienteering.best_plan, with its selection metadata under "orienteering".
+    """
+    artifact = dataset.artifacts.get(request.city)
+    if artifact is not None:
+        plan = artifact.plan_for(request)
+        if plan is not None:
+            return plan
+    places = dataset.select(request)
+    if request.mode == 'best':
+        return _best_plan(dataset, request, places, cache)
+    max_places_per_day = request.max_places_per_day
+    if request.days is not None:
+        max_places_per_day = max(1, math.ceil(len(places) / request.days))
+    planner = TravelPlanner(max_distance_km=request.max_distance_km, cache=cache)
+    city_matrix = dataset.matrices.get(request.city)
+    if artifact is not None and artifact.metric == request.metric and artifact.matrix.covers(places):
+        # Its stored groupings and routes need a plan cache; without one only its matrix pays off
+        if cache is not None:
+            planner.load_artifact(artifact)
+        else:
+            planner.distances = artifact.matrix
+    elif city_matrix is not None and city_matrix.metric == request.metric:
+        planner.distances = city_matrix
+    elif request.metric != 'geodesic':
+        planner.distances = DistanceMatrix.compute(places, request.metric)
+    if request.time_budget_ms is not None:
+        from .anytime import build_plan_anytime
+        result = build_plan_anytime(places, request.time_budget_ms, request.max_distance_km, max_places_per_day,
+                                    request.city, planner, on_progress, request.day_minutes,
+                                    request.travel_speed_kmh)
+        plan = result.plan
+        plan["optimization"] = result.metadata()
+        return plan
+    return build_plan(places, request.max_distance_km, max_places_per_day, request.city, planner,
+                      request.day_minutes, request.travel_speed_kmh)
+
+
+def _best_plan(dataset: PlanningDataset, request: PlanRequest, places: Sequence, cache: Optional[PlanCache]) -> Dict:
+    """Plan a 'best' mode request: travel times from the city's matrix (any metric) when it has one"""
+    from .orienteering import best_plan
+    planner = TravelPlanner(max_distance_km=request.max_distance_km, cache=cache)
+    city_matrix = dataset.matrices.get(request.city)
+    if city_matrix is not None and city_matrix.metric == request.metric:
+        planner.distances = city_matrix
+    result = best_plan(places, request.days or 1, request.day_minutes or DEFAULT_DAY_MINUTES,
+                       request.travel_speed_kmh, request.city, planner, city_matrix, request.time_budget_ms)
+    plan = result.plan
+    plan["orienteering"] = result.metadata()
+    return plan
@@ -0,0 +1,360 @@
+"""
+Route Search
+Open-path route construction and improvement over a square distance array
+(n * n float64s, row-major): nearest-neighbour construction and
+randomized nearest-neighbour constructions for multi-start search, 2-opt and
+relocate local search with an optional deadline, an exact solver for small
+days and a minimum-spanning-tree lower bound. Routes are lists of positions
+into the place list the array was built from.
+
+Deadlines are time.monotonic() values.
+"""
+
+import heapq
+import random
+import time
+from array import array
+from typing import List, Optional, Sequence
+
+EXACT_MAX_PLACES = 9
+EXACT_SECONDS_PER_STEP = 1e-7
+NEIGHBORS = 10
+
+
+def square_distances(places: Sequence, planner) -> array:
+    """Distances between every pair of places, looked up in the planner's matrix where it covers them"""
+    n = len(places)
+    matrix = planner.distances
+    positions = matrix.indices(places) if matrix is not None else None
+    if positions is not None and n == len(matrix) and positions == list(range(n)):
+        return matrix.square()
+    d = array('d', bytes(8 * n * n))
+    for i in range(n):
+        for j in range(i + 1, n):
+            if positions is not None:
+                distance_km = matrix.between(positions[i], positions[j])
+            else:
+                distance_km = planner.calculate_distance(places[i], places[j])
+            d[i * n + j] = d[j * n + i] = distance_km
+    return d
+
+
+def path_length(order: Sequence[int], d: Sequence[float], n: int) -> float:
+    return sum(d[a * n + b] for a, b in zip(order, order[1:]))
+
+
+def nearest_neighbor(d: Sequence[float], n: int, start: int = 0) -> List[int]:
+    """Greedy route from `start`, always moving to the closest unvisited place"""
+    route = [start]
+    unvisited = set(range(n))
+    unvisited.discard(start)
+    while unvisited:
+        row = route[-1] * n
+        nearest = min(unvisited, key=d[row:row + n].__getitem__)
+        route.append(nearest)
+        unvisited.remove(nearest)
+    return route
+
+
+def neighbor_lists(d: Sequence[float], n: int, size: int = NEIGHBORS) -> array:
+    """The `size` nearest other places of every place, closest first (n * size ints, row-major)"""
+    size = min(size, n - 1)
+    lists = array('i')
+    for i in range(n):
+        row = i * n
+        nearest = heapq.nsmallest(size + 1, range(n), key=d[row:row + n].__getitem__)
+        lists.extend([j for j in nearest if j != i][:size])
+    return lists
+
+
+def randomized_nearest_neighbor(d: Sequence[float], n: int, start: int, rng: random.Random,
+                                candidates: int = 2, neighbors: Optional[Sequence[int]] = None) -> List[int]:
+    """Nearest-neighbour route from `start` that moves to one of the `candidates` closest unvisited places.
+
+    With neighbor lists, the candidates come from the current place's list
+    while it has unvisited places left.
+    """
+    size = len(neighbors) // n if neighbors else 0
+    route = [start]
+    unvisited = set(range(n))
+    unvisited.discard(start)
+    while unvisited:
+        current = route[-1]
+        nearest = [j for j in neighbors[current * size:(current + 1) * size] if j in unvisited][:candidates] \
+            if size else []
+        if not nearest:
+            row = current * n
+            nearest = heapq.nsmallest(candidates, unvisited, key=d[row:row + n].__getitem__)
+        chosen = nearest[0] if len(nearest) == 1 else rng.choice(nearest)
+        route.append(chosen)
+        unvisited.remove(chosen)
+    return route
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def two_opt(order: List[int], d: Sequence[float], n: int, deadline: Optional[float] = None) -> bool:
+    """Reverse segments while that shortens the path (in place); returns False if the deadline cut it short"""
+    k = len(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(k - 1):
+            if _expired(deadline):
+                return False
+            a = order[i - 1] if i > 0 else None
+            b = order[i]
+            for j in range(i + 1, k):
+                c = order[j]
+                e = order[j + 1] if j + 1 < k else None
+                # Reversing order[i..j] replaces the edges a-b and c-e with a-c and b-e
+                before = (d[a * n + b] if a is not None else 0.0) + (d[c * n + e] if e is not None else 0.0)
+                after = (d[a * n + c] if a is not None else 0.0) + (d[b * n + e] if e is not None else 0.0)
+                if after < before - 1e-9:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    improved = True
+                    b = order[i]
+    return True
+
+
+def relocate(order: List[int], d: Sequence[float], n: int, deadline: Optional[float] = None) -> bool:
+    """Move single places to a cheaper position while that shortens the path (in place).
+
+    Returns False if the deadline cut it short.
+    """
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order)):
+            if _expired(deadline):
+                return False
+            k = len(order)
+            node = order[i]
+            prev = order[i - 1] if i > 0 else None
+            nxt = order[i + 1] if i + 1 < k else None
+            removed = ((d[prev * n + node] if prev is not None else 0.0)
+                       + (d[node * n + nxt] if nxt is not None else 0.0)
+                       - (d[prev * n + nxt] if prev is not None and nxt is not None else 0.0))
+            rest = order[:i] + order[i + 1:]
+            best_gain, best_position = 1e-9, None
+            for position in range(len(rest) + 1):
+                if position == i:
+                    continue
+                left = rest[position - 1] if position > 0 else None
+                right = rest[position] if position < len(rest) else None
+                added = ((d[left * n + node] if left is not None else 0.0)
+                         + (d[node * n + right] if right is not None else 0.0)
+                         - (d[left * n + right] if left is not None and right is not None else 0.0))
+                if removed - added > best_gain:
+                    best_gain, best_position = removed - added, position
+            if best_position is not None:
+                rest.insert(best_position, node)
+                order[:] = rest
+                improved = True
+    return True
+
+
+def local_search(order: List[int], d: Sequence[float], n: int, deadline: Optional[float] = None,
+                 neighbors: Optional[Sequence[int]] = None) -> bool:
+    """2-opt and relocate until neither improves the path (in place); False if the deadline cut it short.
+
+    With neighbor lists (for a route through all n places) only moves that
+    join a place to one of its nearest neighbours are tried, which makes long
+    routes tractable.
+    """
+    if neighbors is not None:
+        return _neighbor_search(order, d, n, neighbors, deadline)
+    while True:
+        length = path_length(order, d, n)
+        if not two_opt(order, d, n, deadline) or not relocate(order, d, n, deadline):
+            return False
+        if path_length(order, d, n) >= length - 1e-9:
+            return True
+
+
+def _neighbor_search(order: List[int], d: Sequence[float], n: int, neighbors: Sequence[int],
+                     deadline: Optional[float]) -> bool:
+    """local_search over neighbor lists, revisiting only places next to a change ("don't look" bits)"""
+    size = len(neighbors) // n
+    k = len(order)
+    pos = [0] * n
+    for i, place in enumerate(order):
+        pos[place] = i
+    active = list(reversed(order))
+    queued = [False] * n
+    for place in order:
+        queued[place] = True
+
+    def touch(*places):
+        for place in places:
+            if place is not None and not queued[place]:
+                queued[place] = True
+                active.append(place)
+
+    def reverse(i: int, j: int):
+        order[i:j + 1] = order[i:j + 1][::-1]
+        for position in range(i, j + 1):
+            pos[order[position]] = position
+
+    def two_opt_move(x: int) -> bool:
+        """Reverse a segment so that x ends up next to one of its neighbours"""
+        i = pos[x]
+        row = x * n
+        near = neighbors[x * size:(x + 1) * size]
+        p = order[i - 1] if i > 0 else None
+        s = order[i + 1] if i + 1 < k else None
+        # Drop the edge x-s and join x to a neighbour c (with no s, any neighbour may pay off)
+        d_xs = d[row + s] if s is not None else float('inf')
+        for c in near:
+            d_xc = d[row + c]
+            if d_xc >= d_xs:
+                break
+            j = pos[c]
+            if j > i:
+                # x s .. c e  ->  x c .. s e
+                e = order[j + 1] if j + 1 < k else None
+                delta = d_xc - d_xs + (d[s * n + e] - d[c * n + e] if e is not None else 0.0)
+                first, last, ends = i + 1, j, (s, c, e)
+            else:
+                # c f .. x s  ->  c x .. f s
+                f = order[j + 1]
+                if f == x:
+                    continue
+                delta = (d_xc - d[c * n + f] + (d[f * n + s] - d_xs if s is not None else 0.0))
+                first, last, ends = j + 1, i, (c, f, s)
+            if delta < -1e-9:
+                reverse(first, last)
+                touch(x, *ends)
+                return True
+        # Drop the edge p-x and join x to a neighbour c
+        d_px = d[p * n + x] if p is not None else float('inf')
+        for c in near:
+            d_xc = d[row + c]
+            if d_xc >= d_px:
+                break
+            j = pos[c]
+            if j < i:
+                # a c .. p x  ->  a p .. c x
+                a = order[j - 1] if j > 0 else None
+                delta = d_xc - d_px + (d[a * n + p] - d[a * n + c] if a is not None else 0.0)
+                first, last, ends = j, i - 1, (a, c, p)
+            else:
+                # p x .. g c  ->  p g .. x c
+                g = order[j - 1]
+                if g == x:
+                    continue
+                delta = (d_xc - d[g * n + c] + (d[p * n + g] - d_px if p is not None else 0.0))
+                first, last, ends = i, j - 1, (p, g, c)
+            if delta < -1e-9:
+                reverse(first, last)
+                touch(x, *ends)
+                return True
+        return False
+
+    def relocate_move(x: int) -> bool:
+        i = pos[x]
+        p = order[i - 1] if i > 0 else None
+        s = order[i + 1] if i + 1 < k else None
+        row = x * n
+        saved = ((d[p * n + x] if p is not None else 0.0) + (d[row + s] if s is not None else 0.0)
+                 - (d[p * n + s] if p is not None and s is not None else 0.0))
+        if saved <= 1e-9:
+            return False
+        for c in neighbors[x * size:(x + 1) * size]:
+            if d[row + c] >= saved:
+                break
+            j = pos[c]
+            for left, right in ((c, order[j + 1] if j + 1 < k else None), (order[j - 1] if j > 0 else None, c)):
+                if left == x or right == x:
+                    continue
+                added = ((d[left * n + x] if left is not None else 0.0)
+                         + (d[row + right] if right is not None else 0.0)
+                         - (d[left * n + right] if left is not None and right is not None else 0.0))
+                if added < saved - 1e-9:
+                    del order[i]
+                    target = pos[right] if right is not None else k
+                    if target > i:
+                        target -= 1
+                    order.insert(target, x)
+                    for position in range(min(i, target), max(i, target) + 1):
+                        pos[order[position]] = position
+                    touch(p, s, left, right, x)
+                    return True
+        return False
+
+    checks = 0
+    while active:
+        checks += 1
+        if deadline is not None and checks % 64 == 0 and time.monotonic() >= deadline:
+            return False
+        x = active.pop()
+        queued[x] = False
+        if two_opt_move(x) or relocate_move(x):
+            touch(x)
+    return True
+
+
+def exact_path(d: Sequence[float], n: int) -> List[int]:
+    """Shortest open path through all n places (Held-Karp; n up to EXACT_MAX_PLACES)"""
+    if n <= 2:
+        return list(range(n))
+    inf = float('inf')
+    full = (1 << n) - 1
+    # cost[mask * n + j]: shortest path through the places in mask, ending at j
+    cost = [inf] * (n << n)
+    parent = [-1] * (n << n)
+    for j in range(n):
+        cost[(1 << j) * n + j] = 0.0
+    for mask in range(1, full + 1):
+        row = mask * n
+        for j in range(n):
+            base = cost[row + j]
+            if base == inf:
+                continue
+            offset = j * n
+            for k in range(n):
+                if mask & (1 << k):
+                    continue
+                slot = (mask | (1 << k)) * n + k
+                candidate = base + d[offset + k]
+                if candidate < cost[slot]:
+                    cost[slot] = candidate
+                    parent[slot] = j
+    end = min(range(n), key=lambda j: cost[full * n + j])
+    route, mask = [], full
+    while end != -1:
+        route.append(end)
+        end, mask = parent[mask * n + end], mask & ~(1 << end)
+    return route[::-1]
+
+
+def exact_seconds(n: int) -> float:
+    """Rough time exact_path takes for n places"""
+    return n * n * (1 << n) * EXACT_SECONDS_PER_STEP
+
+
+def spanning_tree_length(d: Sequence[float], n: int) -> float:
+    """Minimum spanning tree weight (Prim): no open path through the places can be shorter"""
+    if n <= 1:
+        return 0.0
+    inf = float('inf')
+    best = [inf] * n
+    in_tree = [False] * n
+    best[0] = 0.0
+    total = 0.0
+    for _ in range(n):
+        u = min((i for i in range(n) if not in_tree[i]), key=best.__getitem__)
+        in_tree[u] = True
+        total += best[u]
+        row = u * n
+        for v in range(n):
+            if not in_tree[v] and d[row + v] < best[v]:
+                best[v] = d[row + v]
+    return total
+
+
+def sub_distances(d: Sequence[float], n: int, subset: Sequence[int]) -> array:
+    """Square distances between a subset of the places"""
+    return array('d', (d[a * n + b] for a in subset for b in subset))
@@ -0,0 +1,462 @@
+"""
+Planning Service
+An asyncio HTTP/1.1 front end for plan requests. Worker processes load the
+attraction store into per-city PlaceTables once, at startup (or attach to one
+copy published in shared memory / an mmap'd file), and do all the planning;
+the event loop only parses requests, enforces deadlines and sheds load, so
+slow geodesic loops never block other connections.
+
+The dataset is versioned: POST /reload (or the store watcher, with
+reload_interval) builds a new version in a background thread and swaps it in
+without a restart. Each request is pinned to the version current when it
+arrived; a replaced version is released once its last request is done, and
+workers drop it on their next request. With shared=True the new version is
+built and published once, off the request path; otherwise each worker loads
+it from the store on its first request for it.
+
+Endpoints:
+  POST /plan     JSON PlanRequest (plus optional "deadline_ms") -> plan JSON; with
+                 "time_budget_ms" the routes are improved for up to that long
+                 (within the deadline) and the plan reports its quality;
+                 with "mode": "best" only the best places that fit "days" are
+                 planned (time_budget_ms bounds their improvement too); with
+                 "day_minutes" days are filled by visit plus travel time
+                 instead of max_places_per_day
+  GET  /plan     same fields as query parameters (?city=Paris&limit=20)
+  GET  /cities   cities the service can plan
+  GET  /health   liveness and load
+  GET  /stats    request counters, live dataset versions (and plan cache totals)
+  POST /reload   load a new dataset version now
+
+Responses: 400 invalid request, 404 unknown city, 503 shed (too many requests
+queued or running, with Retry-After; a request past its deadline counts until
+its worker is done), 504 deadline exceeded.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .dataset_versions import DatasetVersion, DatasetVersions
+from .plan_cache import PlanCache
+from .planning import PlanningDataset, PlanRequest, plan_request
+from .shared_dataset import PublishedDataset, SharedPlanningDataset, attach_dataset, publish_dataset
+from .store import DEFAULT_STORE_PATH, AttractionStore, store_signature
+
+DEFAULT_PORT = 8080
+DEFAULT_DEADLINE_MS = 5000
+MAX_DEADLINE_MS = 60000
+MAX_BODY_BYTES = 1 << 20
+QUEUE_PER_WORKER = 4
+# Share of the time left before a request's deadline that its route search may use
+ANYTIME_DEADLINE_SHARE = 0.8
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+            504: 'Gateway Timeout'}
+_LIST_FIELDS = ('categories', 'names')
+
+# Worker process state: datasets by version number, and the plan cache (shared
+# by all versions: plan_key hashes every place field a plan shows, so plans over
+# places a reload changed miss the entries made from the old version)
+_datasets: Dict[int, PlanningDataset] = {}
+_cache: Optional[PlanCache] = None
+
+
+def _load_dataset(source: Dict) -> PlanningDataset:
+    """Load from the store ({'store': ..., 'cities': ...}) or attach to a published dataset, then load any
+    plan artifacts ('artifacts': directory)"""
+    source = dict(source)
+    artifacts_dir = source.pop('artifacts', None)
+    if 'store' in source:
+        dataset = PlanningDataset.from_store(source['store'], source['cities'])
+    else:
+        dataset = attach_dataset(**source)
+    if artifacts_dir is not None:
+        dataset.load_artifacts(artifacts_dir)
+    return dataset
+
+
+def _init_worker(version: int, source: Dict, cache_size: int, cache_dir: Optional[str]):
+    global _cache
+    _datasets[version] = _load_dataset(source)
+    _cache = PlanCache(cache_size, cache_dir) if cache_size else None
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _worker_dataset(version: int, source: Dict, oldest_live: int) -> PlanningDataset:
+    """The dataset of a version (loaded on first use), dropping versions the service has released"""
+    dataset = _datasets.get(version)
+    if dataset is None:
+        dataset = _datasets[version] = _load_dataset(source)
+    for number in [number for number in _datasets if number < oldest_live]:
+        old = _datasets.pop(number)
+        if _cache is not None:
+            # Its artifacts' entries were pinned into the process-wide cache by the plans it served
+            for artifact in old.artifacts.values():
+                _cache.unpin(artifact.entries)
+        if isinstance(old, SharedPlanningDataset):
+            try:
+                old.close()
+            except BufferError:
+                pass  # a view is still referenced; the mapping goes when it is collected
+    return dataset
+
+
+def _plan_worker(request: PlanRequest, deadline: float, version: int, source: Dict,
+                 oldest_live: int) -> Tuple[Optional[Dict], int, Optional[Dict]]:
+    """(plan, worker pid, worker cache stats); the plan is None if its deadline passed while queued.
+
+    A time_budget_ms is cut down to fit the deadline, so anytime plans come
+    back in time with the best routes found.
+    """
+    dataset = _worker_dataset(version, source, oldest_live)
+    remaining_ms = (deadline - time.time()) * 1000
+    if request.time_budget_ms is not None:
+        request.time_budget_ms = max(0.0, min(request.time_budget_ms, remaining_ms * ANYTIME_DEADLINE_SHARE))
+    plan = plan_request(dataset, request, _cache) if remaining_ms > 0 else None
+    return plan, os.getpid(), dict(_cache.stats) if _cache is not None else None
+
+
+@dataclass
+class _ServiceDataset:
+    """One dataset version as the service sees it: how workers load it, and its cities"""
+    source: Dict
+    cities: List[str]
+    published: Optional[PublishedDataset] = None
+    city_set: FrozenSet[str] = field(init=False)
+
+    def __post_init__(self):
+        self.city_set = frozenset(self.cities)
+
+    def release(self):
+        if self.published is not None:
+            self.published.close()
+            if self.published.path is not None and os.path.exists(self.published.path):
+                os.remove(self.published.path)
+
+
+def _query_request(query: str) -> Dict:
+    """Decode ?city=Paris&limit=20&categories=Parks&categories=Museums into request fields"""
+    data = {}
+    for name, values in parse_qs(query).items():
+        data[name] = values if name in _LIST_FIELDS else values[-1]
+    return data
+
+
+class PlanningService:
+    """HTTP planning front end over a process pool of planning workers"""
+
+    def __init__(self, store_path: str = DEFAULT_STORE_PATH, cities: Optional[Sequence[str]] = None,
+                 workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 default_deadline_ms: int = DEFAULT_DEADLINE_MS, cache_size: int = 0,
+                 cache_dir: Optional[str] = None, shared: bool = False, dataset_path: Optional[str] = None,
+                 matrix_max_places: int = 0, matrix_metric: str = 'haversine', reload_interval: float = 0,
+                 cities_dir: Optional[str] = None, artifacts_dir: Optional[str] = None):
+        self.store_path = store_path
+        self.requested_cities = list(cities) if cities else None
+        # shared / dataset_path: load once here and publish to shared memory / mmap'd files
+        # (dataset_path 'data.wfd' publishes version n as 'data.n.wfd')
+        self.shared = shared or dataset_path is not None
+        self.dataset_path = dataset_path
+        self.matrix_max_places = matrix_max_places
+        self.matrix_metric = matrix_metric
+        # reload_interval: poll the store (after importing changed files from cities_dir) every N seconds
+        self.reload_interval = reload_interval
+        self.cities_dir = cities_dir
+        # Precomputed plan artifacts (plan_artifacts.py), loaded by each worker with every dataset version
+        self.artifacts_dir = artifacts_dir
+        self.versions: Optional[DatasetVersions] = None
+        self._published = 0
+        self._watcher: Optional[asyncio.Task] = None
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self._cache_stats: Dict[int, Dict[str, int]] = {}
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * QUEUE_PER_WORKER
+        self.default_deadline_ms = default_deadline_ms
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.pending = 0
+        self.stats: Dict[str, int] = {'requests': 0, 'planned': 0, 'shed': 0, 'timeouts': 0,
+                                      'invalid': 0, 'errors': 0, 'reloads': 0, 'reload_errors': 0}
+
+    async def start(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+        """Load the first dataset version, start the workers, wait until each has it, then listen"""
+        self.versions = await asyncio.to_thread(DatasetVersions, self._load_version, _ServiceDataset.release)
+        current = self.versions.current
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                        initargs=(current.number, current.dataset.source,
+                                                  self.cache_size, self.cache_dir))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ready) for _ in range(self.workers)))
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        if self.reload_interval:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+        if self.versions is not None:
+            self.versions.close()
+
+    @property
+    def cities(self) -> List[str]:
+        """Cities of the current dataset version (cities without geocoded attractions are left out)"""
+        return self.versions.current.dataset.cities
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    # Dataset versions
+
+    def _load_version(self) -> _ServiceDataset:
+        """Build the next dataset version (runs in a background thread)"""
+        if not self.shared:
+            with AttractionStore(self.store_path, read_only=True) as store:
+                cities = [city for city in store.cities(geocoded=True)
+                          if self.requested_cities is None or city in self.requested_cities]
+            return _ServiceDataset({'store': self.store_path, 'cities': cities, 'artifacts': self.artifacts_dir},
+                                   cities)
+        dataset = PlanningDataset.from_store(self.store_path, self.requested_cities)
+        self._published += 1
+        path = None
+        if self.dataset_path is not None:
+            root, extension = os.path.splitext(self.dataset_path)
+            path = f"{root}.{self._published}{extension}"
+        published = publish_dataset(dataset, path, self.matrix_max_places, self.matrix_metric)
+        return _ServiceDataset(dict(published.attach_args(), artifacts=self.artifacts_dir), dataset.cities(),
+                               published)
+
+    async def reload(self) -> DatasetVersion:
+        """Load a new dataset version in the background and swap it in; requests in flight keep theirs"""
+        try:
+            version = await asyncio.wrap_future(self.versions.reload_in_background())
+        except Exception:
+            self.stats['reload_errors'] += 1
+            raise
+        self.stats['reloads'] += 1
+        return version
+
+    def _import_cities(self) -> Dict[str, int]:
+        with AttractionStore(self.store_path) as store:
+            return store.import_cities(self.cities_dir, self.requested_cities, workers=1)
+
+    async def _watch(self):
+        """Reload whenever the store changes (importing changed city files first, with cities_dir).
+
+        A change is picked up once the store has been quiet for one interval,
+        so a multi-city import (one transaction per city) causes one reload.
+        """
+        loaded = previous = store_signature(self.store_path)
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                if self.cities_dir is not None:
+                    await asyncio.to_thread(self._import_cities)
+                current = store_signature(self.store_path)
+                if current != loaded and current == previous:
+                    loaded = current
+                    await self.reload()
+                previous = current
+            except Exception:
+                # Counted in stats; the current version keeps serving
+                self.stats['reload_errors'] += 1
+
+    # Planning
+
+    async def plan(self, data: Dict, deadline_ms: Optional[float] = None) -> Tuple[int, Dict]:
+        """(status, payload) for one decoded plan request"""
+        self.stats['requests'] += 1
+        body_deadline_ms = data.pop('deadline_ms', None)
+        deadline_ms = body_deadline_ms if deadline_ms is None else deadline_ms
+        try:
+            request = PlanRequest.from_dict(data)
+            timeout = min(float(deadline_ms or self.default_deadline_ms), MAX_DEADLINE_MS) / 1000
+        except (TypeError, ValueError) as e:
+            self.stats['invalid'] += 1
+            return 400, {'error': str(e)}
+        version = self.versions.pin()
+        if request.places is None and request.city not in version.dataset.city_set:
+            self.versions.unpin(version)
+            self.stats['invalid'] += 1
+            return 404, {'error': f"Unknown city '{request.city}'"}
+        if self.pending >= self.max_pending:
+            self.versions.unpin(version)
+            self.stats['shed'] += 1
+            return 503, {'error': 'Too many pending plan requests', 'pending': self.pending}
+
+        self.pending += 1
+        try:
+            future = self.pool.submit(_plan_worker, request, time.time() + timeout, version.number,
+                                      version.dataset.source, self.versions.oldest_live())
+        except BaseException:
+            self.pending -= 1
+            self.versions.unpin(version)
+            raise
+        loop = asyncio.get_running_loop()
+
+        def finished(_):
+            # The version stays pinned, and the request pending, until the worker is done with it,
+            # even past a timeout (a request that already started keeps its worker busy)
+            self.versions.unpin(version)
+            loop.call_soon_threadsafe(self._request_finished)
+
+        future.add_done_callback(finished)
+        try:
+            # Cancelling on timeout drops the request if it is still queued
+            plan, pid, cache_stats = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            if cache_stats is not None:
+                self._cache_stats[pid] = cache_stats
+        except asyncio.TimeoutError:
+            plan = None
+        except Exception as e:
+            self.stats['errors'] += 1
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+        if plan is None:
+            self.stats['timeouts'] += 1
+            return 504, {'error': f"Plan not ready within {timeout * 1000:.0f} ms"}
+        self.stats['planned'] += 1
+        return 200, plan
+
+    def _request_finished(self):
+        self.pending -= 1
+
+    def cache_stats(self) -> Optional[Dict[str, int]]:
+        """Plan cache counters summed over workers (as of each worker's last reply)"""
+        if not self.cache_size:
+            return None
+        totals = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        for stats in self._cache_stats.values():
+            for name in totals:
+                totals[name] += stats.get(name, 0)
+        return totals
+
+    # HTTP
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        if url.path == '/plan':
+            deadline_ms = headers.get('x-deadline-ms')
+            if method == 'POST':
+                try:
+                    data = json.loads(body or b'{}')
+                except ValueError:
+                    self.stats['invalid'] += 1
+                    return 400, {'error': 'Request body is not valid JSON'}
+            elif method == 'GET':
+                data = _query_request(url.query)
+            else:
+                return 405, {'error': 'Use GET or POST'}
+            if not isinstance(data, dict):
+                self.stats['invalid'] += 1
+                return 400, {'error': 'Plan request must be a JSON object'}
+            return await self.plan(data, deadline_ms)
+        if url.path == '/reload':
+            if method != 'POST':
+                return 405, {'error': 'Use POST'}
+            try:
+                version = await self.reload()
+            except Exception as e:
+                return 500, {'error': f"Reload failed, still serving version {self.versions.current.number}: "
+                                      f"{type(e).__name__}: {e}"}
+            return 200, dict(version.to_dict(), cities=len(version.dataset.cities))
+        if method != 'GET':
+            return 405, {'error': 'Use GET'}
+        if url.path == '/cities':
+            return 200, {'cities': self.cities}
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'workers': self.workers, 'pending': self.pending,
+                         'max_pending': self.max_pending, 'dataset_version': self.versions.current.number}
+        if url.path == '/stats':
+            versions = []
+            for version in self.versions.live():
+                published = version.dataset.published
+                versions.append(dict(version.to_dict(), bytes=published.size if published else None))
+            return 200, dict(self.stats, pending=self.pending, cache=self.cache_stats(), dataset_versions=versions)
+        return 404, {'error': f"No route for {url.path}"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    self._respond(writer, 400, {'error': 'Malformed request line'}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    self._respond(writer, 413, {'error': 'Request body too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                status, payload = await self._dispatch(method.upper(), target, headers, body)
+                self._respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                'Content-Type: application/json; charset=utf-8',
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 503:
+            head.append('Retry-After: 1')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+
+async def _serve(service: PlanningService, host: str, port: int):
+    await service.start(host, port)
+    # SIGTERM (supervisors, timeout) closes like Ctrl-C, so shared memory is unlinked
+    task = asyncio.current_task()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    print(f"Planning service on http://{host}:{service.port} "
+          f"({len(service.cities)} cities, {service.workers} workers, max {service.max_pending} pending)")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def serve(store_path: str = DEFAULT_STORE_PATH, host: str = '127.0.0.1', port: int = DEFAULT_PORT, **options):
+    """Run the planning service until interrupted"""
+    service = PlanningService(store_path, **options)
+    try:
+        asyncio.run(_serve(service, host, port))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -0,0 +1,87 @@
+"""
+Plan Session Files
+A binary snapshot of a planning session: the places, their distance matrix
+and any cached clusterings, so a saved session reopens without recomputing
+pairwise distances. JSON place lists remain the interchange format; .wfs
+files are a local cache for the travel planner app.
+
+Layout: a data.frames frame (magic, JSON header, aligned native buffers).
+The header holds the place strings, types, opening hours and clusterings;
+the buffers hold latitudes, longitudes, ratings (NaN when missing) and the
+condensed float64 distance matrix.
+"""
+
+import math
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from .core import Place
+from .data.atomic import AtomicWriter
+from .data.frames import read_frame, write_frame
+from .distance_matrix import DistanceMatrix
+
+MAGIC = b'WFSES\x00\x01\x00'
+FORMAT_VERSION = 1
+SESSION_SUFFIX = '.wfs'
+
+
+def save_session(path: str, places: Sequence[Place], distances: Optional[DistanceMatrix] = None,
+                 metric: str = 'geodesic') -> DistanceMatrix:
+    """Write places plus their distance matrix (computed here unless `distances` covers them in order).
+
+    Returns the matrix that was saved so the caller can keep using it.
+    """
+    places = list(places)
+    distances = DistanceMatrix.for_places(places, distances, metric)
+
+    buffers = [
+        array('d', [place.latitude for place in places]),
+        array('d', [place.longitude for place in places]),
+        array('d', [math.nan if place.rating is None else place.rating for place in places]),
+        distances.values,
+    ]
+    header = {
+        'version': FORMAT_VERSION,
+        'count': len(places),
+        'metric': distances.metric,
+        'names': [place.name for place in places],
+        'addresses': [place.address for place in places],
+        'place_ids': [place.place_id for place in places],
+        'types': [place.types for place in places],
+        'opening_hours': [place.opening_hours for place in places],
+        'groupings': {repr(max_km): groups for max_km, groups in distances.groupings.items()},
+    }
+    with AtomicWriter() as writer, writer.open(path, 'wb') as f:
+        write_frame(f, MAGIC, header, buffers)
+    return distances
+
+
+def load_session(path: str) -> Tuple[List[Place], DistanceMatrix]:
+    """Read a session file; returns its places and a DistanceMatrix over them (clusterings included)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        header, views = read_frame(memoryview(data), MAGIC, 'plan session file')
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported session format version {header.get('version')}")
+
+    # Copy out of the file buffer so it can be freed
+    buffers = []
+    for view in views:
+        buffer = array(view.format)
+        buffer.frombytes(view.cast('B'))
+        buffers.append(buffer)
+    latitudes, longitudes, ratings, values = buffers
+    places = [
+        Place(name=name, address=address, latitude=latitude, longitude=longitude, place_id=place_id,
+              rating=None if math.isnan(rating) else rating, types=types, opening_hours=opening_hours)
+        for name, address, latitude, longitude, place_id, rating, types, opening_hours in zip(
+            header['names'], header['addresses'], latitudes, longitudes, header['place_ids'], ratings,
+            header['types'], header['opening_hours'])
+    ]
+    distances = DistanceMatrix(places, values, header['metric'])
+    distances.groupings = {float(max_km): groups for max_km, groups in header['groupings'].items()}
+    return places, distances
+
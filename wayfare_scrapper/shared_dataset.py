@@ -0,0 +1,131 @@
+"""
+Shared Planning Datasets
+Publishes a PlanningDataset once, into a multiprocessing.shared_memory block
+or a file, as one data.frames frame holding every city's PlaceTable buffers
+and optional per-city distance matrices. Worker processes attach read-only:
+their PlaceTables and DistanceMatrices are memoryviews over the shared pages,
+so each extra worker costs CPU, not another copy of the data.
+
+  published = publish_dataset(PlanningDataset.from_store(), matrix_max_places=3000)
+  # in each worker
+  dataset = attach_dataset(name=published.name)
+  ...
+  published.close()   # in the publisher, once the workers are done
+"""
+
+import mmap
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+from .data.atomic import AtomicWriter
+from .data.frames import frame_into, layout_frame, read_frame, write_frame
+from .distance_matrix import DistanceMatrix
+from .place_table import PlaceTable
+from .planning import PlanningDataset
+
+MAGIC = b'WFSHD\x00\x01\x00'
+FORMAT_VERSION = 1
+
+
+def _dataset_frame(dataset: PlanningDataset, matrix_max_places: int, matrix_metric: str):
+    """(header, buffers) describing every table and matrix of a dataset"""
+    header = {'version': FORMAT_VERSION, 'cities': {}}
+    buffers: List = []
+    for city, table in sorted(dataset.tables.items()):
+        meta, table_buffers = table.export_buffers()
+        entry = {'meta': meta, 'buffers': {}}
+        for name, buffer in table_buffers.items():
+            entry['buffers'][name] = len(buffers)
+            buffers.append(buffer)
+        matrix = dataset.matrices.get(city)
+        if matrix is None and 1 < len(table) <= matrix_max_places:
+            matrix = DistanceMatrix.compute(table, matrix_metric)
+        if matrix is not None:
+            entry['matrix'] = {'buffer': len(buffers), 'metric': matrix.metric}
+            buffers.append(matrix.values)
+        header['cities'][city] = entry
+    return header, buffers
+
+
+class PublishedDataset:
+    """Handle on a published dataset; keep it open while workers use the dataset"""
+
+    def __init__(self, size: int, shm: Optional[shared_memory.SharedMemory] = None, path: Optional[str] = None):
+        self.size = size
+        self.shm = shm
+        self.path = path
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.shm.name if self.shm is not None else None
+
+    def attach_args(self) -> Dict[str, str]:
+        """Keyword arguments for attach_dataset in another process"""
+        return {'name': self.name} if self.shm is not None else {'path': self.path}
+
+    def close(self):
+        """Release and remove the shared-memory block (published files are left in place)"""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def publish_dataset(dataset: PlanningDataset, path: Optional[str] = None, matrix_max_places: int = 0,
+                    matrix_metric: str = 'haversine') -> PublishedDataset:
+    """Write a dataset into a new shared-memory block, or to `path` for mmap-based sharing.
+
+    Cities with at most matrix_max_places places also get a distance matrix
+    (computed now unless the dataset already holds one).
+    """
+    header, buffers = _dataset_frame(dataset, matrix_max_places, matrix_metric)
+    if path is not None:
+        with AtomicWriter() as writer, writer.open(path, 'wb') as f:
+            size = write_frame(f, MAGIC, header, buffers)
+        return PublishedDataset(size, path=path)
+    _, size = layout_frame(MAGIC, header, buffers)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    frame_into(shm.buf, MAGIC, header, buffers)
+    return PublishedDataset(size, shm=shm)
+
+
+class SharedPlanningDataset(PlanningDataset):
+    """A PlanningDataset whose tables and matrices are read-only views of a published frame"""
+
+    def __init__(self, tables: Dict[str, PlaceTable], matrices: Dict[str, DistanceMatrix], source, view: memoryview):
+        super().__init__(tables, matrices)
+        self._source = source
+        self._view = view
+
+    def close(self):
+        """Drop the views and detach (only once nothing else references the tables)"""
+        self.tables.clear()
+        self.matrices.clear()
+        self._name_indexes.clear()
+        self._view.release()
+        self._source.close()
+
+
+def attach_dataset(name: Optional[str] = None, path: Optional[str] = None) -> SharedPlanningDataset:
+    """Attach to a dataset published by name (shared memory) or path (file), without copying it"""
+    if name is not None:
+        source = shared_memory.SharedMemory(name=name)
+        view = source.buf
+    elif path is not None:
+        with open(path, 'rb') as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(source)
+    else:
+        raise ValueError("attach_dataset needs a shared-memory name or a path")
+    header, buffers = read_frame(view.toreadonly(), MAGIC, 'shared planning dataset')
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported shared dataset version {header.get('version')}")
+
+    tables, matrices = {}, {}
+    for city, entry in header['cities'].items():
+        table = PlaceTable.from_buffers(entry['meta'], {name: buffers[index]
+                                                        for name, index in entry['buffers'].items()})
+        tables[city] = table
+        if 'matrix' in entry:
+            matrices[city] = DistanceMatrix(table, buffers[entry['matrix']['buffer']], entry['matrix']['metric'])
+    return SharedPlanningDataset(tables, matrices, source, view)
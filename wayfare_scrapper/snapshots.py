@@ -0,0 +1,250 @@
+"""
+City File Snapshots
+Content-addressed snapshots of cities/: each file's bytes are stored once as
+a blob named by its SHA-1, and each snapshot is a small manifest mapping file
+names to blobs. Files whose size and mtime match the previous snapshot are
+not even re-read, so a snapshot costs roughly the size of what changed.
+
+Layout under the store directory (default .snapshots/):
+  objects/ab/cdef...   read-only blobs
+  manifests/<id>.json  {id, created, label, source_dir, files: {name: {sha1, size, mtime_ns}}}
+"""
+
+import json
+import os
+import shutil
+import stat
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .data.atomic import AtomicWriter, atomic_write_text, file_sha1
+from .data.city_files import CITY_FILE_SUFFIX, city_from_filename
+from .merge import record_key
+
+DEFAULT_STORE_DIR = '.snapshots'
+
+
+@dataclass
+class SnapshotDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+class SnapshotStore:
+    """Create, list, diff and restore snapshots of a directory of city files"""
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.manifests_dir = os.path.join(store_dir, 'manifests')
+
+    # Blobs
+
+    def blob_path(self, sha1: str) -> str:
+        return os.path.join(self.objects_dir, sha1[:2], sha1[2:])
+
+    def _store_blob(self, source_path: str, sha1: str) -> bool:
+        """Copy a file into the object store unless its blob exists; returns True if it was copied"""
+        blob_path = self.blob_path(sha1)
+        if os.path.exists(blob_path):
+            return False
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temp_path = f"{blob_path}.tmp"
+        shutil.copyfile(source_path, temp_path)
+        # The copy may have raced with a writer; only keep it if it still has the expected content
+        if file_sha1(temp_path) != sha1:
+            os.remove(temp_path)
+            raise RuntimeError(f"{source_path} changed while it was being snapshotted")
+        os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(temp_path, blob_path)
+        return True
+
+    # Manifests
+
+    def _manifest_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.manifests_dir, f"{snapshot_id}.json")
+
+    def load(self, snapshot_id: str) -> Dict:
+        path = self._manifest_path(snapshot_id)
+        if not os.path.exists(path):
+            raise KeyError(f"No snapshot '{snapshot_id}' in {self.store_dir}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list(self) -> List[Dict]:
+        """Manifests without their file lists, oldest first"""
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        snapshots = []
+        for filename in sorted(os.listdir(self.manifests_dir)):
+            if filename.endswith('.json'):
+                manifest = self.load(filename[:-5])
+                manifest['file_count'] = len(manifest.pop('files'))
+                snapshots.append(manifest)
+        return sorted(snapshots, key=lambda manifest: (manifest['created'], manifest['id']))
+
+    def latest(self, source_dir: Optional[str] = None) -> Optional[Dict]:
+        for manifest in reversed(self.list()):
+            if source_dir is None or manifest['source_dir'] == os.path.abspath(source_dir):
+                return self.load(manifest['id'])
+        return None
+
+    def _new_id(self, label: Optional[str]) -> str:
+        base = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if label:
+            base += '_' + ''.join(c if c.isalnum() or c in '-_' else '-' for c in label)
+        snapshot_id, counter = base, 1
+        while os.path.exists(self._manifest_path(snapshot_id)):
+            counter += 1
+            snapshot_id = f"{base}.{counter}"
+        return snapshot_id
+
+    # Commands
+
+    def create(self, source_dir: str = 'cities', label: Optional[str] = None, suffix: str = CITY_FILE_SUFFIX) -> Dict:
+        """Snapshot every `suffix` file of source_dir; returns the manifest plus a 'stats' entry"""
+        previous = self.latest(source_dir)
+        previous_files = previous['files'] if previous else {}
+        stats = {'files': 0, 'rehashed': 0, 'new_blobs': 0, 'bytes_copied': 0}
+        files = {}
+
+        for filename in sorted(os.listdir(source_dir)):
+            if not filename.endswith(suffix):
+                continue
+            path = os.path.join(source_dir, filename)
+            info = os.stat(path)
+            entry = {'size': info.st_size, 'mtime_ns': info.st_mtime_ns}
+            known = previous_files.get(filename)
+            if (known and known['size'] == entry['size'] and known['mtime_ns'] == entry['mtime_ns']
+                    and os.path.exists(self.blob_path(known['sha1']))):
+                entry['sha1'] = known['sha1']
+            else:
+                entry['sha1'] = file_sha1(path)
+                stats['rehashed'] += 1
+                if self._store_blob(path, entry['sha1']):
+                    stats['new_blobs'] += 1
+                    stats['bytes_copied'] += entry['size']
+            files[filename] = entry
+            stats['files'] += 1
+
+        manifest = {
+            'id': self._new_id(label),
+            'created': datetime.now().isoformat(timespec='microseconds'),
+            'label': label,
+            'source_dir': os.path.abspath(source_dir),
+            'files': files,
+        }
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        atomic_write_text(self._manifest_path(manifest['id']), json.dumps(manifest, ensure_ascii=False, indent=2))
+        manifest['stats'] = stats
+        return manifest
+
+    def _current_files(self, directory: str, suffix: str = CITY_FILE_SUFFIX) -> Dict[str, Dict]:
+        return {filename: {'sha1': file_sha1(os.path.join(directory, filename))}
+                for filename in sorted(os.listdir(directory)) if filename.endswith(suffix)}
+
+    def diff(self, old_id: str, new_id: Optional[str] = None, directory: Optional[str] = None) -> SnapshotDiff:
+        """File-level differences between two snapshots, or a snapshot and a directory's current state"""
+        old = self.load(old_id)['files']
+        if new_id is not None:
+            new = self.load(new_id)['files']
+        else:
+            new = self._current_files(directory or self.load(old_id)['source_dir'])
+        result = SnapshotDiff()
+        for filename in sorted(set(old) | set(new)):
+            if filename not in new:
+                result.removed.append(filename)
+            elif filename not in old:
+                result.added.append(filename)
+            elif old[filename]['sha1'] != new[filename]['sha1']:
+                result.modified.append(filename)
+            else:
+                result.unchanged += 1
+        return result
+
+    def diff_records(self, old_id: str, filename: str, new_id: Optional[str] = None,
+                     directory: Optional[str] = None) -> Dict[str, List]:
+        """Record-level changes of one city file: added/removed names and changed fields per name"""
+        old_manifest = self.load(old_id)
+
+        def records_of(manifest, current_dir):
+            if manifest is not None:
+                entry = manifest['files'].get(filename)
+                path = self.blob_path(entry['sha1']) if entry else None
+            else:
+                path = os.path.join(current_dir, filename)
+            if not path or not os.path.exists(path):
+                return {}
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            city = city_from_filename(filename)
+            return {record_key(record, city): record for record in data}
+
+        old = records_of(old_manifest, None)
+        new = records_of(self.load(new_id) if new_id else None, directory or old_manifest['source_dir'])
+        changes = []
+        for key in sorted(set(old) & set(new)):
+            fields = sorted(field for field in set(old[key]) | set(new[key]) if old[key].get(field) != new[key].get(field))
+            if fields:
+                changes.append((new[key].get('name', key[1]), fields))
+        return {
+            'added': sorted(new[key].get('name', key[1]) for key in set(new) - set(old)),
+            'removed': sorted(old[key].get('name', key[1]) for key in set(old) - set(new)),
+            'changed': changes,
+        }
+
+    def restore(self, snapshot_id: str, target_dir: Optional[str] = None, files: Optional[List[str]] = None,
+                delete_extra: bool = False) -> Dict[str, List[str]]:
+        """Put a snapshot's files back, rewriting only those whose content differs.
+
+        With delete_extra, files matching the snapshot's naming that are not in
+        the snapshot are removed.
+        """
+        manifest = self.load(snapshot_id)
+        target_dir = target_dir or manifest['source_dir']
+        os.makedirs(target_dir, exist_ok=True)
+        wanted = manifest['files'] if files is None else {name: manifest['files'][name] for name in files}
+        result = {'restored': [], 'unchanged': [], 'deleted': []}
+
+        with AtomicWriter() as writer:
+            for filename, entry in sorted(wanted.items()):
+                target = os.path.join(target_dir, filename)
+                pending = writer.open(target, 'wb')
+                with pending as out, open(self.blob_path(entry['sha1']), 'rb') as blob:
+                    shutil.copyfileobj(blob, out)
+                result['restored' if pending.changed else 'unchanged'].append(filename)
+
+        if delete_extra and files is None:
+            for filename in sorted(os.listdir(target_dir)):
+                if filename.endswith(CITY_FILE_SUFFIX) and filename not in manifest['files']:
+                    os.remove(os.path.join(target_dir, filename))
+                    result['deleted'].append(filename)
+        return result
+
+    def delete(self, snapshot_id: str):
+        os.remove(self._manifest_path(snapshot_id))
+
+    def gc(self) -> int:
+        """Remove blobs no snapshot references; returns the number removed"""
+        referenced = set()
+        for manifest in self.list():
+            referenced.update(entry['sha1'] for entry in self.load(manifest['id'])['files'].values())
+        removed = 0
+        if not os.path.isdir(self.objects_dir):
+            return 0
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for rest in os.listdir(prefix_dir):
+                if prefix + rest not in referenced:
+                    path = os.path.join(prefix_dir, rest)
+                    os.chmod(path, stat.S_IWUSR | stat.S_IRUSR)
+                    os.remove(path)
+                    removed += 1
+        return removed
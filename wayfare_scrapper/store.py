@@ -0,0 +1,365 @@
+"""
+SQLite Attraction Store
+An embedded, queryable copy of the city files: one attractions table indexed
+on city, category and rating plus an R-tree over coordinates, bulk-imported
+from cities/ and queried through a typed API
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .core import Place
+from .data.atomic import file_sha1
+from .data.city_files import city_from_filename, list_city_files, record_coordinates
+from .geo import bounding_box, haversine_km
+
+DEFAULT_STORE_PATH = 'attractions.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attractions (
+    id INTEGER PRIMARY KEY,
+    city TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT,
+    wayfare_category TEXT,
+    country TEXT,
+    country_id TEXT,
+    city_id TEXT,
+    rating REAL,
+    popularity INTEGER,
+    duration INTEGER,
+    price TEXT,
+    detail_url TEXT,
+    latitude REAL,
+    longitude REAL,
+    opening_hours TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attractions_city ON attractions (city, position);
+CREATE INDEX IF NOT EXISTS idx_attractions_city_name ON attractions (city, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_attractions_category ON attractions (category, city);
+CREATE INDEX IF NOT EXISTS idx_attractions_wayfare_category ON attractions (wayfare_category, city);
+CREATE INDEX IF NOT EXISTS idx_attractions_rating ON attractions (rating);
+CREATE INDEX IF NOT EXISTS idx_attractions_city_rating ON attractions (city, rating);
+CREATE VIRTUAL TABLE IF NOT EXISTS attractions_rtree USING rtree (id, min_lat, max_lat, min_lon, max_lon);
+CREATE TABLE IF NOT EXISTS source_files (
+    filename TEXT PRIMARY KEY,
+    city TEXT NOT NULL,
+    sha1 TEXT NOT NULL,
+    records INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = ('city', 'position', 'name', 'category', 'wayfare_category', 'country', 'country_id', 'city_id',
+            'rating', 'popularity', 'duration', 'price', 'detail_url', 'latitude', 'longitude',
+            'opening_hours', 'record')
+
+ORDERINGS = {
+    'popularity': 'a.popularity IS NULL, a.popularity',
+    'rating': 'a.rating IS NULL, a.rating DESC',
+    'name': 'a.name COLLATE NOCASE',
+    'position': 'a.city, a.position',
+}
+
+
+@dataclass(frozen=True)
+class Attraction:
+    """One row of the store"""
+    id: int
+    city: str
+    name: str
+    category: Optional[str]
+    wayfare_category: Optional[str]
+    rating: Optional[float]
+    popularity: Optional[int]
+    duration: Optional[int]
+    price: Optional[str]
+    detail_url: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    opening_hours: Optional[Dict[str, str]]
+    distance_km: Optional[float] = None
+
+    def to_place(self) -> Place:
+        """Place for the planner (address is '<name>, <city>' since the city files carry none)"""
+        return Place(
+            name=self.name,
+            address=f"{self.name}, {self.city.replace('_', ' ')}",
+            latitude=self.latitude,
+            longitude=self.longitude,
+            place_id=self.detail_url,
+            rating=self.rating,
+            types=[value for value in (self.wayfare_category, self.category) if value],
+            opening_hours=self.opening_hours,
+        )
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(float(value)) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _sql_haversine_km(lat1, lon1, lat2, lon2) -> Optional[float]:
+    """haversine_km for SQL: NULL when a coordinate is NULL (SQLite may call it before other filters)"""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    return haversine_km(lat1, lon1, lat2, lon2)
+
+
+def record_row(record: Dict, city: str, position: int) -> Tuple:
+    """Column values for one city file record, in _COLUMNS order"""
+    coordinates = record_coordinates(record)
+    latitude, longitude = coordinates if coordinates else (None, None)
+    opening_hours = record.get('opening_hours')
+    return (
+        city, position, record.get('name', ''), record.get('category') or None,
+        record.get('wayfare_category') or None, record.get('country') or None, record.get('country_id') or None,
+        record.get('city_id') or None, _to_float(record.get('rating')), _to_int(record.get('popularity')),
+        _to_int(record.get('duration')), record.get('price') or None, record.get('detail_url') or None,
+        latitude, longitude, json.dumps(opening_hours, ensure_ascii=False) if opening_hours else None,
+        json.dumps(record, ensure_ascii=False),
+    )
+
+
+def _read_city_file(path: str) -> Tuple[str, str, List[Tuple]]:
+    """(city, sha1, rows) for one city file; runs in worker processes during import"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    city = city_from_filename(path)
+    records = json.loads(raw.decode('utf-8'))
+    return city, hashlib.sha1(raw).hexdigest(), [record_row(record, city, i) for i, record in enumerate(records)]
+
+
+def store_signature(path: str = DEFAULT_STORE_PATH) -> Tuple:
+    """(mtime, size) of the store file and its write-ahead log: changes whenever the store is written.
+
+    An empty log counts as no log (readers recreate it without writing anything).
+    """
+    signature = []
+    for filename in (path, f"{path}-wal"):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            stat = None
+        signature.append((stat.st_mtime_ns, stat.st_size) if stat is not None and stat.st_size else None)
+    return tuple(signature)
+
+
+class AttractionStore:
+    """SQLite-backed attraction store.
+
+    >>> store = AttractionStore('attractions.sqlite')
+    >>> store.import_cities('cities')
+    >>> pantheon = store.find('Rome', 'Pantheon')
+    >>> store.query(city='Rome', wayfare_category='Major Museums', min_rating=4.5,
+    ...             near=pantheon, radius_km=2, order_by='distance')
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, read_only: bool = False):
+        self.path = path
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function('haversine_km', 4, _sql_haversine_km, deterministic=True)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Import
+
+    def import_rows(self, city: str, rows: Sequence[Tuple], filename: Optional[str] = None, sha1: str = ''):
+        """Replace every row of a city in one transaction"""
+        with self.conn:
+            self.conn.execute("DELETE FROM attractions_rtree WHERE id IN (SELECT id FROM attractions WHERE city = ?)",
+                              (city,))
+            self.conn.execute("DELETE FROM attractions WHERE city = ?", (city,))
+            placeholders = ', '.join('?' for _ in _COLUMNS)
+            self.conn.executemany(f"INSERT INTO attractions ({', '.join(_COLUMNS)}) VALUES ({placeholders})", rows)
+            self.conn.execute(
+                "INSERT INTO attractions_rtree (id, min_lat, max_lat, min_lon, max_lon) "
+                "SELECT id, latitude, latitude, longitude, longitude FROM attractions "
+                "WHERE city = ? AND latitude IS NOT NULL AND longitude IS NOT NULL", (city,))
+            if filename:
+                self.conn.execute("INSERT OR REPLACE INTO source_files (filename, city, sha1, records) VALUES (?, ?, ?, ?)",
+                                  (filename, city, sha1, len(rows)))
+
+    def import_cities(self, cities_dir: str = 'cities', cities: Optional[List[str]] = None,
+                      workers: Optional[int] = None, force: bool = False) -> Dict[str, int]:
+        """Bulk import city files, skipping files whose content is unchanged since the last import.
+
+        Files are parsed in worker processes; rows are written by this process
+        (SQLite has a single writer). Returns {city: records} for imported cities.
+        """
+        known = {row['filename']: row['sha1'] for row in self.conn.execute("SELECT filename, sha1 FROM source_files")}
+        paths = [path for path in list_city_files(cities_dir, cities)
+                 if force or known.get(os.path.basename(path)) != file_sha1(path)]
+
+        imported = {}
+        if workers == 1 or len(paths) <= 1:
+            parsed = map(_read_city_file, paths)
+            for path, (city, sha1, rows) in zip(paths, parsed):
+                self.import_rows(city, rows, os.path.basename(path), sha1)
+                imported[city] = len(rows)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for path, (city, sha1, rows) in zip(paths, executor.map(_read_city_file, paths)):
+                    self.import_rows(city, rows, os.path.basename(path), sha1)
+                    imported[city] = len(rows)
+        if imported:
+            # Refresh planner statistics so it picks between the R-tree and the column indexes sensibly
+            self.conn.execute("ANALYZE")
+        return imported
+
+    # Queries
+
+    @staticmethod
+    def _attraction(row: sqlite3.Row) -> Attraction:
+        keys = row.keys()
+        return Attraction(
+            id=row['id'], city=row['city'], name=row['name'], category=row['category'],
+            wayfare_category=row['wayfare_category'], rating=row['rating'], popularity=row['popularity'],
+            duration=row['duration'], price=row['price'], detail_url=row['detail_url'],
+            latitude=row['latitude'], longitude=row['longitude'],
+            opening_hours=json.loads(row['opening_hours']) if row['opening_hours'] else None,
+            distance_km=row['distance_km'] if 'distance_km' in keys else None,
+        )
+
+    def cities(self, geocoded: bool = False) -> List[str]:
+        """Cities in the store (geocoded=True: only those with at least one attraction with coordinates)"""
+        where = ' WHERE latitude IS NOT NULL AND longitude IS NOT NULL' if geocoded else ''
+        return [row[0] for row in self.conn.execute(f"SELECT DISTINCT city FROM attractions{where} ORDER BY city")]
+
+    def sources(self) -> Dict[str, str]:
+        """SHA-1 of the city file each city was last imported from, by city"""
+        return {row[0]: row[1] for row in self.conn.execute("SELECT city, sha1 FROM source_files ORDER BY filename")}
+
+    def count(self, city: Optional[str] = None) -> int:
+        if city is None:
+            return self.conn.execute("SELECT COUNT(*) FROM attractions").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM attractions WHERE city = ?", (city,)).fetchone()[0]
+
+    def get(self, attraction_id: int) -> Optional[Attraction]:
+        row = self.conn.execute("SELECT * FROM attractions WHERE id = ?", (attraction_id,)).fetchone()
+        return self._attraction(row) if row else None
+
+    def find(self, city: str, name: str) -> Optional[Attraction]:
+        """An attraction by exact (case-insensitive) name, falling back to the most popular substring match"""
+        row = self.conn.execute("SELECT * FROM attractions WHERE city = ? AND name = ? COLLATE NOCASE LIMIT 1",
+                                (city, name)).fetchone()
+        if row is None:
+            row = self.conn.execute(
+                "SELECT * FROM attractions WHERE city = ? AND name LIKE ? "
+                "ORDER BY popularity IS NULL, popularity LIMIT 1", (city, f"%{name}%")).fetchone()
+        return self._attraction(row) if row else None
+
+    def _build_query(self, city: Optional[str] = None,
+                     category: Union[str, Sequence[str], None] = None,
+                     wayfare_category: Union[str, Sequence[str], None] = None,
+                     min_rating: Optional[float] = None,
+                     near: Union[Attraction, Place, Tuple[float, float], None] = None,
+                     radius_km: Optional[float] = None,
+                     name_contains: Optional[str] = None,
+                     order_by: str = 'popularity',
+                     limit: Optional[int] = None) -> Tuple[str, List]:
+        where, params = [], []
+        joins = ''
+        select = 'a.*'
+
+        if city is not None:
+            where.append('a.city = ?')
+            params.append(city)
+        for column, values in (('category', category), ('wayfare_category', wayfare_category)):
+            if values is None:
+                continue
+            values = [values] if isinstance(values, str) else list(values)
+            where.append(f"a.{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        if min_rating is not None:
+            where.append('a.rating >= ?')
+            params.append(min_rating)
+        if name_contains:
+            where.append('a.name LIKE ?')
+            params.append(f"%{name_contains}%")
+
+        if near is not None:
+            lat, lon = (near.latitude, near.longitude) if hasattr(near, 'latitude') else near
+            select += ', haversine_km(?, ?, a.latitude, a.longitude) AS distance_km'
+            params = [lat, lon] + params
+            where.append('a.latitude IS NOT NULL AND a.longitude IS NOT NULL')
+            if radius_km is not None:
+                joins = 'JOIN attractions_rtree r ON r.id = a.id'
+                min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+                where.append('r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?')
+                params.extend([min_lat, max_lat, min_lon, max_lon])
+                where.append('haversine_km(?, ?, a.latitude, a.longitude) <= ?')
+                params.extend([lat, lon, radius_km])
+        elif order_by == 'distance' or radius_km is not None:
+            raise ValueError("order_by='distance' and radius_km need a `near` point")
+
+        if order_by == 'distance':
+            ordering = 'distance_km'
+        elif order_by in ORDERINGS:
+            ordering = ORDERINGS[order_by]
+        else:
+            raise ValueError(f"Unknown order_by '{order_by}' (expected one of {sorted(ORDERINGS) + ['distance']})")
+
+        sql = f"SELECT {select} FROM attractions a {joins}"
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f" ORDER BY {ordering}, a.id"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+    def query(self, **filters) -> List[Attraction]:
+        """Filtered attractions.
+
+        Filters: city, category / wayfare_category (value or list), min_rating,
+        name_contains, near (Attraction, Place or (lat, lon)) with radius_km,
+        order_by ('popularity', 'rating', 'name', 'position' or, with near,
+        'distance') and limit. With radius_km the R-tree narrows candidates to a
+        bounding box before the exact distance filter.
+        """
+        sql, params = self._build_query(**filters)
+        return [self._attraction(row) for row in self.conn.execute(sql, params)]
+
+    def explain(self, **filters) -> List[str]:
+        """SQLite query plan lines for a query() call, to check which indexes it uses"""
+        sql, params = self._build_query(**filters)
+        return [row[3] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def places(self, **filters) -> List[Place]:
+        """query() results with coordinates, as Place objects for TravelPlanner"""
+        return [attraction.to_place() for attraction in self.query(**filters)
+                if attraction.latitude is not None and attraction.longitude is not None]
+
+    def iter_records(self, city: str) -> Iterator[Dict]:
+        """The original city file records of a city, in file order (for maintenance scripts)"""
+        for row in self.conn.execute("SELECT record FROM attractions WHERE city = ? ORDER BY position", (city,)):
+            yield json.loads(row[0])
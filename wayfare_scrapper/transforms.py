@@ -0,0 +1,238 @@
+"""
+Record Transforms
+The per-record logic of the data-maintenance scripts, packaged as
+RecordTransform classes for the batch runner
+"""
+
+import json
+import os
+import re
+from typing import Dict, Optional, Sequence
+
+from .batch import FileContext, RecordTransform, SkipFile
+from .data.category_matcher import get_category_matcher
+from .data.countries import CITY_COUNTRY, COUNTRY_ID
+from .data.remap import map_record, mapping_fingerprint
+from .merge import build_field_index, record_key
+from .matching import NameIndex, extract_name_from_url, normalize_text, strip_rank_prefix, word_overlap_ok
+
+
+class CountryTransform(RecordTransform):
+    """Add `country` and `country_id` from the city of the file"""
+
+    name = 'country'
+
+    def __init__(self, city_country: Optional[Dict[str, str]] = None, country_ids: Optional[Dict[str, str]] = None):
+        self.city_country = CITY_COUNTRY if city_country is None else city_country
+        self.country_ids = COUNTRY_ID if country_ids is None else country_ids
+
+    def begin_file(self, ctx: FileContext):
+        country = self.city_country.get(ctx.city)
+        if not country:
+            raise SkipFile(f"No country mapping for city '{ctx.city}'")
+        country_id = self.country_ids.get(country)
+        if not country_id:
+            raise SkipFile(f"No country_id mapping for country '{country}' (city '{ctx.city}')")
+        ctx.state['country'] = (country, country_id)
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        country, country_id = ctx.state['country']
+        changed = record.get('country') != country or record.get('country_id') != country_id
+        record['country'] = country
+        record['country_id'] = country_id
+        return changed
+
+
+class CityIdTransform(RecordTransform):
+    """Add `city_id` from cities.json"""
+
+    name = 'city_id'
+
+    def __init__(self, city_ids: Dict[str, str]):
+        self.city_ids = city_ids
+
+    @classmethod
+    def from_cities_json(cls, path: str = 'cities.json') -> 'CityIdTransform':
+        with open(path, 'r', encoding='utf-8') as f:
+            cities = json.load(f)
+        # Normalized city name (file name prefix) -> city_id
+        return cls({city['name'].replace(' ', '_'): city['city_id'] for city in cities})
+
+    def begin_file(self, ctx: FileContext):
+        city_id = self.city_ids.get(ctx.city)
+        if not city_id:
+            raise SkipFile(f"No city_id found for city '{ctx.city}'")
+        ctx.state['city_id'] = city_id
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        changed = record.get('city_id') != ctx.state['city_id']
+        record['city_id'] = ctx.state['city_id']
+        return changed
+
+
+def raw_rank(raw_entry: Dict, position: int) -> int:
+    """Popularity rank of a raw entry: the '12.' prefix of its name, or its list position"""
+    match = re.match(r'^(\d+)\.', raw_entry.get('name', ''))
+    return int(match.group(1)) if match else position + 1
+
+
+class PopularityTransform(RecordTransform):
+    """Add `popularity` by joining on name with the ranked raw_data/ file of the same city"""
+
+    name = 'popularity'
+
+    def __init__(self, raw_dir: str = 'raw_data'):
+        self.raw_dir = raw_dir
+
+    def begin_file(self, ctx: FileContext):
+        raw_path = os.path.join(self.raw_dir, ctx.filename)
+        if not os.path.exists(raw_path):
+            raise SkipFile("No matching raw_data file")
+        with open(raw_path, 'r', encoding='utf-8') as f:
+            raw_data = json.load(f)
+        ctx.state['raw_count'] = len(raw_data)
+        ctx.state['raw_index'] = NameIndex(
+            [strip_rank_prefix(entry.get('name', '')) for entry in raw_data],
+            [raw_rank(entry, i) for i, entry in enumerate(raw_data)]
+        )
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        match = ctx.state['raw_index'].best(strip_rank_prefix(record.get('name', '')))
+        if match:
+            popularity = str(match.value)
+        elif ctx.position < ctx.state['raw_count']:
+            # Assign popularity by order when the name cannot be found
+            popularity = str(ctx.position + 1)
+            ctx.stats['popularity_by_order'] += 1
+        else:
+            return False
+        changed = record.get('popularity') != popularity
+        record['popularity'] = popularity
+        return changed
+
+    def end_file(self, ctx: FileContext):
+        if ctx.stats['popularity_by_order']:
+            ctx.log(f"Warning: {ctx.stats['popularity_by_order']} entries not found by name, used list order instead")
+        if ctx.state['raw_count'] != ctx.records:
+            ctx.log(f"Warning: raw_data and cities file have different lengths "
+                    f"({ctx.state['raw_count']} vs {ctx.records})")
+
+
+class CategoryMappingTransform(RecordTransform):
+    """Add `wayfare_category`, `duration` and the mapping stamp; collect category locations for the reverse index"""
+
+    name = 'category_mapping'
+
+    def begin_file(self, ctx: FileContext):
+        ctx.state['locations'] = {}
+        ctx.state['fingerprints'] = {}
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        mapping, changed = map_record(record, get_category_matcher())
+        if mapping is None:
+            return False
+        category = record['category']
+        ctx.state['locations'].setdefault(category, []).append(ctx.position)
+        ctx.state['fingerprints'][category] = mapping_fingerprint(mapping)
+        ctx.stats['mapped' if changed else 'mapping_skipped'] += 1
+        return changed
+
+    def end_file(self, ctx: FileContext):
+        ctx.collect('category_locations', (ctx.filename, ctx.state['locations'], ctx.state['fingerprints']))
+
+
+class FieldMergeTransform(RecordTransform):
+    """Copy `fields` from the same-named file in another directory, joined on (city, normalized name)"""
+
+    name = 'merge_fields'
+
+    def __init__(self, source_dir: str = 'updated_cities', fields: Sequence[str] = ('detail_url',)):
+        self.source_dir = source_dir
+        self.fields = tuple(fields)
+
+    def begin_file(self, ctx: FileContext):
+        source_path = os.path.join(self.source_dir, ctx.filename)
+        if not os.path.exists(source_path):
+            raise SkipFile(f"No corresponding file in {self.source_dir}")
+        ctx.state['merge_index'], duplicates = build_field_index(source_path, self.fields, ctx.city)
+        ctx.stats['merge_source_duplicates'] += duplicates
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        updates = ctx.state['merge_index'].get(record_key(record, ctx.city))
+        if updates is None:
+            ctx.stats['merge_unmatched'] += 1
+            return False
+        changed = False
+        for field, value in updates.items():
+            if record.get(field) != value:
+                record[field] = value
+                changed = True
+        return changed
+
+
+class DetailUrlValidationTransform(RecordTransform):
+    """Report records whose detail_url names a different attraction (read-only)"""
+
+    name = 'validate_detail_urls'
+    read_only = True
+    # In a pipeline, validate the URLs after a merge stage has brought them in
+    requires = ('merge_fields',)
+
+    def begin_file(self, ctx: FileContext):
+        ctx.state['url_index'] = NameIndex()
+        ctx.state['urls'] = []
+        ctx.state['mismatches'] = []
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        name = record.get('name', '')
+        detail_url = record.get('detail_url', '')
+        url_name = extract_name_from_url(detail_url)
+        # Index every URL name so a mismatched entry can point at the URL it probably belongs to
+        ctx.state['url_index'].add(url_name, ctx.position)
+        ctx.state['urls'].append(detail_url)
+        ctx.stats['checked'] += 1
+
+        if not detail_url or not name:
+            return False
+        normalized_name = normalize_text(name)
+        normalized_url_name = normalize_text(url_name)
+        if normalized_name and normalized_url_name and not word_overlap_ok(name, url_name):
+            ctx.state['mismatches'].append({
+                'file': ctx.filename,
+                'index': ctx.position,
+                'name': name,
+                'url_name': url_name,
+                'detail_url': detail_url,
+                'normalized_name': normalized_name,
+                'normalized_url_name': normalized_url_name,
+            })
+        return False
+
+    def end_file(self, ctx: FileContext):
+        for mismatch in ctx.state['mismatches']:
+            suggestion = ctx.state['url_index'].best(mismatch['name'])
+            if suggestion and suggestion.value != mismatch['index']:
+                mismatch['suggested_url'] = ctx.state['urls'][suggestion.value]
+            else:
+                mismatch['suggested_url'] = None
+            ctx.collect('mismatches', mismatch)
+
+
+class CategoryScanTransform(RecordTransform):
+    """Collect the distinct non-empty `category` values (read-only)"""
+
+    name = 'scan_categories'
+    read_only = True
+
+    def begin_file(self, ctx: FileContext):
+        ctx.state['categories'] = set()
+
+    def transform(self, record: Dict, ctx: FileContext) -> bool:
+        category = record.get('category', '')
+        if category:
+            ctx.state['categories'].add(category)
+        return False
+
+    def end_file(self, ctx: FileContext):
+        for category in sorted(ctx.state['categories']):
+            ctx.collect('categories', category)
@@ -0,0 +1,54 @@
+"""
+Visit Time
+How long a day of sightseeing takes: each place's visit duration from the
+category table (CATEGORY_MAPPING's `duration`, in minutes) and the travel
+time between places at an average city speed (walking plus transit).
+
+  visit_minutes(place)           # 240 for a theme park, 45 for a viewpoint
+  travel_minutes(3.2)            # 16.0 at the default 12 km/h
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+from .data.category_mapping import get_category_index
+from .data.category_matcher import DEFAULT_MAPPING, get_category_matcher
+
+DEFAULT_DAY_MINUTES = 480.0          # an 8-hour sightseeing day
+DEFAULT_TRAVEL_SPEED_KMH = 12.0      # average door-to-door speed between places in a city
+DEFAULT_VISIT_MINUTES = DEFAULT_MAPPING['duration']
+
+_durations: Dict[Tuple[str, ...], int] = {}
+
+
+def category_minutes(category: str) -> Optional[int]:
+    """Visit duration of a wayfare category or a raw category, or None if it is unknown"""
+    index = get_category_index()
+    summary = index.summary().get(category)
+    if summary is not None:
+        return summary['duration']
+    if category in index:
+        return index.get(category)['duration']
+    entry = get_category_matcher().match(category)
+    if entry is None or entry['new_category'] == DEFAULT_MAPPING['new_category']:
+        return None
+    return entry['duration']
+
+
+def visit_minutes(place) -> int:
+    """Visit duration of a place from its types (wayfare category first, then the raw category)"""
+    types = tuple(place.types or ())
+    minutes = _durations.get(types)
+    if minutes is None:
+        minutes = next((found for found in map(category_minutes, types) if found is not None),
+                       DEFAULT_VISIT_MINUTES)
+        _durations[types] = minutes
+    return minutes
+
+
+def travel_minutes(distance_km: float, speed_kmh: float = DEFAULT_TRAVEL_SPEED_KMH) -> float:
+    return distance_km / speed_kmh * 60
+
+
+def day_minutes(route: Sequence, legs_km: Sequence[float], speed_kmh: float = DEFAULT_TRAVEL_SPEED_KMH) -> float:
+    """Visits plus travel of one ordered day (legs_km: the distance of each leg)"""
+    return sum(visit_minutes(place) for place in route) + travel_minutes(sum(legs_km), speed_kmh)